@@ -0,0 +1,93 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from users.models import TOKEN_CLAIMS, User
+
+from api_yamdb.caches import is_shared
+
+REVOKED_KEY = "auth:revoked:{}"
+
+
+class RoleAccessToken(AccessToken):
+    """Access-токен с ролью и правами пользователя в полезной нагрузке."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token["iat"] = time.time()
+        for field in TOKEN_CLAIMS:
+            token[field] = getattr(user, field)
+        return token
+
+
+def revoke_tokens(user_id):
+    """
+    Отзывает токены пользователя, выпущенные до текущего момента.
+
+    Метка хранится в кэше не дольше времени жизни access-токена:
+    более старые токены к тому моменту истекут сами.
+    """
+    caches[settings.JWT_REVOCATION_CACHE].set(
+        REVOKED_KEY.format(user_id),
+        time.time(),
+        api_settings.ACCESS_TOKEN_LIFETIME.total_seconds(),
+    )
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    Аутентификация по JWT без чтения пользователя из базы.
+
+    Пользователь собирается из утверждений токена как объект User
+    с отложенными полями: проверки ролей не делают запросов, а обращение
+    к остальным полям догружает их из базы. Токены без утверждений
+    о роли обрабатываются как раньше, через запрос к базе.
+
+    Отметки об отзыве видны всем воркерам только в общем кэше. Если
+    кэш JWT_REVOCATION_CACHE локален для процесса, а воркеров
+    несколько, пользователь читается из базы: понижение роли или
+    удаление действуют сразу во всех процессах.
+    """
+
+    def get_user(self, validated_token):
+        if any(field not in validated_token for field in TOKEN_CLAIMS) or (
+            settings.JWT_REVOCATION_CHECK
+            and not is_shared(settings.JWT_REVOCATION_CACHE)
+        ):
+            return super().get_user(validated_token)
+        user_id = validated_token[api_settings.USER_ID_CLAIM]
+        if not validated_token["is_active"]:
+            raise AuthenticationFailed(
+                "Пользователь неактивен.", code="user_inactive"
+            )
+        if settings.JWT_REVOCATION_CHECK:
+            revoked_at = caches[settings.JWT_REVOCATION_CACHE].get(
+                REVOKED_KEY.format(user_id)
+            )
+            if revoked_at and validated_token.get("iat", 0) < revoked_at:
+                raise AuthenticationFailed(
+                    "Токен отозван, получите новый.", code="token_revoked"
+                )
+        claims = {field: validated_token[field] for field in TOKEN_CLAIMS}
+        claims[api_settings.USER_ID_FIELD] = user_id
+        fields = [
+            field.attname
+            for field in User._meta.concrete_fields
+            if field.attname in claims
+        ]
+        return User.from_db(
+            User.objects.db, fields, [claims[field] for field in fields]
+        )
+
+
+def load_user(user):
+    """Догружает одним запросом поля, которых не было в токене."""
+    deferred = user.get_deferred_fields()
+    if deferred:
+        user.refresh_from_db(fields=deferred)
+    return user
@@ -0,0 +1,372 @@
+import json
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework.exceptions import ParseError, ValidationError
+from rest_framework.parsers import JSONParser
+from reviews.models import Comment, Review, Title, touch
+from reviews.ratings import rebuild_ratings, rebuild_score_stats
+from users.models import User
+
+from .cache import invalidate_tags
+from .catalog import CATEGORIES, GENRES
+from .serializers import (CommentBulkSerializer, ReviewBulkSerializer,
+                          TitleBulkSerializer)
+
+CREATED = "created"
+UPDATED = "updated"
+ERROR = "error"
+
+
+class NDJSONParser(JSONParser):
+    """Тело запроса в формате NDJSON: по одному JSON-объекту на строку."""
+
+    media_type = "application/x-ndjson"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        items = []
+        for number, line in enumerate(stream, start=1):
+            line = line.decode(encoding).strip()
+            if not line:
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError as error:
+                raise ParseError(f"Строка {number}: {error}")
+        return items
+
+
+def batch_size():
+    # SQLite ограничивает число параметров в одном INSERT,
+    # там Django сам подбирает размер пакета.
+    return None if connection.vendor == "sqlite" else settings.BULK_BATCH_SIZE
+
+
+def create_objects(model, objects):
+    """
+    Вставляет объекты пакетами.
+
+    Если база не возвращает id после пакетной вставки, объекты
+    сохраняются по одному, чтобы у них появились первичные ключи.
+    """
+    if connection.features.can_return_ids_from_bulk_insert:
+        return model.objects.bulk_create(objects, batch_size=batch_size())
+    for instance in objects:
+        instance.save(force_insert=True)
+    return objects
+
+
+def resolve(queryset, field, values):
+    """Словарь {значение field: pk} для всего пакета одним запросом."""
+    if not values:
+        return {}
+    return dict(
+        queryset.filter(**{f"{field}__in": values}).values_list(field, "pk")
+    )
+
+
+def existing_ids(queryset, values):
+    """Множество id из values, для которых есть объекты, одним запросом."""
+    if not values:
+        return set()
+    return set(queryset.filter(pk__in=values).values_list("pk", flat=True))
+
+
+class BulkWriter:
+    """
+    Пакетное создание и изменение объектов.
+
+    Элементы без id создаются, с id — частично обновляются. Все элементы
+    проверяются за один проход, ссылки на связанные объекты разрешаются
+    одним запросом на пакет, а корректные элементы записываются
+    bulk_create/bulk_update в одной транзакции. Ошибочные элементы
+    не записываются и возвращаются в результате со списком ошибок.
+    """
+
+    model = None
+    serializer_class = None
+    update_fields = ()
+    cache_tags = ()
+
+    def __init__(self, user):
+        self.user = user
+
+    def get_queryset(self):
+        return self.model.objects.all()
+
+    def check_items(self, items):
+        if not isinstance(items, list):
+            raise ValidationError("Ожидается список объектов.")
+        if len(items) > settings.BULK_MAX_ITEMS:
+            raise ValidationError(
+                f"За один запрос можно передать не больше "
+                f"{settings.BULK_MAX_ITEMS} объектов."
+            )
+
+    def write(self, items):
+        """Записывает пакет и возвращает результат по каждому элементу."""
+        self.check_items(items)
+        self.results = [{"index": index} for index in range(len(items))]
+        valid = self.validate(items)
+        self.load(valid)
+
+        created, updated, seen = [], [], set()
+        for index, data in valid:
+            instance = self.get_instance(index, data, seen)
+            if instance is None:
+                continue
+            try:
+                self.build(data, instance)
+            except ValidationError as error:
+                self.fail(index, error.detail)
+                continue
+            if "id" in data:
+                updated.append((index, instance))
+            else:
+                created.append((index, instance))
+
+        if created or updated:
+            self.save(
+                [instance for _, instance in created],
+                [instance for _, instance in updated],
+            )
+        for status, pairs in ((CREATED, created), (UPDATED, updated)):
+            for index, instance in pairs:
+                self.results[index].update(status=status, id=instance.pk)
+        return self.results
+
+    def get_instance(self, index, data, seen):
+        pk = data.get("id")
+        if pk is None:
+            return self.model()
+        if pk in seen:
+            self.fail(index, {"id": ["Объект повторяется в пакете."]})
+            return None
+        seen.add(pk)
+        if pk not in self.existing:
+            self.fail(index, {"id": ["Объект не найден."]})
+            return None
+        return self.existing[pk]
+
+    def validate(self, items):
+        valid = []
+        for index, item in enumerate(items):
+            serializer = self.serializer_class(
+                data=item, partial=isinstance(item, dict) and "id" in item
+            )
+            if serializer.is_valid():
+                valid.append((index, serializer.validated_data))
+            else:
+                self.fail(index, serializer.errors)
+        return valid
+
+    def fail(self, index, errors):
+        self.results[index].update(status=ERROR, errors=errors)
+
+    def load(self, valid):
+        """Загружает всё, что нужно для build, запросами на весь пакет."""
+        ids = [data["id"] for _, data in valid if "id" in data]
+        self.existing = self.get_queryset().in_bulk(ids) if ids else {}
+
+    def build(self, data, instance):
+        """Переносит данные элемента в объект или бросает ValidationError."""
+        raise NotImplementedError
+
+    def save(self, created, updated):
+        with transaction.atomic():
+            create_objects(self.model, created)
+            if updated:
+                # bulk_update не заполняет поля auto_now.
+                now = timezone.now()
+                for instance in updated:
+                    instance.updated_at = now
+                self.model.objects.bulk_update(
+                    updated,
+                    (*self.update_fields, "updated_at"),
+                    batch_size=batch_size(),
+                )
+            self.after_save(created, updated)
+            # Сигналы post_save при пакетной записи не отправляются,
+            # поэтому кэш ответов сбрасывается здесь.
+            invalidate_tags(*self.cache_tags)
+            transaction.on_commit(lambda: invalidate_tags(*self.cache_tags))
+
+    def after_save(self, created, updated):
+        pass
+
+    def resolve_author(self, data):
+        username = data.get("author")
+        if username is None:
+            return self.user.pk
+        if username not in self.authors:
+            raise ValidationError(
+                {"author": [f"Пользователь {username} не найден."]}
+            )
+        return self.authors[username]
+
+    def load_authors(self, valid):
+        self.authors = resolve(
+            User.objects.all(),
+            "username",
+            {data["author"] for _, data in valid if "author" in data},
+        )
+
+    def reject_moved(self, data, fields):
+        moved = [field for field in fields if field in data]
+        if moved:
+            raise ValidationError({
+                field: ["Поле нельзя изменить у существующего объекта."]
+                for field in moved
+            })
+
+
+class TitleWriter(BulkWriter):
+    model = Title
+    serializer_class = TitleBulkSerializer
+    update_fields = ("name", "year", "description", "category", "genre_ids")
+    cache_tags = ("titles",)
+
+    def get_queryset(self):
+        return Title.objects.defer("search_vector")
+
+    def load(self, valid):
+        super().load(valid)
+        self.genres = GENRES.resolve(
+            {slug for _, data in valid for slug in data.get("genre", ())}
+        )
+        self.categories = CATEGORIES.resolve(
+            {data["category"] for _, data in valid if data.get("category")}
+        )
+
+    def build(self, data, instance):
+        errors = {}
+        unknown = sorted(set(data.get("genre", ())) - self.genres.keys())
+        if unknown:
+            errors["genre"] = [f"Жанр {slug} не найден." for slug in unknown]
+        category = data.get("category")
+        if category and category not in self.categories:
+            errors["category"] = [f"Категория {category} не найдена."]
+        if errors:
+            raise ValidationError(errors)
+        for field in ("name", "year", "description"):
+            if field in data:
+                setattr(instance, field, data[field])
+        if "category" in data:
+            instance.category_id = self.categories.get(category)
+        if "genre" in data:
+            instance._bulk_genres = [
+                self.genres[slug] for slug in dict.fromkeys(data["genre"])
+            ]
+            # Сигнал m2m_changed при пакетной записи не отправляется.
+            instance.genre_ids = sorted(instance._bulk_genres)
+
+    def after_save(self, created, updated):
+        through = Title.genre.through
+        with_genres = [
+            title for title in created + updated
+            if hasattr(title, "_bulk_genres")
+        ]
+        through.objects.filter(
+            title_id__in=[
+                title.pk for title in updated
+                if hasattr(title, "_bulk_genres")
+            ]
+        ).delete()
+        through.objects.bulk_create(
+            [
+                through(title_id=title.pk, genre_id=genre_id)
+                for title in with_genres
+                for genre_id in title._bulk_genres
+            ],
+            batch_size=batch_size(),
+        )
+
+
+class ReviewWriter(BulkWriter):
+    """
+    Пакетная запись отзывов.
+
+    Ограничение unique-review проверяется одним запросом: заранее
+    выбираются уже существующие пары (произведение, автор) пакета.
+    """
+
+    model = Review
+    serializer_class = ReviewBulkSerializer
+    update_fields = ("text", "score")
+    cache_tags = ("titles", "reviews")
+
+    def load(self, valid):
+        super().load(valid)
+        self.load_authors(valid)
+        self.titles = existing_ids(
+            Title.objects.all(),
+            {data["title"] for _, data in valid if "id" not in data},
+        )
+        author_ids = set(self.authors.values()) | {self.user.pk}
+        self.reviewed = set(
+            Review.objects.filter(
+                title_id__in=self.titles, author_id__in=author_ids
+            ).values_list("title_id", "author_id")
+        ) if self.titles else set()
+
+    def build(self, data, instance):
+        if instance.pk is not None:
+            self.reject_moved(data, ("title", "author"))
+        else:
+            author_id = self.resolve_author(data)
+            if data["title"] not in self.titles:
+                raise ValidationError(
+                    {"title": [f"Произведение {data['title']} не найдено."]}
+                )
+            pair = (data["title"], author_id)
+            if pair in self.reviewed:
+                raise ValidationError(
+                    "Автор уже оставлял отзыв на это произведение."
+                )
+            self.reviewed.add(pair)
+            instance.title_id, instance.author_id = pair
+        for field in ("text", "score"):
+            if field in data:
+                setattr(instance, field, data[field])
+
+    def after_save(self, created, updated):
+        title_ids = {review.title_id for review in created + updated}
+        titles = Title.objects.filter(pk__in=title_ids)
+        rebuild_ratings(titles)
+        rebuild_score_stats(titles)
+
+
+class CommentWriter(BulkWriter):
+    model = Comment
+    serializer_class = CommentBulkSerializer
+    update_fields = ("text",)
+    cache_tags = ("comments",)
+
+    def load(self, valid):
+        super().load(valid)
+        self.load_authors(valid)
+        self.reviews = existing_ids(
+            Review.objects.all(),
+            {data["review"] for _, data in valid if "id" not in data},
+        )
+
+    def build(self, data, instance):
+        if instance.pk is not None:
+            self.reject_moved(data, ("review", "author"))
+        else:
+            instance.author_id = self.resolve_author(data)
+            if data["review"] not in self.reviews:
+                raise ValidationError(
+                    {"review": [f"Отзыв {data['review']} не найден."]}
+                )
+            instance.review_id = data["review"]
+        if "text" in data:
+            instance.text = data["text"]
+
+    def after_save(self, created, updated):
+        touch(Review.objects.filter(
+            pk__in={comment.review_id for comment in created + updated}
+        ))
@@ -0,0 +1,268 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import (http_date, parse_etags, parse_http_date_safe,
+                               quote_etag)
+from rest_framework import status
+from rest_framework.exceptions import APIException, Throttled
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from .metrics import RESPONSE_CACHE
+
+CACHE_PREFIX = "api-cache"
+CACHEABLE_ACTIONS = ("list", "retrieve")
+
+stats = RESPONSE_CACHE.values
+
+
+def get_cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def _tag_key(tag):
+    return f"{CACHE_PREFIX}:tag:{tag}"
+
+
+def invalidate_tags(*tags):
+    """Сбрасывает закэшированные ответы, зависящие от тегов."""
+    now = time.time()
+    get_cache().set_many({_tag_key(tag): now for tag in tags}, None)
+    stats["invalidations"] += len(tags)
+
+
+def get_tag_versions(tags):
+    """Возвращает метки времени последнего изменения для тегов."""
+    cache = get_cache()
+    keys = {_tag_key(tag): tag for tag in tags}
+    versions = cache.get_many(keys)
+    missing = {key: time.time() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return tuple(versions[key] for key in keys)
+
+
+def make_response_key(request, versions):
+    """Ключ ответа: путь, отсортированные параметры, Accept и теги."""
+    params = sorted(
+        (key, value)
+        for key, values in request.GET.lists()
+        for value in values
+    )
+    raw = "|".join((
+        request.path,
+        repr(params),
+        request.META.get("HTTP_ACCEPT", ""),
+        repr(versions),
+    ))
+    return f"{CACHE_PREFIX}:response:{hashlib.md5(raw.encode()).hexdigest()}"
+
+
+def is_not_modified(request, etag, last_modified):
+    if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+    if if_none_match:
+        etags = parse_etags(if_none_match)
+        return "*" in etags or etag in etags
+    if_modified_since = parse_http_date_safe(
+        request.META.get("HTTP_IF_MODIFIED_SINCE", "")
+    )
+    return (
+        if_modified_since is not None
+        and int(last_modified) <= if_modified_since
+    )
+
+
+class ResponseCacheMixin:
+    """
+    Кэширует ответы анонимным пользователям на чтение списков и объектов.
+
+    Ответ зависит от тегов cache_tags: изменение любой модели из тегов
+    сбрасывает все закэшированные ответы вьюсета. К ответам добавляются
+    ETag и Last-Modified, условные запросы получают 304. Лимиты частоты
+    проверяются и для ответов из кэша.
+    """
+
+    cache_tags = ()
+    cache_actions = CACHEABLE_ACTIONS
+
+    def is_cacheable(self, request):
+        return (
+            request.method == "GET"
+            and self.action_map.get("get") in self.cache_actions
+            and "HTTP_AUTHORIZATION" not in request.META
+        )
+
+    def check_throttles(self, request):
+        # Для кэшируемых запросов лимиты уже проверены в dispatch.
+        if not getattr(self, "throttles_checked", False):
+            super().check_throttles(request)
+
+    def throttle_cacheable(self, request, *args, **kwargs):
+        """
+        Проверяет лимиты до поиска ответа в кэше, иначе повторы одного
+        адреса получали бы закэшированный ответ без ограничения.
+        Возвращает ответ 429 или None.
+        """
+        self.args, self.kwargs = args, kwargs
+        self.request = self.initialize_request(request, *args, **kwargs)
+        self.headers = self.default_response_headers
+        try:
+            self.check_throttles(self.request)
+        except Throttled as exc:
+            return self.finalize_response(
+                self.request, self.handle_exception(exc), *args, **kwargs
+            )
+        self.throttles_checked = True
+        return None
+
+    def dispatch(self, request, *args, **kwargs):
+        if not self.is_cacheable(request):
+            return super().dispatch(request, *args, **kwargs)
+        throttled = self.throttle_cacheable(request, *args, **kwargs)
+        if throttled is not None:
+            return throttled
+
+        cache = get_cache()
+        versions = get_tag_versions(self.cache_tags)
+        key = make_response_key(request, versions)
+        cached = cache.get(key)
+        response = None
+        if cached is None:
+            stats["misses"] += 1
+            response = super().dispatch(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            response.render()
+            # Валидаторы, выданные вьюсетом (ConditionalDetailMixin),
+            # сохраняются: анонимный и авторизованный клиенты получают
+            # один ETag для одного состояния объекта.
+            cached = {
+                "content": response.content,
+                "content_type": response["Content-Type"],
+                "etag": response.get("ETag") or quote_etag(
+                    hashlib.md5(response.content).hexdigest()
+                ),
+                "last_modified": parse_http_date_safe(
+                    response.get("Last-Modified", "")
+                ) or max(versions, default=time.time()),
+            }
+            cache.set(key, cached, settings.API_CACHE_TIMEOUT)
+        else:
+            stats["hits"] += 1
+
+        if is_not_modified(request, cached["etag"], cached["last_modified"]):
+            response = HttpResponseNotModified()
+        elif response is None:
+            response = HttpResponse(
+                cached["content"], content_type=cached["content_type"]
+            )
+        response["ETag"] = cached["etag"]
+        response["Last-Modified"] = http_date(cached["last_modified"])
+        patch_vary_headers(response, ("Accept", "Authorization"))
+        return response
+
+
+class PreconditionFailedError(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = (
+        "Объект изменился после получения ETag: запросите его заново."
+    )
+    default_code = "precondition_failed"
+
+
+class ConditionalDetailMixin:
+    """
+    Условные запросы к отдельному объекту по его полю updated_at.
+
+    До основного запроса читается только updated_at объекта — один
+    запрос по первичному ключу. GET с совпавшим If-None-Match или
+    If-Modified-Since получает 304 без чтения объекта и сериализации.
+    PUT, PATCH и DELETE с If-Match, не совпавшим с текущим ETag,
+    получают 412: строка объекта блокируется до конца записи, поэтому
+    два клиента не перезапишут изменения друг друга.
+
+    ETag зависит и от тегов validator_tags: так ответ произведения
+    меняется при переименовании жанра или категории.
+    """
+
+    validator_tags = ()
+
+    def get_validator_queryset(self):
+        return self.get_queryset()
+
+    def get_validator(self, lock=False):
+        """(ETag, Last-Modified) объекта или None, если его нет."""
+        lookup = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+        queryset = self.get_validator_queryset()
+        if lock:
+            queryset = queryset.select_for_update()
+        try:
+            updated_at = queryset.filter(pk=lookup).values_list(
+                "updated_at", flat=True
+            ).first()
+        except (TypeError, ValueError):
+            return None
+        if updated_at is None:
+            return None
+        versions = get_tag_versions(self.validator_tags)
+        raw = "|".join((
+            queryset.model._meta.label,
+            str(lookup),
+            updated_at.isoformat(),
+            repr(versions),
+        ))
+        return (
+            quote_etag(hashlib.md5(raw.encode()).hexdigest()),
+            max((updated_at.timestamp(), *versions)),
+        )
+
+    def with_validator(self, response, validator):
+        if validator is not None and response.status_code < 300:
+            response["ETag"] = validator[0]
+            response["Last-Modified"] = http_date(validator[1])
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        validator = self.get_validator()
+        if validator is not None and is_not_modified(request, *validator):
+            return self.with_validator(
+                Response(status=status.HTTP_304_NOT_MODIFIED), validator
+            )
+        return self.with_validator(
+            super().retrieve(request, *args, **kwargs), validator
+        )
+
+    def check_if_match(self, request):
+        """Бросает PreconditionFailedError, если объект уже изменён."""
+        etags = parse_etags(request.META["HTTP_IF_MATCH"])
+        validator = self.get_validator(lock=True)
+        if (
+            validator is not None
+            and "*" not in etags
+            and validator[0] not in etags
+        ):
+            raise PreconditionFailedError
+
+    def check_object_permissions(self, request, obj):
+        # If-Match проверяется после прав: чужой объект — всё равно 403.
+        super().check_object_permissions(request, obj)
+        if (
+            request.method not in SAFE_METHODS
+            and "HTTP_IF_MATCH" in request.META
+        ):
+            self.check_if_match(request)
+
+    def update(self, request, *args, **kwargs):
+        with transaction.atomic():
+            response = super().update(request, *args, **kwargs)
+        return self.with_validator(response, self.get_validator())
+
+    def destroy(self, request, *args, **kwargs):
+        with transaction.atomic():
+            return super().destroy(request, *args, **kwargs)
@@ -0,0 +1,152 @@
+import sys
+import time
+from threading import Lock
+
+from django.conf import settings
+from django.db import DatabaseError
+from rest_framework import serializers
+from reviews.models import Category, Genre
+
+from .cache import get_tag_versions
+
+
+class Catalog:
+    """
+    Копия небольшого справочника в памяти процесса: объекты по id
+    и по слагу.
+
+    Версия копии — метка тега кэша ответов, которую сигналы обновляют
+    при каждом изменении модели (api.signals). Пока метка в общем кэше
+    не изменилась, справочник не читается из базы, но не дольше
+    CATALOG_TTL секунд: так изменение, пропущенное кэшем, доходит до
+    воркера с задержкой, а не остаётся навсегда. Объекты общие для
+    всех потоков, изменять их нельзя.
+    """
+
+    def __init__(self, model, tag):
+        self.model = model
+        self.tag = tag
+        self.lock = Lock()
+        self.version = None
+        self.expires = 0
+        # (по id, по слагу) — заменяются целиком одним присваиванием.
+        # Словарь по id упорядочен как Meta.ordering модели.
+        self.entries = ({}, {})
+        self.loads = 0
+
+    def __deepcopy__(self, memo):
+        # Поля сериализаторов копируются вместе с аргументами, а
+        # справочник один на процесс.
+        return self
+
+    def snapshot(self):
+        """
+        Актуальная копия: (по id, по слагу). Проверка версии — одно
+        чтение из кэша, поэтому снимок берут один раз на ответ.
+        """
+        version = get_tag_versions((self.tag,))[0]
+        if version == self.version and time.monotonic() < self.expires:
+            return self.entries
+        with self.lock:
+            if version != self.version or time.monotonic() >= self.expires:
+                objects = list(self.model.objects.all())
+                self.entries = (
+                    {obj.pk: obj for obj in objects},
+                    {obj.slug: obj for obj in objects},
+                )
+                self.version = version
+                self.expires = time.monotonic() + settings.CATALOG_TTL
+                self.loads += 1
+            return self.entries
+
+    def get_by_slug(self, slug):
+        return self.snapshot()[1].get(slug)
+
+    def resolve(self, slugs):
+        """Словарь {слаг: pk} для найденных слагов — как api.bulk.resolve."""
+        by_slug = self.snapshot()[1]
+        return {slug: by_slug[slug].pk for slug in slugs if slug in by_slug}
+
+    def stats(self):
+        """Размер копии; байты — оценка по sys.getsizeof."""
+        by_id, by_slug = self.entries
+        size = sys.getsizeof(by_id) + sys.getsizeof(by_slug)
+        for obj in by_id.values():
+            size += sys.getsizeof(obj) + sys.getsizeof(obj.__dict__)
+            size += sum(map(sys.getsizeof, obj.__dict__.values()))
+        return {
+            "model": self.model._meta.label,
+            "version": self.version,
+            "entries": len(by_id),
+            "bytes": size,
+            "loads": self.loads,
+        }
+
+
+CATEGORIES = Catalog(Category, "categories")
+GENRES = Catalog(Genre, "genres")
+CATALOGS = (CATEGORIES, GENRES)
+
+
+def warm_catalogs():
+    """
+    Загружает справочники при старте воркера. До первой миграции
+    таблиц нет — тогда они загрузятся при первом обращении.
+    """
+    for catalog in CATALOGS:
+        try:
+            catalog.snapshot()
+        except DatabaseError:
+            return
+
+
+class CatalogField(serializers.Field):
+    """
+    Вложенный объект справочника, найденный по внешнему ключу без
+    соединения таблиц. Источник — столбец ключа, например category_id,
+    или список ключей (genre_ids): тогда отдаётся список объектов в
+    порядке сортировки модели.
+    """
+
+    def __init__(self, catalog, serializer_class, **kwargs):
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+        self.catalog = catalog
+        self.serializer_class = serializer_class
+        self.by_id = None
+
+    def to_representation(self, value):
+        # Поле живёт одну сериализацию: снимка хватает на весь список.
+        if self.by_id is None:
+            self.by_id = self.catalog.snapshot()[0]
+        if isinstance(value, list):
+            wanted = set(value)
+            return self.serializer_class(
+                [obj for pk, obj in self.by_id.items() if pk in wanted],
+                many=True,
+            ).data
+        obj = self.by_id.get(value)
+        return None if obj is None else self.serializer_class(obj).data
+
+
+class CatalogSlugRelatedField(serializers.SlugRelatedField):
+    """SlugRelatedField, который ищет объект в справочнике процесса."""
+
+    def __init__(self, catalog, **kwargs):
+        kwargs.setdefault("slug_field", "slug")
+        kwargs.setdefault("queryset", catalog.model.objects.all())
+        super().__init__(**kwargs)
+        self.catalog = catalog
+        self.by_slug = None
+
+    def to_internal_value(self, data):
+        if not isinstance(data, str):
+            self.fail("invalid")
+        if self.by_slug is None:
+            self.by_slug = self.catalog.snapshot()[1]
+        obj = self.by_slug.get(data)
+        if obj is None:
+            self.fail(
+                "does_not_exist", slug_name=self.slug_field, value=data
+            )
+        return obj
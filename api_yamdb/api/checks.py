@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+from api_yamdb.caches import is_shared
+
+# Настройки с псевдонимами кэшей, через которые процессы обмениваются
+# состоянием: без общего кэша каждый воркер видит только свои записи.
+SHARED_CACHE_SETTINGS = (
+    "API_CACHE_ALIAS", "JWT_REVOCATION_CACHE", "REPLICA_STICKY_CACHE"
+)
+
+
+@register(Tags.caches)
+def check_shared_caches(app_configs, **kwargs):
+    return [
+        Warning(
+            f"Кэш {getattr(settings, name)!r} ({name}) хранится в памяти "
+            f"процесса, а WEB_CONCURRENCY={settings.WEB_CONCURRENCY}.",
+            hint="Укажите общий CACHE_BACKEND, например memcached.",
+            id="api.W001",
+        )
+        for name in SHARED_CACHE_SETTINGS
+        if not is_shared(getattr(settings, name))
+    ]
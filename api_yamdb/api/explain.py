@@ -0,0 +1,160 @@
+import re
+
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from reviews.models import Comment, Review
+
+SEQUENTIAL_SCANS = {
+    "postgresql": re.compile(r"Seq Scan on (\w+)"),
+    "sqlite": re.compile(r"\bSCAN (?:TABLE )?(\w+)\b(?! USING)"),
+}
+SORTS = {
+    "postgresql": re.compile(r"\bSort\s+\("),
+    "sqlite": re.compile(r"USE TEMP B-TREE FOR (?:ORDER BY|GROUP BY)"),
+}
+TABLES = re.compile(r'(?:FROM|JOIN) "(\w+)"')
+
+
+def explain(sql):
+    """План запроса в текстовом виде, по строке на узел."""
+    with connection.cursor() as cursor:
+        cursor.execute(f"{connection.ops.explain_query_prefix()} {sql}")
+        return "\n".join(str(row[-1]) for row in cursor.fetchall())
+
+
+def table_size(table, sizes):
+    """Число строк таблицы; sizes — кэш на время одного аудита."""
+    if table not in sizes:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT COUNT(*) FROM {connection.ops.quote_name(table)}"
+            )
+            sizes[table] = cursor.fetchone()[0]
+    return sizes[table]
+
+
+def find_issues(sql, plan, min_rows, sizes, vendor=None):
+    """
+    Полные просмотры больших таблиц и сортировки страниц без индекса.
+
+    COUNT(*) для постраничной пагинации всегда читает всю выборку,
+    поэтому такие запросы не проверяются.
+    """
+    vendor = vendor or connection.vendor
+    if vendor not in SEQUENTIAL_SCANS or sql.startswith("SELECT COUNT(*)"):
+        return []
+    issues = [
+        f"полный просмотр {table} ({table_size(table, sizes)} строк)"
+        for table in SEQUENTIAL_SCANS[vendor].findall(plan)
+        if table_size(table, sizes) >= min_rows
+    ]
+    # Сортировка страницы с LIMIT упорядочивает всю отобранную выборку;
+    # сортировка без LIMIT (prefetch) касается только возвращаемых строк.
+    if " LIMIT " in sql and SORTS[vendor].search(plan):
+        large = [
+            table for table in dict.fromkeys(TABLES.findall(sql))
+            if table_size(table, sizes) >= min_rows
+        ]
+        if large:
+            issues.append(f"сортировка без индекса: {', '.join(large)}")
+    return issues
+
+
+def busiest(model, field):
+    """Объект с наибольшим числом записей в ленте — худший случай."""
+    row = (
+        model.objects.values(field)
+        .annotate(total=Count("id"))
+        .order_by("-total")
+        .first()
+    )
+    return row and row[field]
+
+
+def sample_kwargs(prefix):
+    names = re.findall(r"\(\?P<(\w+)>", prefix)
+    if "review_id" in names:
+        review_id = busiest(Comment, "review_id")
+        if review_id is None:
+            return None
+        return {
+            "review_id": review_id,
+            "title_id": Review.objects.values_list(
+                "title_id", flat=True
+            ).get(pk=review_id),
+        }
+    if "title_id" in names:
+        title_id = busiest(Review, "title_id")
+        return None if title_id is None else {"title_id": title_id}
+    return {}
+
+
+def sample_filters(viewset):
+    """Для каждого фильтра вьюсета — параметр с существующим значением."""
+    filterset_class = getattr(viewset, "filterset_class", None)
+    if filterset_class is None:
+        return []
+    model = filterset_class._meta.model
+    shapes = []
+    for name, declared in filterset_class.base_filters.items():
+        value = (
+            model.objects.exclude(**{f"{declared.field_name}__isnull": True})
+            .values_list(declared.field_name, flat=True)
+            .first()
+        )
+        if value is not None:
+            shapes.append({name: value})
+    return shapes
+
+
+def list_queries(viewset, kwargs, params):
+    """SQL-запросы, которые выполняет действие list вьюсета."""
+    request = Request(APIRequestFactory().get("/", params))
+    view = viewset(
+        action="list",
+        request=request,
+        args=(),
+        kwargs=kwargs,
+        format_kwarg=None,
+    )
+    with CaptureQueriesContext(connection) as captured:
+        queryset = view.filter_queryset(view.get_queryset())
+        page = view.paginate_queryset(queryset)
+        view.get_serializer(
+            queryset if page is None else page, many=True
+        ).data
+    return [
+        query["sql"]
+        for query in captured.captured_queries
+        if query["sql"].startswith("SELECT")
+    ]
+
+
+def audit(registry, min_rows):
+    """
+    Выполняет списки всех зарегистрированных вьюсетов — без фильтров
+    и с каждым фильтром по отдельности — и разбирает планы их запросов.
+
+    Возвращает список (эндпоинт, параметры, SQL, план, замечания).
+    """
+    results, sizes = [], {}
+    for prefix, viewset, basename in registry:
+        if not hasattr(viewset, "list"):
+            continue
+        kwargs = sample_kwargs(prefix)
+        if kwargs is None:
+            continue
+        for params in [{}, *sample_filters(viewset)]:
+            for sql in list_queries(viewset, kwargs, params):
+                plan = explain(sql)
+                results.append((
+                    basename,
+                    params,
+                    sql,
+                    plan,
+                    find_issues(sql, plan, min_rows, sizes),
+                ))
+    return results
@@ -1,20 +1,80 @@
 from django_filters import rest_framework as filters
+from rest_framework.filters import BaseFilterBackend
 from reviews.models import Title
 
+from .catalog import CATEGORIES, GENRES
+from .permissions import editable_by
+
+
+def split_slugs(value):
+    return [slug.strip() for slug in value.split(",") if slug.strip()]
+
 
 class TitleFilter(filters.FilterSet):
     """Фильтр объектов класса Title."""
 
-    genre = filters.CharFilter(field_name="genre__slug")
-    category = filters.CharFilter(field_name="category__slug")
+    genre = filters.CharFilter(
+        field_name="genre__slug", method="by_all_genres"
+    )
+    genre_any = filters.CharFilter(
+        field_name="genre__slug", method="by_any_genre"
+    )
+    category = filters.CharFilter(
+        field_name="category__slug", method="by_category"
+    )
     name = filters.CharFilter(field_name="name", lookup_expr="icontains")
     year = filters.NumberFilter(field_name="year")
+    rating_min = filters.NumberFilter(field_name="rating", lookup_expr="gte")
+    rating_max = filters.NumberFilter(field_name="rating", lookup_expr="lte")
 
     class Meta:
         model = Title
         fields = (
             "genre",
+            "genre_any",
             "category",
             "name",
             "year",
+            "rating_min",
+            "rating_max",
         )
+
+    def by_category(self, queryset, name, value):
+        """
+        Слаг переводится в id по справочнику процесса: фильтр идёт
+        по внешнему ключу без соединения с таблицей категорий.
+        """
+        category = CATEGORIES.get_by_slug(value)
+        if category is None:
+            return queryset.none()
+        return queryset.filter(category=category.pk)
+
+    def by_all_genres(self, queryset, name, value):
+        """
+        ?genre=drama,comedy — произведения со всеми перечисленными
+        жанрами. Проверяется Title.genre_ids без соединения таблиц.
+        """
+        slugs = set(split_slugs(value))
+        ids = GENRES.resolve(slugs)
+        if len(ids) < len(slugs):
+            return queryset.none()
+        return queryset.filter(genre_ids__contains=list(ids.values()))
+
+    def by_any_genre(self, queryset, name, value):
+        """?genre_any=drama,comedy — хотя бы с одним из жанров."""
+        ids = GENRES.resolve(split_slugs(value))
+        if not ids:
+            return queryset.none()
+        return queryset.filter(genre_ids__overlap=list(ids.values()))
+
+
+class EditableFilter(BaseFilterBackend):
+    """
+    ?editable=true оставляет в списке только объекты, которые
+    пользователь может изменять: отбор по author_id и роли в SQL.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        if request.query_params.get("editable") in ("1", "true"):
+            return editable_by(request.user, queryset)
+        return queryset
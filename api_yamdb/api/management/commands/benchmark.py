@@ -0,0 +1,198 @@
+import os
+from dataclasses import asdict
+
+from api.catalog import warm_catalogs
+from benchmarks.concurrency import compare_modes
+from benchmarks.data import DatasetSize, generate_dataset
+from benchmarks.genres import compare_genre_filters
+from benchmarks.runner import (build_scenarios, compare, load_baseline,
+                               run_scenario, save_baseline)
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management import BaseCommand, CommandError
+from django.test.utils import (override_settings, setup_databases,
+                               teardown_databases)
+
+DEFAULT_BASELINE = os.path.join(
+    settings.BASE_DIR, "benchmarks", "baseline.json"
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Нагрузочный прогон API v1 на сгенерированных данных во временной "
+        "базе со сравнением с сохранённым эталоном."
+    )
+
+    def add_arguments(self, parser):
+        defaults = DatasetSize()
+        for name in ("titles", "users", "reviews", "comments"):
+            parser.add_argument(
+                f"--{name}",
+                type=int,
+                default=getattr(defaults, name),
+                help="Размер набора данных.",
+            )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=200,
+            help="Сколько запросов выполнить в каждом сценарии.",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--baseline",
+            default=DEFAULT_BASELINE,
+            help="Файл с эталонными результатами.",
+        )
+        parser.add_argument(
+            "--save-baseline",
+            action="store_true",
+            help="Сохранить результаты прогона как новый эталон.",
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.5,
+            help="Допустимый рост p95 относительно эталона, в долях.",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=0,
+            help=(
+                "Сравнить синхронный и ASGI-режим при таком числе "
+                "одновременных запросов. 0 — не сравнивать."
+            ),
+        )
+        parser.add_argument(
+            "--asgi-threads",
+            type=int,
+            default=settings.ASGI_THREADS,
+            help="Размер пула потоков ASGI-приложения.",
+        )
+        parser.add_argument(
+            "--db-latency-ms",
+            type=float,
+            default=2.0,
+            help="Искусственная задержка каждого SQL-запроса при сравнении.",
+        )
+        parser.add_argument(
+            "--genre-filters",
+            type=int,
+            default=0,
+            help=(
+                "Сравнить фильтры по жанрам через соединение таблиц и по "
+                "genre_ids, выполнив каждый столько раз. 0 — не сравнивать."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        size = DatasetSize(
+            titles=options["titles"],
+            users=options["users"],
+            reviews=options["reviews"],
+            comments=options["comments"],
+        )
+        results, modes, genre_filters = self.run(size, options)
+        self.report(results)
+        if modes:
+            self.report_modes(modes)
+        if genre_filters:
+            self.report_genre_filters(genre_filters)
+
+        if options["save_baseline"]:
+            save_baseline(options["baseline"], asdict(size), results)
+            self.stdout.write(
+                self.style.SUCCESS(f"Эталон сохранён: {options['baseline']}")
+            )
+            return
+        if not os.path.exists(options["baseline"]):
+            self.stdout.write("Эталон не найден, сравнение пропущено.")
+            return
+        baseline = load_baseline(options["baseline"])
+        if baseline["dataset"] != asdict(size):
+            self.stdout.write(
+                self.style.WARNING(
+                    "Эталон снят на другом наборе данных: "
+                    f"{baseline['dataset']}"
+                )
+            )
+        regressions = compare(
+            results, baseline["results"], options["tolerance"]
+        )
+        for regression in regressions:
+            self.stdout.write(self.style.ERROR(regression))
+        if regressions:
+            raise CommandError(f"Найдено регрессий: {len(regressions)}")
+        self.stdout.write(self.style.SUCCESS("Регрессий не найдено."))
+
+    def run(self, size, options):
+        """Сценарии и необязательные сравнения во временной базе."""
+        old_config = setup_databases(verbosity=0, interactive=False)
+        # Сценарии записи шлют сотни запросов от одного клиента.
+        unthrottled = override_settings(REST_FRAMEWORK=dict(
+            settings.REST_FRAMEWORK, DEFAULT_THROTTLE_RATES={}
+        ))
+        unthrottled.enable()
+        try:
+            caches[settings.API_CACHE_ALIAS].clear()
+            users, titles = generate_dataset(size, seed=options["seed"])
+            # Как при старте воркера, см. post_worker_init в gunicorn.conf.py.
+            warm_catalogs()
+            results = {
+                scenario.name: run_scenario(scenario, options["requests"])
+                for scenario in build_scenarios(users, titles)
+            }
+            modes = options["concurrency"] and compare_modes(
+                users,
+                titles,
+                options["requests"],
+                options["concurrency"],
+                options["asgi_threads"],
+                options["db_latency_ms"] / 1000,
+            )
+            genre_filters = options["genre_filters"] and (
+                compare_genre_filters(options["genre_filters"])
+            )
+        finally:
+            unthrottled.disable()
+            teardown_databases(old_config, verbosity=0)
+        return results, modes, genre_filters
+
+    def report(self, results):
+        self.stdout.write(
+            f"{'сценарий':<24}{'RPS':>9}{'p50':>9}{'p95':>9}{'p99':>9}"
+            f"{'SQL':>6}{'ошибок':>8}"
+        )
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<24}{result['throughput']:>9.1f}"
+                f"{result['p50_ms']:>9.1f}{result['p95_ms']:>9.1f}"
+                f"{result['p99_ms']:>9.1f}{result['queries']:>6}"
+                f"{result['errors']:>8}"
+            )
+
+    def report_modes(self, modes):
+        self.stdout.write("")
+        self.stdout.write(
+            f"{'режим':<24}{'параллельно':>12}{'RPS':>9}{'p50':>9}"
+            f"{'p95':>9}{'ошибок':>8}"
+        )
+        for name, result in modes.items():
+            self.stdout.write(
+                f"{name:<24}{result['concurrency']:>12}"
+                f"{result['throughput']:>9.1f}{result['p50_ms']:>9.1f}"
+                f"{result['p95_ms']:>9.1f}{result['errors']:>8}"
+            )
+
+    def report_genre_filters(self, results):
+        self.stdout.write("")
+        self.stdout.write(
+            f"{'фильтр':<24}{'строк':>9}{'p50':>9}{'p95':>9}"
+        )
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<24}{result['rows']:>9}"
+                f"{result['p50_ms']:>9.2f}{result['p95_ms']:>9.2f}"
+            )
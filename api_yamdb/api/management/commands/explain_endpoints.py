@@ -0,0 +1,53 @@
+from api.explain import audit
+from api.urls import v1_router
+from django.core.management import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Выполняет EXPLAIN для запросов каждого спискового эндпоинта API v1 "
+        "и отмечает полные просмотры и сортировки больших таблиц."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-rows",
+            type=int,
+            default=1000,
+            help="Таблица считается большой начиная с этого числа строк.",
+        )
+        parser.add_argument(
+            "--plans",
+            action="store_true",
+            help="Выводить SQL и план каждого запроса.",
+        )
+        parser.add_argument(
+            "--fail",
+            action="store_true",
+            help="Завершиться с ошибкой, если найдены замечания.",
+        )
+
+    def handle(self, *args, **options):
+        results = audit(v1_router.registry, options["min_rows"])
+        flagged = 0
+        for basename, params, sql, plan, issues in results:
+            shape = basename + "".join(
+                f"?{name}={value}" for name, value in params.items()
+            )
+            if not (issues or options["plans"]):
+                continue
+            flagged += bool(issues)
+            self.stdout.write(
+                self.style.WARNING(f"{shape}:") if issues else f"{shape}:"
+            )
+            for issue in issues:
+                self.stdout.write(f"  {issue}")
+            self.stdout.write(f"  {sql}")
+            for line in plan.splitlines():
+                self.stdout.write(f"    {line}")
+        summary = (
+            f"Проверено запросов: {len(results)}, с замечаниями: {flagged}"
+        )
+        if flagged and options["fail"]:
+            raise CommandError(summary)
+        self.stdout.write(summary)
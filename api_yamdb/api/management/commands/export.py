@@ -0,0 +1,44 @@
+import sys
+
+from api.export import EXPORTS, RENDERERS, export, parse_since
+from django.core.management import BaseCommand, CommandError
+from rest_framework.exceptions import ValidationError
+
+
+class Command(BaseCommand):
+    help = (
+        "Потоковая выгрузка произведений, отзывов или комментариев "
+        "в NDJSON или CSV."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=sorted(EXPORTS))
+        parser.add_argument(
+            "--format",
+            dest="file_format",
+            choices=sorted(RENDERERS),
+            default="ndjson",
+        )
+        parser.add_argument(
+            "--since",
+            help="id последнего выгруженного объекта или дата в ISO 8601.",
+        )
+        parser.add_argument(
+            "--output",
+            help="Файл для выгрузки, по умолчанию стандартный вывод.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            rows, _ = export(
+                options["kind"],
+                options["file_format"],
+                parse_since(options["since"]),
+            )
+        except ValidationError as error:
+            raise CommandError(error.detail)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as output:
+                output.writelines(rows)
+        else:
+            sys.stdout.writelines(rows)
@@ -0,0 +1,160 @@
+from bisect import bisect_left
+from collections import defaultdict
+from threading import Lock
+
+from api_yamdb.db.pool import all_pools
+
+DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    """Гистограмма в памяти процесса с разбивкой по метке view."""
+
+    def __init__(self, name, documentation, buckets=DURATION_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = buckets
+        self.lock = Lock()
+        self.series = defaultdict(
+            lambda: [[0] * (len(self.buckets) + 1), 0.0, 0]
+        )
+
+    def observe(self, view, value):
+        with self.lock:
+            counts, _, _ = series = self.series[view]
+            counts[bisect_left(self.buckets, value)] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self.lock:
+            snapshot = {
+                view: (list(counts), total, count)
+                for view, (counts, total, count) in self.series.items()
+            }
+        for view, (counts, total, count) in sorted(snapshot.items()):
+            label = f'view="{view}"'
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(
+                    f'{self.name}_bucket{{{label},le="{bound}"}} {cumulative}'
+                )
+            lines.append(f'{self.name}_bucket{{{label},le="+Inf"}} {count}')
+            lines.append(f"{self.name}_sum{{{label}}} {total}")
+            lines.append(f"{self.name}_count{{{label}}} {count}")
+        return lines
+
+
+class Counter:
+    """Счётчик в памяти процесса с разбивкой по одной метке."""
+
+    def __init__(self, name, documentation, label="view"):
+        self.name = name
+        self.documentation = documentation
+        self.label = label
+        self.lock = Lock()
+        self.values = defaultdict(int)
+
+    def inc(self, key, value=1):
+        with self.lock:
+            self.values[key] += value
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} counter",
+        ]
+        with self.lock:
+            snapshot = sorted(self.values.items())
+        for key, value in snapshot:
+            lines.append(f'{self.name}{{{self.label}="{key}"}} {value}')
+        return lines
+
+
+REQUEST_DURATION = Histogram(
+    "yamdb_request_duration_seconds", "Полное время обработки запроса."
+)
+DB_DURATION = Histogram(
+    "yamdb_db_duration_seconds", "Время SQL-запросов за один запрос."
+)
+DB_QUERIES = Histogram(
+    "yamdb_db_queries", "Количество SQL-запросов за один запрос.",
+    COUNT_BUCKETS,
+)
+SERIALIZER_DURATION = Histogram(
+    "yamdb_serializer_duration_seconds", "Время работы сериализаторов."
+)
+PERMISSION_DURATION = Histogram(
+    "yamdb_permission_duration_seconds", "Время проверки прав доступа."
+)
+DUPLICATE_QUERIES = Counter(
+    "yamdb_duplicate_queries_total",
+    "Повторные одинаковые SQL-запросы внутри одного запроса.",
+)
+RESPONSE_CACHE = Counter(
+    "yamdb_response_cache_total",
+    "Обращения к кэшу ответов API.",
+    label="result",
+)
+
+
+class PoolMetrics:
+    """Состояние пулов соединений с базой: занятость и ожидание."""
+
+    gauges = {
+        "size": "Открытые соединения пула.",
+        "in_use": "Соединения, выданные потокам.",
+        "saturation": "Доля занятых соединений от максимального размера.",
+    }
+    counters = {
+        "waits": "Сколько раз поток ждал свободного соединения.",
+        "wait_seconds": "Суммарное время ожидания соединения.",
+        "timeouts": "Отказы из-за исчерпания пула.",
+        "recycled": "Соединения, закрытые по возрасту.",
+        "discarded": "Соединения, закрытые как неисправные.",
+    }
+
+    def render(self):
+        stats = [pool.stats() for pool in all_pools()]
+        lines = []
+        for kind, metrics in (
+            ("gauge", self.gauges), ("counter", self.counters)
+        ):
+            for key, documentation in metrics.items():
+                name = f"yamdb_db_pool_{key}"
+                if kind == "counter":
+                    name += "_total"
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {kind}")
+                for pool in stats:
+                    lines.append(f'{name}{{alias="{pool["alias"]}"}} '
+                                 f'{pool[key]}')
+        return lines
+
+
+REGISTRY = (
+    REQUEST_DURATION,
+    DB_DURATION,
+    DB_QUERIES,
+    SERIALIZER_DURATION,
+    PERMISSION_DURATION,
+    DUPLICATE_QUERIES,
+    RESPONSE_CACHE,
+    PoolMetrics(),
+)
+
+
+def render_metrics():
+    """Метрики процесса в текстовом формате Prometheus."""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
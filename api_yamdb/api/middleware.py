@@ -0,0 +1,133 @@
+import logging
+import random
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+from .metrics import (DB_DURATION, DB_QUERIES, DUPLICATE_QUERIES,
+                      PERMISSION_DURATION, REQUEST_DURATION,
+                      SERIALIZER_DURATION)
+
+logger = logging.getLogger(__name__)
+
+current_record = ContextVar("current_record", default=None)
+
+
+class RequestRecord:
+    """Замеры одного запроса: SQL, сериализация, права доступа."""
+
+    def __init__(self):
+        self.view = None
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.statements = Counter()
+        self.timings = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+            if (
+                sql in self.statements
+                or len(self.statements) < settings.PERF_MAX_TRACKED_QUERIES
+            ):
+                self.statements[sql] += 1
+
+    @property
+    def duplicates(self):
+        return sum(count - 1 for count in self.statements.values())
+
+
+@contextmanager
+def timed(section):
+    """Добавляет время блока к разделу section текущего запроса."""
+    record = current_record.get()
+    if record is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record.timings[section] += time.perf_counter() - started
+
+
+class PerformanceMiddleware:
+    """
+    Замеряет время ответа, SQL-запросы, сериализацию и проверку прав.
+
+    Результат отдаётся в заголовке Server-Timing и копится в гистограммах
+    для /metrics. Замеряется доля запросов PERF_SAMPLE_RATE, остальные
+    проходят без обёрток.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if (
+            not settings.PERF_ENABLED
+            or random.random() >= settings.PERF_SAMPLE_RATE
+        ):
+            return self.get_response(request)
+
+        record = RequestRecord()
+        token = current_record.set(record)
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(
+                        connections[alias].execute_wrapper(record)
+                    )
+                response = self.get_response(request)
+        finally:
+            current_record.reset(token)
+        self.report(record, response)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        record = current_record.get()
+        if record is None:
+            return
+        view_class = getattr(view_func, "cls", None)
+        if view_class is None:
+            record.view = view_func.__name__
+            return
+        actions = getattr(view_func, "actions", None) or {}
+        action = actions.get(request.method.lower(), request.method.lower())
+        record.view = f"{view_class.__name__}.{action}"
+
+    def report(self, record, response):
+        total = time.perf_counter() - record.started
+        view = record.view or "unresolved"
+        duplicates = record.duplicates
+        serializer = record.timings["serializer"]
+        permissions = record.timings["permissions"]
+
+        REQUEST_DURATION.observe(view, total)
+        DB_DURATION.observe(view, record.db_time)
+        DB_QUERIES.observe(view, record.queries)
+        SERIALIZER_DURATION.observe(view, serializer)
+        PERMISSION_DURATION.observe(view, permissions)
+        if duplicates:
+            DUPLICATE_QUERIES.inc(view, duplicates)
+            if duplicates >= settings.PERF_DUPLICATE_QUERIES_WARNING:
+                logger.warning(
+                    "%s: %d повторных SQL-запросов", view, duplicates
+                )
+
+        response["Server-Timing"] = ", ".join((
+            f'db;dur={record.db_time * 1000:.1f};'
+            f'desc="{record.queries} queries, {duplicates} duplicate"',
+            f"ser;dur={serializer * 1000:.1f}",
+            f"perm;dur={permissions * 1000:.1f}",
+            f"total;dur={total * 1000:.1f}",
+        ))
@@ -1,16 +1,192 @@
+from django.http import Http404
 from rest_framework import mixins, viewsets
-from rest_framework.filters import SearchFilter
+from rest_framework.fields import empty
+from rest_framework.permissions import SAFE_METHODS
 
+from api_yamdb.db.replicas import (choose_replica, is_sticky, read_alias,
+                                   stick_to_primary)
+
+from .middleware import timed
 from .permissions import AdminOrReadOnly
+from .querysets import plan_queryset
+from .search import RankedSearchFilter
+
+_timed_serializers = {}
+
+
+def timed_serializer(serializer_class):
+    """Подкласс сериализатора, время работы которого попадает в замеры."""
+    if serializer_class not in _timed_serializers:
+
+        def to_representation(self, instance):
+            with timed("serializer"):
+                return serializer_class.to_representation(self, instance)
+
+        def run_validation(self, data=empty):
+            with timed("serializer"):
+                return serializer_class.run_validation(self, data)
+
+        _timed_serializers[serializer_class] = type(
+            serializer_class.__name__,
+            (serializer_class,),
+            {
+                "__module__": serializer_class.__module__,
+                "to_representation": to_representation,
+                "run_validation": run_validation,
+            },
+        )
+    return _timed_serializers[serializer_class]
+
+
+class InstrumentedViewMixin:
+    """Замеряет сериализацию и проверку прав для PerformanceMiddleware."""
+
+    def get_serializer(self, *args, **kwargs):
+        serializer_class = timed_serializer(self.get_serializer_class())
+        kwargs.setdefault("context", self.get_serializer_context())
+        return serializer_class(*args, **kwargs)
+
+    def check_permissions(self, request):
+        with timed("permissions"):
+            super().check_permissions(request)
+
+    def check_object_permissions(self, request, obj):
+        with timed("permissions"):
+            super().check_object_permissions(request, obj)
+
+
+def query_list(request, name):
+    """Значения параметра вида ?fields=id,name без повторов."""
+    return tuple(dict.fromkeys(
+        item.strip()
+        for item in request.query_params.get(name, "").split(",")
+        if item.strip()
+    ))
+
+
+class PlannedQuerysetMixin:
+    """
+    Подгружает связанные объекты, нужные сериализатору текущего действия,
+    чтобы список не выполнял отдельный запрос на каждый объект.
+
+    Для безопасных запросов состав ответа задают параметры ?fields= и
+    ?expand= (см. FieldsetSerializerMixin): столбцы и отношения
+    отброшенных полей не читаются из базы.
+    """
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.request.method in SAFE_METHODS:
+            context["fields"] = query_list(self.request, "fields")
+            context["expand"] = query_list(self.request, "expand")
+        return context
+
+    def filter_queryset(self, queryset):
+        return plan_queryset(
+            super().filter_queryset(queryset),
+            self.get_serializer_class(),
+            self.get_serializer_context(),
+        )
+
+
+class NestedParentMixin:
+    """
+    Родитель вложенного маршрута, например отзыв в
+    /titles/{title_id}/reviews/{review_id}/comments/.
+
+    parent_lookup связывает поля родителя с аргументами адреса: вся
+    цепочка проверяется одним запросом, и найденный родитель
+    запоминается на вьюсете до конца запроса. Объект в действиях
+    retrieve, update и destroy ищется сразу с фильтром по цепочке,
+    без отдельного запроса к родителю.
+    """
+
+    parent_model = None
+    parent_field = None
+    # {поле родителя: аргумент адреса}
+    parent_lookup = {}
+    # Поля родителя, которые нужны ответу при создании объекта.
+    parent_fields = ("id",)
+
+    def parent_filters(self, prefix=""):
+        return {
+            f"{prefix}{field}": self.kwargs.get(kwarg)
+            for field, kwarg in self.parent_lookup.items()
+        }
+
+    def get_parent(self):
+        """Родитель из адреса или Http404, если цепочки нет в базе."""
+        if not hasattr(self, "_parent"):
+            # Фильтр по первичному ключу находит не больше одной строки:
+            # сортировка и LIMIT не нужны.
+            parents = list(
+                self.parent_model.objects.filter(**self.parent_filters())
+                .only(*self.parent_fields)
+                .order_by()
+            )
+            self._parent = parents[0] if parents else None
+        if self._parent is None:
+            raise Http404
+        return self._parent
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.detail:
+            return queryset.filter(
+                **self.parent_filters(f"{self.parent_field}__")
+            )
+        return queryset.filter(**{self.parent_field: self.get_parent()})
+
+
+class ReplicaReadMixin:
+    """
+    Читает данные для безопасных запросов из реплики.
+
+    Ответы, которые попадут в общий кэш, строятся по основной базе:
+    иначе отставшая реплика закрепила бы устаревшие данные в кэше до
+    следующего изменения. Пользователь, только что изменивший данные,
+    несколько секунд читает из основной базы.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        token = read_alias.set(None)
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            read_alias.reset(token)
+
+    def reads_from_replica(self, request):
+        is_cacheable = getattr(self, "is_cacheable", None)
+        return (
+            request.method in SAFE_METHODS
+            and not (is_cacheable and is_cacheable(request))
+            and not is_sticky(request.user)
+        )
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if self.reads_from_replica(request):
+            read_alias.set(choose_replica())
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if (
+            request.method not in SAFE_METHODS
+            and response.status_code < 400
+            and request.user.is_authenticated
+        ):
+            stick_to_primary(request.user)
+        return super().finalize_response(request, response, *args, **kwargs)
 
 
 class CreateListViewSet(
+    InstrumentedViewMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.DestroyModelMixin,
     viewsets.GenericViewSet,
 ):
     permission_classes = (AdminOrReadOnly,)
-    filter_backends = (SearchFilter,)
+    filter_backends = (RankedSearchFilter,)
     search_fields = ("name",)
+    search_contains = True
     lookup_field = "slug"
@@ -1,6 +1,171 @@
+from base64 import b64decode, b64encode
+from binascii import Error as BinasciiError
+
 from django.conf import settings
-from rest_framework.pagination import PageNumberPagination
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 
 class CustomPagination(PageNumberPagination):
     page_size = settings.PAGE_NUMBER
+
+
+class KeysetPagination(BasePagination):
+    """
+    Курсорная пагинация по паре (pub_date, id) в порядке убывания.
+
+    Страница выбирается условием по ключу вместо OFFSET и без COUNT(*),
+    поэтому время ответа не зависит от глубины страницы. Ключ задаётся
+    key_fields: пары (поле, разбор значения из курсора), направление
+    сортировки — ordering.
+    """
+
+    page_size = settings.PAGE_NUMBER
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Неверный курсор."
+    key_fields = (("pub_date", parse_datetime), ("id", int))
+    ordering = ("-pub_date", "-id")
+
+    def get_ordering(self, reverse):
+        if not reverse:
+            return self.ordering
+        return tuple(
+            field[1:] if field.startswith("-") else f"-{field}"
+            for field in self.ordering
+        )
+
+    @staticmethod
+    def lookup(field):
+        """Условие «дальше по порядку» для поля из ordering."""
+        if field.startswith("-"):
+            return f"{field[1:]}__lt"
+        return f"{field}__gt"
+
+    def after(self, queryset, position, ordering):
+        """Записи, идущие за position в порядке ordering."""
+        (first, second), (first_value, second_value) = ordering, position
+        return queryset.filter(
+            Q(**{self.lookup(first): first_value})
+            | Q(**{
+                first.lstrip("-"): first_value,
+                self.lookup(second): second_value,
+            })
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.cursor = self.decode_cursor(request)
+        reverse = bool(self.cursor and self.cursor[2])
+
+        ordering = self.get_ordering(reverse)
+        if self.cursor:
+            queryset = self.after(queryset, self.cursor[:2], ordering)
+        page = list(queryset.order_by(*ordering)[:self.page_size + 1])
+        has_more = len(page) > self.page_size
+        page = page[:self.page_size]
+        if reverse:
+            page.reverse()
+
+        self.next_item = self.previous_item = None
+        if page:
+            if has_more or reverse:
+                self.next_item = page[-1]
+            if (has_more and reverse) or (self.cursor and not reverse):
+                self.previous_item = page[0]
+        return page
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            *values, reverse = (
+                b64decode(encoded.encode("ascii")).decode("ascii").split("|")
+            )
+            position = tuple(
+                parse(value)
+                for (_, parse), value in zip(self.key_fields, values)
+            )
+        except (BinasciiError, UnicodeError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if len(values) != len(self.key_fields) or None in position:
+            raise NotFound(self.invalid_cursor_message)
+        return (*position, reverse == "1")
+
+    def encode_cursor(self, item, reverse):
+        values = []
+        for field, _ in self.key_fields:
+            value = getattr(item, field)
+            values.append(
+                value.isoformat() if hasattr(value, "isoformat")
+                else str(value)
+            )
+        raw = "|".join((*values, str(int(reverse))))
+        return replace_query_param(
+            self.base_url,
+            self.cursor_query_param,
+            b64encode(raw.encode("ascii")).decode("ascii"),
+        )
+
+    def get_next_link(self):
+        if self.next_item is None:
+            return None
+        return self.encode_cursor(self.next_item, reverse=False)
+
+    def get_previous_link(self):
+        if self.previous_item is None:
+            return None
+        return self.encode_cursor(self.previous_item, reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+
+class FeedPagination(CustomPagination):
+    """
+    Пагинация лент отзывов и комментариев.
+
+    По умолчанию работает постранично; курсорный режим включается
+    параметром ?cursor= в запросе или атрибутом вьюсета
+    cursor_pagination = True.
+    """
+
+    keyset_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if (
+            self.keyset_class.cursor_query_param in request.query_params
+            or getattr(view, "cursor_pagination", False)
+        ):
+            self.keyset = self.keyset_class()
+            self.keyset.page_size = self.get_page_size(request)
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class LeaderboardPagination(KeysetPagination):
+    """
+    Курсорная пагинация таблицы лидеров: по убыванию оценки, при равной
+    оценке — по id произведения. Страница — проход по индексу
+    (board, score) без COUNT(*) и OFFSET.
+    """
+
+    key_fields = (("score", float), ("title_id", int))
+    ordering = ("-score", "title_id")
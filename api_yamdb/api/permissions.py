@@ -1,6 +1,30 @@
 from rest_framework import permissions
 
 
+def is_staff_role(user):
+    """
+    Администратор или модератор. Роль берётся из аутентифицированного
+    пользователя (для JWT — из утверждений токена) без запросов к базе.
+    """
+    return user.is_authenticated and (user.is_admin or user.is_moderator)
+
+
+def can_edit(user, obj):
+    """Может ли пользователь изменять объект с полем author."""
+    return is_staff_role(user) or (
+        user.is_authenticated and obj.author_id == user.pk
+    )
+
+
+def editable_by(user, queryset):
+    """Объекты выборки, которые пользователь может изменять, — в SQL."""
+    if is_staff_role(user):
+        return queryset
+    if not user.is_authenticated:
+        return queryset.none()
+    return queryset.filter(author_id=user.pk)
+
+
 class IsAdmin(permissions.BasePermission):
     """Проверка, что пользователь является администратором."""
 
@@ -26,7 +50,11 @@ class IsAuthor(permissions.BasePermission):
     """Проверка, что пользователь является автором."""
 
     def has_object_permission(self, request, view, obj):
-        return obj.user == request.user
+        # Сравнение ключей: объект автора не загружается.
+        return (
+            request.user.is_authenticated
+            and obj.author_id == request.user.pk
+        )
 
 
 class IsAdminModeratorAuthorOrReadOnly(permissions.BasePermission):
@@ -37,9 +65,7 @@ class IsAdminModeratorAuthorOrReadOnly(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         return (
             request.method in permissions.SAFE_METHODS
-            or request.user.is_admin
-            or request.user.is_moderator
-            or obj.author == request.user
+            or can_edit(request.user, obj)
         )
 
 
@@ -0,0 +1,110 @@
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+_plans = {}
+
+
+def _relation(model, attrs):
+    """Возвращает поле модели, если источник — прямое отношение."""
+    if len(attrs) != 1:
+        return None
+    try:
+        field = model._meta.get_field(attrs[0])
+    except FieldDoesNotExist:
+        return None
+    # Источник по столбцу ключа (category_id) читает только столбец.
+    if not field.is_relation or field.name != attrs[0]:
+        return None
+    return field
+
+
+def _collect(serializer, model, prefix, select, prefetch, in_prefetch):
+    for field in serializer.fields.values():
+        if field.write_only or field.source == "*":
+            continue
+        relation = _relation(model, field.source_attrs)
+        if relation is None:
+            continue
+        path = prefix + relation.name
+        many = relation.many_to_many or relation.one_to_many
+        (prefetch if many or in_prefetch else select).append(path)
+        if isinstance(field, serializers.ListSerializer):
+            field = field.child
+        if isinstance(field, serializers.ModelSerializer):
+            _collect(
+                field,
+                relation.related_model,
+                path + "__",
+                select,
+                prefetch,
+                in_prefetch or many,
+            )
+
+
+def _columns(serializer, model):
+    """
+    Столбцы модели, которые читает сериализатор, или None, если
+    какое-то поле берёт данные не из столбца и ограничивать выборку
+    нельзя. Первичный ключ и поля сортировки загружаются всегда.
+    """
+    columns = {model._meta.pk.name}
+    columns.update(name.lstrip("-") for name in model._meta.ordering)
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        if field.source == "*":
+            return None
+        try:
+            model_field = model._meta.get_field(field.source_attrs[0])
+        except FieldDoesNotExist:
+            return None
+        if model_field.concrete:
+            columns.add(model_field.name)
+    return tuple(sorted(columns))
+
+
+def get_queryset_plan(serializer_class, fields=(), expand=()):
+    """
+    Строит план загрузки для сериализатора.
+
+    Вложенные сериализаторы и RelatedField по внешним ключам
+    превращаются в select_related, а отношения «многие» — в
+    prefetch_related. Если запрошены не все поля (?fields=), в плане
+    есть и список столбцов для only(), а отношения отброшенных полей
+    не загружаются. План кэшируется для класса сериализатора и набора
+    полей.
+    """
+    key = (serializer_class, tuple(sorted(fields)), tuple(sorted(expand)))
+    if key not in _plans:
+        select, prefetch = [], []
+        serializer = serializer_class(
+            context={"fields": fields, "expand": expand}
+        )
+        model = serializer.Meta.model
+        _collect(serializer, model, "", select, prefetch, False)
+        _plans[key] = (
+            tuple(select),
+            tuple(prefetch),
+            _columns(serializer, model) if fields else None,
+        )
+    return _plans[key]
+
+
+def plan_queryset(queryset, serializer_class, context=None):
+    """
+    Добавляет в queryset соединения, предзагрузки и ограничение
+    столбцов из плана.
+    """
+    context = context or {}
+    select, prefetch, columns = get_queryset_plan(
+        serializer_class,
+        context.get("fields", ()),
+        context.get("expand", ()),
+    )
+    if columns:
+        queryset = queryset.only(*columns)
+    if select:
+        queryset = queryset.select_related(*select)
+    if not prefetch:
+        return queryset
+    return queryset.prefetch_related(*prefetch)
@@ -0,0 +1,146 @@
+import heapq
+import re
+from difflib import SequenceMatcher
+
+from django.conf import settings
+from django.contrib.postgres.search import (SearchQuery, SearchRank,
+                                            TrigramSimilarity)
+from django.db import connections
+from django.db.models import Case, F, IntegerField, Q, When
+from django.db.models.functions import Greatest
+from rest_framework.filters import SearchFilter
+
+WORD_RE = re.compile(r"\w+")
+
+
+class PostgresSearchBackend:
+    """
+    Поиск средствами PostgreSQL.
+
+    Если у модели есть поле с предвычисленным tsvector, совпадения
+    ищутся по нему через GIN-индекс и ранжируются SearchRank; опечатки
+    покрывает триграммное сходство по тем же полям. С contains
+    подходят и записи, содержащие запрос как подстроку.
+    """
+
+    def search(self, queryset, query, fields, vector_field=None,
+               contains=False):
+        similarity = [TrigramSimilarity(field, query) for field in fields]
+        queryset = queryset.annotate(
+            similarity=(
+                Greatest(*similarity) if len(similarity) > 1
+                else similarity[0]
+            )
+        )
+        condition = Q()
+        for field in fields:
+            condition |= Q(**{f"{field}__trigram_similar": query})
+            if contains:
+                condition |= Q(**{f"{field}__icontains": query})
+        ordering = ("-similarity",)
+        if vector_field:
+            search_query = SearchQuery(query, config=settings.SEARCH_CONFIG)
+            queryset = queryset.annotate(
+                rank=SearchRank(F(vector_field), search_query)
+            )
+            condition |= Q(**{vector_field: search_query})
+            ordering = ("-rank", "-similarity")
+        return queryset.filter(condition).order_by(*ordering, "pk")
+
+
+class PythonSearchBackend:
+    """
+    Запасной поиск для SQLite и тестов.
+
+    Ранжирует записи в Python: каждое слово запроса сравнивается со
+    словами полей по SequenceMatcher, первое поле весит больше остальных.
+    С contains вхождение запроса в поле как подстроки засчитывается
+    полным совпадением. Упорядочиваются не больше SEARCH_MAX_RESULTS
+    лучших записей.
+    """
+
+    field_weights = (1.0, 0.4)
+
+    def score(self, terms, values):
+        total = 0.0
+        for position, value in enumerate(values):
+            words = WORD_RE.findall((value or "").lower())
+            if not words:
+                continue
+            weight = self.field_weights[min(position, 1)]
+            for term in terms:
+                best = max(
+                    SequenceMatcher(None, term, word).ratio()
+                    for word in words
+                )
+                if best >= settings.SEARCH_FUZZY_THRESHOLD:
+                    total += weight * best
+        return total
+
+    def contains_score(self, query, values):
+        return sum(
+            self.field_weights[min(position, 1)]
+            for position, value in enumerate(values)
+            if query in (value or "").lower()
+        )
+
+    def search(self, queryset, query, fields, vector_field=None,
+               contains=False):
+        terms = WORD_RE.findall(query.lower())
+        if not terms:
+            return queryset.none()
+        scored = []
+        for row in queryset.order_by().values_list("pk", *fields).iterator():
+            score = self.score(terms, row[1:])
+            if contains:
+                score += self.contains_score(query.lower(), row[1:])
+            if score:
+                scored.append((-score, row[0]))
+        best = heapq.nsmallest(settings.SEARCH_MAX_RESULTS, scored)
+        pks = [pk for _, pk in best]
+        if not pks:
+            return queryset.none()
+        return queryset.filter(pk__in=pks).order_by(
+            Case(
+                *(When(pk=pk, then=index) for index, pk in enumerate(pks)),
+                output_field=IntegerField(),
+            )
+        )
+
+
+def get_search_backend(queryset):
+    if connections[queryset.db].vendor == "postgresql":
+        return PostgresSearchBackend()
+    return PythonSearchBackend()
+
+
+def search_queryset(queryset, query, fields, vector_field=None,
+                    contains=False):
+    """Возвращает записи, подходящие под запрос, в порядке релевантности."""
+    return get_search_backend(queryset).search(
+        queryset, query, fields, vector_field, contains
+    )
+
+
+class RankedSearchFilter(SearchFilter):
+    """
+    Полнотекстовый поиск по ?search= с ранжированием результатов.
+
+    Поля берутся из search_fields вьюсета, поле с tsvector — из
+    search_vector_field. search_contains добавляет к найденному записи
+    с запросом в виде подстроки, как в SearchFilter: для небольших
+    справочников, где ищут по началу названия.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, "").strip()
+        fields = getattr(view, "search_fields", None)
+        if not query or not fields:
+            return queryset
+        return search_queryset(
+            queryset,
+            query,
+            fields,
+            getattr(view, "search_vector_field", None),
+            getattr(view, "search_contains", False),
+        )
@@ -1,11 +1,64 @@
+from collections import OrderedDict
+from functools import partial
+
 from django.conf import settings
 from django.contrib.auth.validators import UnicodeUsernameValidator
 from django.db import IntegrityError
 from rest_framework import serializers
 from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.ratings import score_summary
 from users.models import User
 from users.validators import username_validator
 
+from .catalog import CATEGORIES, GENRES, CatalogField, CatalogSlugRelatedField
+from .validators import year_validator
+
+
+class FieldsetSerializerMixin:
+    """
+    Состав ответа по параметрам запроса.
+
+    context["fields"] оставляет только перечисленные поля, а
+    context["expand"] добавляет или заменяет поля из expandable_fields
+    вложенными объектами. Действует только на сериализатор верхнего уровня:
+    вложенные отдаются целиком.
+    """
+
+    expandable_fields = {}
+
+    def is_top_level(self):
+        parent = self.parent
+        return parent is None or (
+            isinstance(parent, serializers.ListSerializer)
+            and parent.parent is None
+        )
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self.is_top_level():
+            return fields
+        expand = self.context.get("expand", ())
+        requested = self.context.get("fields", ())
+        unknown = {
+            "expand": set(expand) - set(self.expandable_fields),
+            "fields": set(requested) - set(fields),
+        }
+        errors = {
+            param: [f"Неизвестные поля: {', '.join(sorted(names))}."]
+            for param, names in unknown.items()
+            if names
+        }
+        if errors:
+            raise serializers.ValidationError(errors)
+        if requested:
+            fields = OrderedDict(
+                (name, field) for name, field in fields.items()
+                if name in requested
+            )
+        for name in expand:
+            fields[name] = self.expandable_fields[name]()
+        return fields
+
 
 class CategorySerializer(serializers.ModelSerializer):
     """Сериализатор модели Category."""
@@ -26,19 +79,17 @@ class GenreSerializer(serializers.ModelSerializer):
 class TitleCreateSerializer(serializers.ModelSerializer):
     """Сериализатор модели Title для [POST, PATCH]-запросов."""
 
-    genre = serializers.SlugRelatedField(
+    genre = CatalogSlugRelatedField(
+        GENRES,
         many=True,
         write_only=True,
-        slug_field="slug",
         required=False,
-        queryset=Genre.objects.all(),
     )
-    category = serializers.SlugRelatedField(
+    category = CatalogSlugRelatedField(
+        CATEGORIES,
         many=False,
         write_only=True,
-        slug_field="slug",
         required=False,
-        queryset=Category.objects.all(),
     )
 
     class Meta:
@@ -53,12 +104,18 @@ class TitleCreateSerializer(serializers.ModelSerializer):
         )
 
 
-class TitleListSerializer(serializers.ModelSerializer):
+class TitleListSerializer(
+    FieldsetSerializerMixin, serializers.ModelSerializer
+):
     """Сериализатор модели Title для [GET]-запросов."""
 
-    category = CategorySerializer(many=False, required=False)
-    genre = GenreSerializer(many=True, required=False)
-    rating = serializers.IntegerField()
+    category = CatalogField(
+        CATEGORIES, CategorySerializer, source="category_id"
+    )
+    genre = CatalogField(GENRES, GenreSerializer, source="genre_ids")
+    rating = serializers.IntegerField(read_only=True)
+
+    expandable_fields = {"stats": serializers.SerializerMethodField}
 
     class Meta:
         model = Title
@@ -73,10 +130,89 @@ class TitleListSerializer(serializers.ModelSerializer):
         )
         read_only_fields = ("genre", "category", "rating")
 
+    def get_stats(self, instance):
+        return score_summary(instance.get_score_counts())
+
+
+class TitleBulkSerializer(serializers.Serializer):
+    """
+    Элемент пакетной записи произведений.
+
+    Слаги жанров и категории не проверяются здесь: их разрешает
+    одним запросом на весь пакет api.bulk.TitleWriter.
+    """
+
+    id = serializers.IntegerField(required=False)
+    name = serializers.CharField(max_length=settings.NAME_MAX_LENGTH)
+    year = serializers.IntegerField(
+        min_value=0, max_value=32767, validators=[year_validator]
+    )
+    description = serializers.CharField(
+        required=False, allow_blank=True, allow_null=True
+    )
+    genre = serializers.ListField(
+        child=serializers.SlugField(), required=False
+    )
+    category = serializers.SlugField(required=False, allow_null=True)
+
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewBulkSerializer(serializers.Serializer):
+    """Элемент пакетной записи отзывов."""
+
+    id = serializers.IntegerField(required=False)
+    title = serializers.IntegerField()
+    author = serializers.CharField(
+        max_length=settings.USER_FIELD_LENGTH, required=False
+    )
+    text = serializers.CharField(max_length=1000)
+    score = serializers.IntegerField(min_value=1, max_value=10)
+
+
+class CommentBulkSerializer(serializers.Serializer):
+    """Элемент пакетной записи комментариев."""
+
+    id = serializers.IntegerField(required=False)
+    review = serializers.IntegerField()
+    author = serializers.CharField(
+        max_length=settings.USER_FIELD_LENGTH, required=False
+    )
+    text = serializers.CharField(max_length=200)
+
+
+class AuthorSerializer(serializers.ModelSerializer):
+    """Публичный профиль автора для ?expand=author."""
+
+    class Meta:
+        model = User
+        fields = ("username", "first_name", "last_name", "bio")
+
+
+def violates_constraint(error, model, name):
+    """
+    Вызвано ли IntegrityError ограничением name модели model.
+
+    PostgreSQL сообщает имя ограничения, SQLite — только столбцы.
+    """
+    diag = getattr(error.__cause__, "diag", None)
+    if diag is not None:
+        return diag.constraint_name == name
+    constraint = next(
+        item for item in model._meta.constraints if item.name == name
+    )
+    columns = ", ".join(
+        f"{model._meta.db_table}.{model._meta.get_field(field).column}"
+        for field in constraint.fields
+    )
+    return f"UNIQUE constraint failed: {columns}" in str(error)
+
+
+class ReviewSerializer(FieldsetSerializerMixin, serializers.ModelSerializer):
     """Сериализатор модели Review."""
 
+    expandable_fields = {
+        "author": partial(AuthorSerializer, read_only=True),
+    }
+
     author = serializers.SlugRelatedField(
         slug_field="username",
         read_only=True,
@@ -87,21 +223,27 @@ class ReviewSerializer(serializers.ModelSerializer):
         model = Review
         fields = ("id", "text", "author", "score", "pub_date")
 
-    def validate(self, data):
-        is_exist = Review.objects.filter(
-            author=self.context["request"].user,
-            title=self.context["view"].kwargs.get("title_id"),
-        ).exists()
-        if is_exist and self.context["request"].method == "POST":
+    def create(self, validated_data):
+        # Повторный отзыв отсекает ограничение unique-review, без
+        # отдельной проверки перед вставкой.
+        try:
+            return super().create(validated_data)
+        except IntegrityError as error:
+            if not violates_constraint(error, Review, "unique-review"):
+                raise
             raise serializers.ValidationError(
                 "Вы уже оставляли отзыв на это произведение."
             )
-        return data
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(FieldsetSerializerMixin, serializers.ModelSerializer):
     """Сериализатор модели Comment."""
 
+    expandable_fields = {
+        "author": partial(AuthorSerializer, read_only=True),
+        "review": partial(ReviewSerializer, read_only=True),
+    }
+
     author = serializers.SlugRelatedField(
         slug_field="username",
         read_only=True,
@@ -0,0 +1,65 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from reviews.leaderboard import leaderboards_refreshed
+from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.signals import bulk_loaded
+from users.models import TOKEN_CLAIMS, User
+
+from .authentication import revoke_tokens
+from .cache import invalidate_tags
+
+CACHE_TAGS = {
+    Category: "categories",
+    Genre: "genres",
+    Title: "titles",
+    Title.genre.through: "titles",
+    Review: "reviews",
+    Comment: "comments",
+    User: "users",
+}
+
+
+def invalidate_model_cache(sender, **kwargs):
+    """
+    Сбрасывает кэш ответов, зависящих от изменённой модели.
+
+    Повторный сброс после коммита не даёт параллельному запросу
+    закэшировать данные, прочитанные до фиксации транзакции.
+    """
+    tag = CACHE_TAGS[sender]
+    invalidate_tags(tag)
+    transaction.on_commit(lambda: invalidate_tags(tag))
+
+
+for model in CACHE_TAGS:
+    post_save.connect(invalidate_model_cache, sender=model)
+    post_delete.connect(invalidate_model_cache, sender=model)
+    bulk_loaded.connect(invalidate_model_cache, sender=model)
+m2m_changed.connect(invalidate_model_cache, sender=Title.genre.through)
+
+
+def invalidate_leaderboards(sender, **kwargs):
+    invalidate_tags("leaderboards")
+
+
+leaderboards_refreshed.connect(invalidate_leaderboards)
+
+
+def revoke_changed_user_tokens(sender, instance, created, update_fields,
+                               **kwargs):
+    """Отзывает токены, если изменились роль, права или имя пользователя."""
+    loaded = getattr(instance, "_loaded_claims", None)
+    instance._loaded_claims = instance.get_claims()
+    if created or loaded == instance._loaded_claims:
+        return
+    if update_fields and not set(update_fields) & set(TOKEN_CLAIMS):
+        return
+    revoke_tokens(instance.pk)
+
+
+def revoke_deleted_user_tokens(sender, instance, **kwargs):
+    revoke_tokens(instance.pk)
+
+
+post_save.connect(revoke_changed_user_tokens, sender=User)
+post_delete.connect(revoke_deleted_user_tokens, sender=User)
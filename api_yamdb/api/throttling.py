@@ -0,0 +1,155 @@
+import math
+from collections.abc import Mapping
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class ScopedThrottle(SimpleRateThrottle):
+    """
+    Ограничение частоты запросов в области view.throttle_scope.
+
+    Частота задаётся в DEFAULT_THROTTLE_RATES под ключом
+    "<область>_<kind>", например "signup_ip": "20/hour". Если такого
+    ключа нет, запросы не ограничиваются. Счётчики хранятся в кэше
+    THROTTLE_CACHE, поэтому проверка не обращается к базе. Эти классы
+    подключены ко всем вьюсетам через DEFAULT_THROTTLE_CLASSES.
+    """
+
+    kind = None
+
+    def __init__(self):
+        # Область становится известна только в allow_request.
+        pass
+
+    @property
+    def cache(self):
+        return caches[settings.THROTTLE_CACHE]
+
+    def get_scope(self, view):
+        scope = getattr(view, "throttle_scope", None)
+        return scope and f"{scope}_{self.kind}"
+
+    def applies(self, request, view):
+        return request.method not in SAFE_METHODS
+
+    def get_ident_value(self, request):
+        raise NotImplementedError
+
+    def get_cache_key(self, request, view):
+        ident = self.get_ident_value(request)
+        if not ident:
+            return None
+        return self.cache_format % {"scope": self.scope, "ident": ident}
+
+    def allow_request(self, request, view):
+        # Частоты читаются при каждом запросе, а не при импорте,
+        # как в SimpleRateThrottle: так их можно менять в настройках.
+        rates = api_settings.DEFAULT_THROTTLE_RATES
+        self.scope = self.get_scope(view)
+        if self.scope not in rates or not self.applies(request, view):
+            return True
+        self.rate = rates[self.scope]
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        return self.consume(request, view)
+
+    def consume(self, request, view):
+        """Скользящее окно: журнал моментов запросов за duration."""
+        return super().allow_request(request, view)
+
+    def wait(self):
+        return math.ceil(super().wait())
+
+
+class TokenBucketThrottle(ScopedThrottle):
+    """
+    Ведро токенов: вмещает num_requests запросов и равномерно
+    наполняется за duration. Допускает короткие всплески и хранит
+    в кэше два числа вместо журнала запросов.
+    """
+
+    def consume(self, request, view):
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+        self.now = self.timer()
+        tokens, updated = self.cache.get(
+            self.key, (self.num_requests, self.now)
+        )
+        self.tokens = min(
+            self.num_requests,
+            tokens + (self.now - updated) * self.num_requests / self.duration,
+        )
+        if self.tokens < 1:
+            return False
+        self.cache.set(self.key, (self.tokens - 1, self.now), self.duration)
+        return True
+
+    def wait(self):
+        return math.ceil(
+            (1 - self.tokens) * self.duration / self.num_requests
+        )
+
+
+class IPThrottle(ScopedThrottle):
+    """Запись с одного адреса: регистрация и получение токена."""
+
+    kind = "ip"
+
+    def get_ident_value(self, request):
+        return self.get_ident(request)
+
+
+class UsernameThrottle(ScopedThrottle):
+    """
+    Запросы для одного имени пользователя из тела запроса — защищает
+    от перебора кода подтверждения с разных адресов.
+    """
+
+    kind = "username"
+
+    def get_ident_value(self, request):
+        # Тело может оказаться JSON-массивом: его отклонит сериализатор.
+        if not isinstance(request.data, Mapping):
+            return None
+        username = request.data.get("username")
+        if not isinstance(username, str):
+            return None
+        return username.strip().lower()[:settings.USER_FIELD_LENGTH]
+
+
+class UserThrottle(ScopedThrottle):
+    """
+    Создание объектов одним пользователем: отзывы и комментарии.
+    Правка и удаление не ограничиваются — ими пользуются модераторы.
+    """
+
+    kind = "user"
+
+    def applies(self, request, view):
+        return request.method == "POST"
+
+    def get_ident_value(self, request):
+        return request.user.is_authenticated and request.user.pk
+
+
+class AnonListThrottle(TokenBucketThrottle):
+    """Чтение списков анонимными клиентами, по адресу."""
+
+    kind = "ip"
+
+    def get_scope(self, view):
+        return "anon_list_ip"
+
+    def applies(self, request, view):
+        return (
+            request.method in SAFE_METHODS
+            and getattr(view, "detail", True) is False
+            and not request.user.is_authenticated
+        )
+
+    def get_ident_value(self, request):
+        return self.get_ident(request)
@@ -1,8 +1,11 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import (CategoryViewSet, CommentViewSet, GenreViewSet, GetJWTToken,
-                    ReviewViewSet, SignUpViewSet, TitleViewSet, UserViewSet)
+from .views import (CategoryViewSet, CommentBulkView, CommentViewSet,
+                    ExportView, GenreViewSet, GetJWTToken, ReviewBulkView,
+                    ReviewViewSet, SignUpViewSet, TitleBulkView, TitleViewSet,
+                    UserViewSet, cache_stats, catalog_stats, db_pool_stats,
+                    mail_queue_stats)
 
 v1_router = DefaultRouter()
 v1_router.register("titles", TitleViewSet, basename="title")
@@ -36,6 +39,18 @@ users_router.register(
 
 
 urlpatterns = [
+    path("v1/cache/stats/", cache_stats, name="cache-stats"),
+    path("v1/mail/stats/", mail_queue_stats, name="mail-stats"),
+    path("v1/db/pool/stats/", db_pool_stats, name="db-pool-stats"),
+    path("v1/catalog/stats/", catalog_stats, name="catalog-stats"),
+    path("v1/titles/bulk/", TitleBulkView.as_view(), name="title-bulk"),
+    path("v1/reviews/bulk/", ReviewBulkView.as_view(), name="review-bulk"),
+    path("v1/comments/bulk/", CommentBulkView.as_view(), name="comment-bulk"),
+    path(
+        "v1/export/<str:kind>.<str:file_format>",
+        ExportView.as_view(),
+        name="export",
+    ),
     path("v1/", include(v1_router.urls)),
     path("v1/", include(users_router.urls)),
     path("v1/auth/", include(users_router.urls)),
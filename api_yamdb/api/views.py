@@ -1,122 +1,327 @@
 from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
-from django.db.models import Avg
+from django.http import (Http404, HttpResponse, HttpResponseForbidden,
+                         StreamingHttpResponse)
 from django.shortcuts import get_object_or_404
+from django.utils.crypto import constant_time_compare
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, status, viewsets
-from rest_framework.decorators import action
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.filters import OrderingFilter
+from rest_framework.parsers import JSONParser
 from rest_framework.permissions import (IsAuthenticated,
                                         IsAuthenticatedOrReadOnly)
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import AccessToken
-from reviews.models import Category, Genre, Review, Title
+from rest_framework.views import APIView
+from reviews.leaderboard import (TOP, TRENDING, category_board, genre_board,
+                                 trending_value)
+from reviews.models import (Category, Comment, Genre, LeaderboardEntry, Review,
+                            Title)
+from reviews.ratings import score_summary
+from users.mail_queue import get_mail_queue
 from users.models import User
 
-from .filtersets import TitleFilter
-from .mixins import CreateListViewSet
-from .pagination import CustomPagination
+from api_yamdb.db.pool import all_pools
+
+from .authentication import RoleAccessToken, load_user
+from .bulk import ERROR, CommentWriter, NDJSONParser, ReviewWriter, TitleWriter
+from .cache import ConditionalDetailMixin, ResponseCacheMixin, stats
+from .catalog import CATALOGS, CATEGORIES, GENRES
+from .export import export, parse_since
+from .filtersets import EditableFilter, TitleFilter
+from .metrics import render_metrics
+from .mixins import (CreateListViewSet, InstrumentedViewMixin,
+                     NestedParentMixin, PlannedQuerysetMixin, ReplicaReadMixin)
+from .pagination import CustomPagination, FeedPagination, LeaderboardPagination
 from .permissions import (AdminOrReadOnly, IsAdmin,
                           IsAdminModeratorAuthorOrReadOnly)
+from .querysets import plan_queryset
+from .search import RankedSearchFilter
 from .serializers import (CategorySerializer, CommentSerializer,
                           GenreSerializer, ReviewSerializer, SignUpSerializer,
                           TitleCreateSerializer, TitleListSerializer,
                           TokenSerializer, UserSerializer)
 
 
-class CategoryViewSet(CreateListViewSet):
+def catalog_object_or_404(catalog, slug):
+    """Id объекта справочника по слагу без запроса к базе."""
+    obj = catalog.get_by_slug(slug)
+    if obj is None:
+        raise Http404
+    return obj.pk
+
+
+class CategoryViewSet(
+    ReplicaReadMixin, ResponseCacheMixin, CreateListViewSet
+):
     """
     Вьюсет для обработки [GET, POST, DELETE] запросов
     к объектам модели Category.
     """
 
+    cache_tags = ("categories",)
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
 
 
-class GenreViewSet(CreateListViewSet):
+class GenreViewSet(ReplicaReadMixin, ResponseCacheMixin, CreateListViewSet):
     """
     Вьюсет для обработки [GET, POST, DELETE] запросов
     к объектам модели Genre.
     """
 
+    cache_tags = ("genres",)
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(
+    ReplicaReadMixin,
+    ConditionalDetailMixin,
+    InstrumentedViewMixin,
+    ResponseCacheMixin,
+    PlannedQuerysetMixin,
+    viewsets.ModelViewSet,
+):
     """
     Вьюсет для обработки [GET, POST, PATCH, DELETE] запросов
     к объектам модели Title.
     """
 
-    queryset = Title.objects.annotate(rating=Avg("reviews__score"))
+    cache_tags = ("titles", "genres", "categories", "reviews", "leaderboards")
+    cache_actions = ("list", "retrieve", "top", "trending")
+    validator_tags = ("genres", "categories")
+    queryset = Title.objects.defer("search_vector")
     permission_classes = (AdminOrReadOnly,)
-    filter_backends = (OrderingFilter, DjangoFilterBackend)
+    filter_backends = (
+        OrderingFilter,
+        DjangoFilterBackend,
+        RankedSearchFilter,
+    )
     ordering = ("name",)
     filterset_class = TitleFilter
+    search_fields = ("name", "description")
+    search_vector_field = "search_vector"
+
+    def with_stats(self):
+        return "stats" in self.get_serializer_context().get("expand", ())
+
+    def get_queryset(self):
+        if self.with_stats():
+            return self.queryset.select_related("score_stats")
+        return self.queryset.all()
 
     def get_serializer_class(self):
-        if self.action in ("list", "retrieve"):
+        if self.action in ("list", "retrieve", "top", "trending"):
             return TitleListSerializer
         return TitleCreateSerializer
 
-
-class ReviewViewSet(viewsets.ModelViewSet):
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        expand = context.get("expand", ())
+        # ?stats=true — прежняя форма ?expand=stats.
+        if (
+            self.request.query_params.get("stats") in ("1", "true")
+            and "stats" not in expand
+        ):
+            context["expand"] = expand + ("stats",)
+        return context
+
+    @action(detail=True, methods=["get"])
+    def stats(self, request, pk=None):
+        """Распределение оценок, медиана и перцентили произведения."""
+        title = get_object_or_404(
+            Title.objects.select_related("score_stats").only(
+                "pk", "rating", "score_stats"
+            ),
+            pk=pk,
+        )
+        return Response({
+            "id": title.pk,
+            "rating": title.rating,
+            **score_summary(title.get_score_counts()),
+        })
+
+    @action(detail=False, methods=["get"])
+    def top(self, request):
+        """
+        Лучшие произведения по байесовскому рейтингу: общий топ
+        или топ жанра (?genre=slug) либо категории (?category=slug).
+        """
+        board = TOP
+        if "genre" in request.query_params:
+            board = genre_board(
+                catalog_object_or_404(GENRES, request.query_params["genre"])
+            )
+        elif "category" in request.query_params:
+            board = category_board(catalog_object_or_404(
+                CATEGORIES, request.query_params["category"]
+            ))
+        return self.leaderboard(board, lambda score: round(score, 2))
+
+    @action(detail=False, methods=["get"])
+    def trending(self, request):
+        """Популярное: отзывы за последние дни с затуханием по времени."""
+        return self.leaderboard(TRENDING, trending_value)
+
+    def leaderboard(self, board, present):
+        """
+        Страница таблицы лидеров: проход по индексу от курсора
+        и выборка страницы, без COUNT(*).
+        """
+        paginator = LeaderboardPagination()
+        entries = paginator.paginate_queryset(
+            LeaderboardEntry.objects.filter(board=board).values_list(
+                "title_id", "score", named=True
+            ),
+            request=self.request,
+            view=self,
+        )
+        titles = plan_queryset(
+            self.get_queryset(),
+            TitleListSerializer,
+            self.get_serializer_context(),
+        ).in_bulk([title_id for title_id, _ in entries])
+        ranked = [
+            (titles[title_id], score)
+            for title_id, score in entries
+            if title_id in titles
+        ]
+        data = self.get_serializer(
+            [title for title, _ in ranked], many=True
+        ).data
+        for item, (_, score) in zip(data, ranked):
+            item["score"] = present(score)
+        return paginator.get_paginated_response(data)
+
+
+class ReviewViewSet(
+    ReplicaReadMixin,
+    ConditionalDetailMixin,
+    InstrumentedViewMixin,
+    ResponseCacheMixin,
+    PlannedQuerysetMixin,
+    NestedParentMixin,
+    viewsets.ModelViewSet,
+):
     """
     Вьюсет для обработки [GET, POST, PATCH, DELETE] запросов
     к объектам модели Review.
     """
 
+    cache_tags = ("titles", "reviews", "users")
+    queryset = Review.objects.all()
     serializer_class = ReviewSerializer
+    parent_model = Title
+    parent_field = "title"
+    parent_lookup = {"pk": "title_id"}
+    throttle_scope = "reviews"
     permission_classes = (
         IsAdminModeratorAuthorOrReadOnly,
         IsAuthenticatedOrReadOnly,
     )
-    pagination_class = CustomPagination
-
-    def get_title(self):
-        return get_object_or_404(Title, pk=self.kwargs.get('title_id'))
-
-    def get_queryset(self):
-        return self.get_title().reviews.all()
+    filter_backends = (EditableFilter,)
+    pagination_class = FeedPagination
 
     def perform_create(self, serializer):
-        serializer.save(
-            author=self.request.user,
-            title=self.get_title(),
-        )
-
-
-class CommentViewSet(viewsets.ModelViewSet):
+        serializer.save(author=self.request.user, title=self.get_parent())
+
+
+class CommentViewSet(
+    ReplicaReadMixin,
+    ConditionalDetailMixin,
+    InstrumentedViewMixin,
+    ResponseCacheMixin,
+    PlannedQuerysetMixin,
+    NestedParentMixin,
+    viewsets.ModelViewSet,
+):
     """
     Вьюсет для обработки [GET, POST, PATCH, DELETE] запросов
     к объектам модели Comment.
     """
 
+    cache_tags = ("reviews", "comments", "users")
+    queryset = Comment.objects.all()
     serializer_class = CommentSerializer
+    parent_model = Review
+    parent_field = "review"
+    parent_lookup = {"pk": "review_id", "title_id": "title_id"}
+    # Ответ на создание показывает текст отзыва.
+    parent_fields = ("id", "text")
+    throttle_scope = "comments"
     permission_classes = (
         IsAdminModeratorAuthorOrReadOnly,
         IsAuthenticatedOrReadOnly,
     )
-    pagination_class = CustomPagination
+    filter_backends = (EditableFilter,)
+    pagination_class = FeedPagination
 
-    def get_comment(self):
-        return get_object_or_404(Review, pk=self.kwargs.get('review_id'))
+    def perform_create(self, serializer):
+        serializer.save(author=self.request.user, review=self.get_parent())
 
-    def get_queryset(self):
-        return self.get_comment().comments.all()
 
-    def perform_create(self, serializer):
-        serializer.save(
-            author=self.request.user,
-            review=self.get_comment(),
+class BulkWriteView(InstrumentedViewMixin, APIView):
+    """
+    Пакетная запись: принимает JSON-массив или NDJSON и возвращает
+    статус каждого элемента. Если часть элементов не прошла проверку,
+    ответ имеет код 207.
+    """
+
+    writer_class = None
+    permission_classes = (IsAdmin,)
+    parser_classes = (JSONParser, NDJSONParser)
+
+    def post(self, request):
+        results = self.writer_class(request.user).write(request.data)
+        failed = sum(result["status"] == ERROR for result in results)
+        return Response(
+            {
+                "total": len(results),
+                "failed": failed,
+                "results": results,
+            },
+            status=(
+                status.HTTP_207_MULTI_STATUS if failed else status.HTTP_200_OK
+            ),
         )
 
 
-class GetJWTToken(viewsets.ModelViewSet):
+class TitleBulkView(BulkWriteView):
+    writer_class = TitleWriter
+
+
+class ReviewBulkView(BulkWriteView):
+    writer_class = ReviewWriter
+
+
+class CommentBulkView(BulkWriteView):
+    writer_class = CommentWriter
+
+
+class ExportView(APIView):
+    """
+    Потоковая выгрузка произведений, отзывов или комментариев
+    в NDJSON или CSV. Параметр since отбирает объекты новее
+    указанного id или даты публикации.
+    """
+
+    permission_classes = (IsAdmin,)
+
+    def get(self, request, kind, file_format):
+        rows, content_type = export(
+            kind, file_format, parse_since(request.query_params.get("since"))
+        )
+        response = StreamingHttpResponse(rows, content_type=content_type)
+        response["Content-Disposition"] = (
+            f'attachment; filename="{kind}.{file_format}"'
+        )
+        return response
+
+
+class GetJWTToken(InstrumentedViewMixin, viewsets.ModelViewSet):
     serializer_class = TokenSerializer
+    throttle_scope = "token"
 
     def create(self, request):
         serializer = self.get_serializer(data=request.data)
@@ -126,14 +331,15 @@ class GetJWTToken(viewsets.ModelViewSet):
         user = get_object_or_404(User, username=username)
 
         if default_token_generator.check_token(user, confirmation_code):
-            token = AccessToken.for_user(user)
+            token = RoleAccessToken.for_user(user)
             return Response({"token": f"{token}"}, status=status.HTTP_200_OK)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class SignUpViewSet(viewsets.ModelViewSet):
+class SignUpViewSet(InstrumentedViewMixin, viewsets.ModelViewSet):
     serializer_class = SignUpSerializer
+    throttle_scope = "signup"
 
     def create(self, request):
         serializer = self.get_serializer(data=request.data)
@@ -143,11 +349,8 @@ class SignUpViewSet(viewsets.ModelViewSet):
         confirmation_code = default_token_generator.make_token(user)
         mail_subject = "Код подтверждения"
         message = f"Ваш код подтверждения: {confirmation_code}"
-        send_mail(
-            mail_subject,
-            message,
-            f"Yamdb <{settings.EMAIL_ADMIN}>",
-            [user.email],
+        get_mail_queue().enqueue(
+            f"signup:{user.email}", user.email, mail_subject, message
         )
 
         return Response(
@@ -155,7 +358,9 @@ class SignUpViewSet(viewsets.ModelViewSet):
         )
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(
+    InstrumentedViewMixin, PlannedQuerysetMixin, viewsets.ModelViewSet
+):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = (IsAdmin,)
@@ -175,15 +380,16 @@ class UserViewSet(viewsets.ModelViewSet):
         ],
     )
     def get_self_user_page(self, request):
+        user = load_user(request.user)
         if request.method == "GET":
-            serializer = self.get_serializer(request.user)
+            serializer = self.get_serializer(user)
         else:
             serializer = self.get_serializer(
-                request.user, data=request.data, partial=True
+                user, data=request.data, partial=True
             )
             serializer.is_valid(raise_exception=True)
             serializer.save(
-                role=request.user.role,
+                role=user.role,
                 partial=True
             )
 
@@ -213,3 +419,47 @@ class UserViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_405_METHOD_NOT_ALLOWED,
             )
         return super().update(request, *args, **kwargs)
+
+
+@api_view(["GET"])
+@permission_classes([IsAdmin])
+def cache_stats(request):
+    """Счётчики попаданий и промахов кэша ответов текущего процесса."""
+    return Response(dict(stats))
+
+
+@api_view(["GET"])
+@permission_classes([IsAdmin])
+def mail_queue_stats(request):
+    """Глубина очереди писем и задержка доставки."""
+    return Response(get_mail_queue().metrics())
+
+
+@api_view(["GET"])
+@permission_classes([IsAdmin])
+def db_pool_stats(request):
+    """Занятость пулов соединений с базой и время ожидания соединения."""
+    return Response([pool.stats() for pool in all_pools()])
+
+
+@api_view(["GET"])
+@permission_classes([IsAdmin])
+def catalog_stats(request):
+    """Справочники жанров и категорий в памяти процесса."""
+    return Response([catalog.stats() for catalog in CATALOGS])
+
+
+def metrics(request):
+    """
+    Гистограммы производительности в формате Prometheus. Доступны
+    только с заголовком Authorization: Bearer <METRICS_TOKEN>; без
+    заданного токена адрес закрыт.
+    """
+    token = settings.METRICS_TOKEN
+    if not token or not constant_time_compare(
+        request.META.get("HTTP_AUTHORIZATION", ""), f"Bearer {token}"
+    ):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        render_metrics(), content_type="text/plain; version=0.0.4"
+    )
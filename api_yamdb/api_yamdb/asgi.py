@@ -1,7 +1,72 @@
+import asyncio
 import os
+from concurrent.futures import ThreadPoolExecutor
 
-from django.core.asgi import get_asgi_application
+from asgiref.wsgi import WsgiToAsgi
+from django.core.wsgi import get_wsgi_application
+
+from api_yamdb.db.pool import warm_pools
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "api_yamdb.settings")
 
+
+class ThreadPoolASGIHandler(WsgiToAsgi):
+    """
+    ASGI-приложение поверх WSGI-обработчика Django.
+
+    В Django 2.2 нет асинхронных представлений и ORM, поэтому запрос
+    выполняется синхронно в пуле из max_threads потоков, а цикл событий
+    тем временем принимает соединения и читает тела других запросов.
+    Размер пула ограничивает и число одновременных подключений к базе.
+    """
+
+    def __init__(self, wsgi_application, max_threads):
+        super().__init__(self.closing(wsgi_application))
+        self.max_threads = max_threads
+        self.loop = None
+
+    @staticmethod
+    def closing(wsgi_application):
+        # WsgiToAsgi не вызывает close() у ответа, а без него Django
+        # не отправляет request_finished и не закрывает соединения с базой.
+        def application(environ, start_response):
+            response = wsgi_application(environ, start_response)
+            try:
+                yield from response
+            finally:
+                if hasattr(response, "close"):
+                    response.close()
+
+        return application
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self.lifespan(receive, send)
+            return
+        loop = asyncio.get_event_loop()
+        if loop is not self.loop:
+            loop.set_default_executor(ThreadPoolExecutor(
+                max_workers=self.max_threads, thread_name_prefix="asgi"
+            ))
+            self.loop = loop
+        await super().__call__(scope, receive, send)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+def get_asgi_application():
+    from django.conf import settings
+
+    wsgi_application = get_wsgi_application()
+    return ThreadPoolASGIHandler(wsgi_application, settings.ASGI_THREADS)
+
+
 application = get_asgi_application()
+warm_pools()
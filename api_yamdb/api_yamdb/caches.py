@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+PROCESS_LOCAL_BACKENDS = (LocMemCache, DummyCache)
+
+
+def is_shared(alias):
+    """
+    Видят ли все процессы приложения одни и те же значения кэша alias.
+
+    LocMemCache и DummyCache хранят данные в памяти процесса: этого
+    достаточно, только пока gunicorn запускает один воркер.
+    """
+    return settings.WEB_CONCURRENCY <= 1 or not isinstance(
+        caches[alias], PROCESS_LOCAL_BACKENDS
+    )
@@ -0,0 +1,282 @@
+import time
+from collections import deque
+from functools import partial
+from threading import Condition, Lock
+
+from django.db import DEFAULT_DB_ALIAS
+
+pools = {}
+pools_lock = Lock()
+
+
+class PoolTimeoutError(Exception):
+    """За отведённое время не освободилось ни одного соединения."""
+
+
+class ConnectionPool:
+    """
+    Пул соединений с базой, общий для всех потоков процесса.
+
+    Свободные соединения выдаются в порядке LIFO, чтобы в работе
+    оставались недавно использованные. Соединение старше max_lifetime
+    закрывается, а простоявшее дольше check_interval перед выдачей
+    проверяется функцией check.
+    """
+
+    def __init__(
+        self,
+        connect,
+        check,
+        alias=DEFAULT_DB_ALIAS,
+        min_size=0,
+        max_size=10,
+        max_lifetime=None,
+        timeout=5.0,
+        check_interval=30.0,
+    ):
+        self.connect = connect
+        self.check = check
+        self.alias = alias
+        self.min_size = min(min_size, max_size)
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.timeout = timeout
+        self.check_interval = check_interval
+        self.condition = Condition()
+        self.idle = deque()
+        self.in_use = {}
+        self.size = 0
+        self.peak_in_use = 0
+        self.acquired = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.timeouts = 0
+        self.recycled = 0
+        self.discarded = 0
+
+    def acquire(self):
+        started = time.monotonic()
+        while True:
+            entry = self.take(started)
+            if entry is None:
+                return self.open()
+            connection, created, released = entry
+            if self.usable(connection, created, released):
+                return connection
+            self.discard(connection)
+
+    def take(self, started):
+        """
+        Забирает свободное соединение или резервирует место под новое
+        (тогда возвращает None). Ждёт, пока пул заполнен целиком.
+        """
+        with self.condition:
+            waited = False
+            while not self.idle and self.size >= self.max_size:
+                remaining = started + self.timeout - time.monotonic()
+                if remaining <= 0:
+                    self.timeouts += 1
+                    raise PoolTimeoutError(
+                        f"Пул соединений {self.alias} исчерпан: "
+                        f"{self.max_size} соединений заняты."
+                    )
+                waited = True
+                self.condition.wait(remaining)
+            if waited:
+                wait = time.monotonic() - started
+                self.waits += 1
+                self.wait_seconds += wait
+                self.max_wait_seconds = max(self.max_wait_seconds, wait)
+            self.acquired += 1
+            if not self.idle:
+                self.size += 1
+                return None
+            entry = self.idle.pop()
+            self.lend(entry[0], entry[1])
+            return entry
+
+    def lend(self, connection, created):
+        self.in_use[id(connection)] = created
+        self.peak_in_use = max(self.peak_in_use, len(self.in_use))
+
+    def open(self):
+        try:
+            connection = self.connect()
+        except Exception:
+            self.forget()
+            raise
+        with self.condition:
+            self.lend(connection, time.monotonic())
+        return connection
+
+    def forget(self):
+        with self.condition:
+            self.size -= 1
+            self.condition.notify()
+
+    def expired(self, created):
+        return (
+            self.max_lifetime is not None
+            and time.monotonic() - created >= self.max_lifetime
+        )
+
+    def usable(self, connection, created, released):
+        if self.expired(created):
+            self.recycled += 1
+            return False
+        if time.monotonic() - released < self.check_interval:
+            return True
+        return self.check(connection)
+
+    def discard(self, connection):
+        with self.condition:
+            self.in_use.pop(id(connection), None)
+            self.discarded += 1
+        self.close(connection)
+        self.forget()
+
+    def release(self, connection, reusable=True):
+        with self.condition:
+            created = self.in_use.pop(id(connection))
+            if not reusable:
+                self.discarded += 1
+            elif self.expired(created):
+                self.recycled += 1
+            else:
+                self.idle.append((connection, created, time.monotonic()))
+                self.condition.notify()
+                return
+        self.close(connection)
+        self.forget()
+
+    def warm(self):
+        """Заранее открывает min_size соединений."""
+        with self.condition:
+            missing = max(0, self.min_size - self.size)
+            self.size += missing
+        for _ in range(missing):
+            try:
+                connection = self.connect()
+            except Exception:
+                self.forget()
+                raise
+            now = time.monotonic()
+            with self.condition:
+                self.idle.appendleft((connection, now, now))
+                self.condition.notify()
+
+    def close_idle(self):
+        with self.condition:
+            idle, self.idle = list(self.idle), deque()
+            self.size -= len(idle)
+            self.condition.notify_all()
+        for connection, _, _ in idle:
+            self.close(connection)
+
+    @staticmethod
+    def close(connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def stats(self):
+        with self.condition:
+            in_use = len(self.in_use)
+            return {
+                "alias": self.alias,
+                "size": self.size,
+                "max_size": self.max_size,
+                "idle": len(self.idle),
+                "in_use": in_use,
+                "peak_in_use": self.peak_in_use,
+                "saturation": in_use / self.max_size,
+                "acquired": self.acquired,
+                "waits": self.waits,
+                "wait_seconds": self.wait_seconds,
+                "max_wait_seconds": self.max_wait_seconds,
+                "timeouts": self.timeouts,
+                "recycled": self.recycled,
+                "discarded": self.discarded,
+            }
+
+
+def shared_pool(key, factory):
+    with pools_lock:
+        if key not in pools:
+            pools[key] = factory()
+        return pools[key]
+
+
+def all_pools():
+    with pools_lock:
+        return list(pools.values())
+
+
+class PooledDatabaseWrapperMixin:
+    """
+    Берёт соединения DatabaseWrapper из пула процесса вместо того,
+    чтобы открывать новое на каждый запрос.
+
+    Параметры пула задаются ключом POOL в настройках базы: MIN_SIZE,
+    MAX_SIZE, MAX_LIFETIME, TIMEOUT и CHECK_INTERVAL (в секундах).
+    """
+
+    def __init__(self, settings_dict, alias=DEFAULT_DB_ALIAS):
+        # В конце каждого запроса соединение возвращается в пул:
+        # удерживать его за потоком незачем, это делает сам пул.
+        super().__init__(dict(settings_dict, CONN_MAX_AGE=0), alias)
+
+    def get_pool(self, conn_params=None):
+        if conn_params is None:
+            conn_params = self.get_connection_params()
+        options = self.settings_dict.get("POOL", {})
+        return shared_pool(
+            (self.alias, self.settings_dict["NAME"]),
+            partial(
+                ConnectionPool,
+                partial(super().get_new_connection, conn_params),
+                self.is_connection_usable,
+                alias=self.alias,
+                min_size=options.get("MIN_SIZE", 0),
+                max_size=options.get("MAX_SIZE", 10),
+                max_lifetime=options.get("MAX_LIFETIME"),
+                timeout=options.get("TIMEOUT", 5.0),
+                check_interval=options.get("CHECK_INTERVAL", 30.0),
+            ),
+        )
+
+    def get_new_connection(self, conn_params):
+        self.pool = self.get_pool(conn_params)
+        try:
+            return self.pool.acquire()
+        except PoolTimeoutError as error:
+            raise self.Database.OperationalError(str(error)) from error
+
+    def is_connection_usable(self, connection):
+        try:
+            connection.cursor().execute("SELECT 1")
+        except self.Database.Error:
+            return False
+        return True
+
+    def _close(self):
+        # Незавершённая транзакция не должна достаться следующему
+        # владельцу соединения.
+        try:
+            self.connection.rollback()
+        except self.Database.Error:
+            self.pool.release(self.connection, reusable=False)
+        else:
+            self.pool.release(self.connection)
+
+
+def warm_pools():
+    """Открывает минимальный запас соединений во всех пулах процесса."""
+    from django.db import connections
+
+    for alias in connections:
+        connection = connections[alias]
+        if isinstance(connection, PooledDatabaseWrapperMixin):
+            connection.get_pool().warm()
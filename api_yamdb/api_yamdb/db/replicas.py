@@ -0,0 +1,102 @@
+import random
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+from api_yamdb.caches import is_shared
+
+# База, из которой текущий запрос читает данные; None — основная.
+read_alias = ContextVar("read_alias", default=None)
+
+# Реплика -> момент, до которого она считается недоступной.
+unhealthy = {}
+
+
+class ReplicaRouter:
+    """
+    Направляет чтение в реплику, выбранную для текущего запроса,
+    а запись — всегда в основную базу.
+    """
+
+    def db_for_read(self, model, **hints):
+        return read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        # Объект, прочитанный из реплики, сохраняется в основную базу.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики содержат те же данные, что и основная база.
+        return True
+
+
+def mark_unhealthy(alias):
+    unhealthy[alias] = time.monotonic() + settings.REPLICA_RETRY_SECONDS
+
+
+def is_healthy(alias):
+    return unhealthy.get(alias, 0) <= time.monotonic()
+
+
+def check_replica(alias):
+    try:
+        connections[alias].ensure_connection()
+    except DatabaseError:
+        mark_unhealthy(alias)
+        return False
+    return True
+
+
+def choose_replica():
+    """
+    Выбирает реплику с вероятностью, пропорциональной весу, среди
+    доступных. Если ни одна не отвечает, возвращает None — читать
+    придётся из основной базы.
+    """
+    replicas = {
+        alias: weight
+        for alias, weight in settings.DATABASE_REPLICAS.items()
+        if weight > 0 and is_healthy(alias)
+    }
+    while replicas:
+        alias = random.choices(
+            list(replicas), weights=list(replicas.values())
+        )[0]
+        if check_replica(alias):
+            return alias
+        del replicas[alias]
+    return None
+
+
+def _sticky_key(user):
+    return f"replica:sticky:{user.pk}"
+
+
+def stick_to_primary(user):
+    """
+    После записи пользователь какое-то время читает из основной базы,
+    чтобы увидеть свои изменения до того, как их получат реплики.
+
+    Отметка хранится в кэше REPLICA_STICKY_CACHE: следующий запрос
+    может попасть в другой воркер, поэтому кэш должен быть общим.
+    """
+    caches[settings.REPLICA_STICKY_CACHE].set(
+        _sticky_key(user), True, settings.REPLICA_STICKINESS_SECONDS
+    )
+
+
+def is_sticky(user):
+    """
+    Читает ли пользователь из основной базы. Если кэш отметок виден
+    только текущему процессу, авторизованные пользователи всегда
+    читают из основной базы: отметку мог поставить другой воркер.
+    """
+    if not user.is_authenticated:
+        return False
+    alias = settings.REPLICA_STICKY_CACHE
+    return not is_shared(alias) or caches[alias].get(
+        _sticky_key(user), False
+    )
@@ -1,4 +1,5 @@
 import os
+from datetime import datetime
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -22,7 +23,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
 
-    'reviews',
+    'reviews.apps.ReviewsConfig',
     'api.apps.ApiConfig',
     'users.apps.UsersConfig',
 
@@ -30,9 +31,11 @@ INSTALLED_APPS = [
     'rest_framework_simplejwt',
 
     'django_filters',
+    'django.contrib.postgres',
 ]
 
 MIDDLEWARE = [
+    "api.middleware.PerformanceMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -63,6 +66,9 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "api_yamdb.wsgi.application"
 
+# Размер пула потоков, в котором ASGI-приложение выполняет запросы.
+ASGI_THREADS = int(os.getenv('ASGI_THREADS', default=16))
+
 
 # Database
 
@@ -73,10 +79,64 @@ DATABASES = {
         'USER': os.getenv('POSTGRES_USER', default='postgres'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', default='postgres'),
         'HOST': os.getenv('DB_HOST', default='localhost'),
-        'PORT': os.getenv('DB_PORT', default='5432')
+        'PORT': os.getenv('DB_PORT', default='5432'),
+        # Постоянные соединения: поток переиспользует соединение
+        # между запросами, пока оно не старше CONN_MAX_AGE секунд.
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', default=60)),
+        # Для движков api_yamdb.db.postgresql и api_yamdb.db.sqlite3:
+        # общий пул соединений процесса.
+        'POOL': {
+            'MIN_SIZE': int(os.getenv('DB_POOL_MIN_SIZE', default=2)),
+            'MAX_SIZE': int(os.getenv('DB_POOL_MAX_SIZE', default=10)),
+            'MAX_LIFETIME': int(os.getenv('DB_POOL_MAX_LIFETIME', default=1800)),
+            'TIMEOUT': float(os.getenv('DB_POOL_TIMEOUT', default=5)),
+            'CHECK_INTERVAL': float(os.getenv('DB_POOL_CHECK_INTERVAL', default=30)),
+        },
+    }
+}
+
+# Реплики для чтения: DB_REPLICA_HOSTS=host1,host2 и веса
+# DB_REPLICA_WEIGHTS=2,1. Остальные параметры берутся из default.
+DATABASE_REPLICAS = {}
+REPLICA_HOSTS = [
+    host for host in os.getenv('DB_REPLICA_HOSTS', default='').split(',') if host
+]
+REPLICA_WEIGHTS = [
+    int(weight) for weight in os.getenv('DB_REPLICA_WEIGHTS', default='').split(',') if weight
+]
+for number, host in enumerate(REPLICA_HOSTS):
+    DATABASES[f'replica_{number + 1}'] = dict(
+        DATABASES['default'], HOST=host, TEST={'MIRROR': 'default'}
+    )
+    DATABASE_REPLICAS[f'replica_{number + 1}'] = (
+        REPLICA_WEIGHTS[number] if number < len(REPLICA_WEIGHTS) else 1
+    )
+
+DATABASE_ROUTERS = ['api_yamdb.db.replicas.ReplicaRouter']
+REPLICA_STICKINESS_SECONDS = 5
+# Кэш отметок «читать из основной базы после записи».
+REPLICA_STICKY_CACHE = 'default'
+REPLICA_RETRY_SECONDS = 30
+
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            default='django.core.cache.backends.locmem.LocMemCache',
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', default='yamdb'),
     }
 }
 
+API_CACHE_ALIAS = 'default'
+# Число воркеров gunicorn. При нескольких воркерах отзыв токенов,
+# версии справочников и привязка к основной базе требуют общего кэша.
+WEB_CONCURRENCY = int(os.getenv('WEB_CONCURRENCY', default=1))
+API_CACHE_TIMEOUT = int(os.getenv('API_CACHE_TIMEOUT', default=300))
+# Сколько секунд воркер доверяет копии жанров и категорий в памяти.
+CATALOG_TTL = 60
+
 
 # Password validation
 
@@ -126,21 +186,83 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.AllowAny',
     ),
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.StatelessJWTAuthentication',
     ),
     'DEFAULT_PAGINATION_CLASS': 'api.pagination.CustomPagination',
-    'PAGE_SIZE': 15
+    'PAGE_SIZE': 15,
+    'DEFAULT_THROTTLE_CLASSES': (
+        'api.throttling.IPThrottle',
+        'api.throttling.UsernameThrottle',
+        'api.throttling.UserThrottle',
+        'api.throttling.AnonListThrottle',
+    ),
+    'DEFAULT_THROTTLE_RATES': {
+        'signup_ip': os.getenv('THROTTLE_SIGNUP_IP', default='20/hour'),
+        'signup_username': os.getenv(
+            'THROTTLE_SIGNUP_USERNAME', default='5/hour'
+        ),
+        'token_ip': os.getenv('THROTTLE_TOKEN_IP', default='30/min'),
+        'token_username': os.getenv(
+            'THROTTLE_TOKEN_USERNAME', default='5/min'
+        ),
+        'reviews_user': os.getenv('THROTTLE_REVIEWS_USER', default='20/hour'),
+        'comments_user': os.getenv(
+            'THROTTLE_COMMENTS_USER', default='60/hour'
+        ),
+        'anon_list_ip': os.getenv('THROTTLE_ANON_LIST_IP', default='120/min'),
+    },
+    # Перед приложением стоит nginx: адрес клиента — последний
+    # в X-Forwarded-For.
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', default=1)),
 }
 
+THROTTLE_CACHE = 'default'
+
 SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+JWT_REVOCATION_CHECK = os.getenv('JWT_REVOCATION_CHECK', default='1') == '1'
+JWT_REVOCATION_CACHE = 'default'
+
 EMAIL_ADMIN = 'admin@example.com'
 
+MAIL_QUEUE_BACKEND = os.getenv(
+    'MAIL_QUEUE_BACKEND', default='users.mail_queue.DatabaseMailQueue'
+)
+MAIL_QUEUE_FROM = f'Yamdb <{EMAIL_ADMIN}>'
+MAIL_QUEUE_MAX_ATTEMPTS = 5
+MAIL_QUEUE_RETRY_DELAY = 30
+# На сколько секунд выбранное воркером письмо скрыто от других воркеров.
+MAIL_QUEUE_CLAIM_SECONDS = 300
+
 USER_FIELD_LENGTH = 150
 
 PAGE_NUMBER = 10
 
 NAME_MAX_LENGTH = 256
 EMAIL_MAX_LENGTH = 254
+
+SEARCH_CONFIG = 'russian'
+SEARCH_FUZZY_THRESHOLD = 0.75
+# Сколько лучших совпадений упорядочивает поиск без PostgreSQL.
+SEARCH_MAX_RESULTS = 1000
+
+BULK_MAX_ITEMS = 5000
+BULK_BATCH_SIZE = 1000
+
+EXPORT_CHUNK_SIZE = 2000
+
+LEADERBOARD_PRIOR_REVIEWS = 10
+LEADERBOARD_TRENDING_DAYS = 7
+LEADERBOARD_HALF_LIFE_HOURS = 48
+LEADERBOARD_EPOCH = datetime(2020, 1, 1)
+# Сколько секунд процесс доверяет закешированной средней оценке.
+LEADERBOARD_MEAN_TTL = 900
+
+PERF_ENABLED = os.getenv('PERF_ENABLED', default='1') == '1'
+PERF_SAMPLE_RATE = float(os.getenv('PERF_SAMPLE_RATE', default=1.0))
+# Токен для /metrics; пустой — адрес закрыт.
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', default='')
+PERF_MAX_TRACKED_QUERIES = 200
+PERF_DUPLICATE_QUERIES_WARNING = 10
@@ -0,0 +1,148 @@
+import asyncio
+import time
+
+from api.authentication import RoleAccessToken
+from django.core.wsgi import get_wsgi_application
+from django.db import connection
+from django.db.backends.signals import connection_created
+from reviews.models import Review
+
+from api_yamdb.asgi import ThreadPoolASGIHandler
+
+from .runner import percentile
+
+
+class DatabaseLatency:
+    """
+    Добавляет к каждому SQL-запросу задержку, имитируя сетевой
+    round-trip до базы. Без неё SQLite в памяти отвечает мгновенно
+    и выигрыш от параллельной обработки запросов не виден.
+    """
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+
+    def __call__(self, execute, sql, params, many, context):
+        if self.seconds:
+            time.sleep(self.seconds)
+        return execute(sql, params, many, context)
+
+    def install(self, sender=None, connection=None, **kwargs):
+        # Соединение может открыться внутри execute_wrapper() другого
+        # кода, который при выходе снимает последнюю обёртку из списка.
+        if self not in connection.execute_wrappers:
+            connection.execute_wrappers.insert(0, self)
+
+    def __enter__(self):
+        # Потоки пула открывают собственные соединения с базой.
+        connection_created.connect(self.install)
+        self.install(connection=connection)
+        return self
+
+    def __exit__(self, *exc_info):
+        connection_created.disconnect(self.install)
+        if self in connection.execute_wrappers:
+            connection.execute_wrappers.remove(self)
+        self.seconds = 0
+
+
+def read_paths(titles):
+    popular = titles[0].pk
+    review = Review.objects.filter(title_id=popular).order_by("pk").first()
+    return [
+        "/api/v1/titles/",
+        f"/api/v1/titles/{popular}/",
+        f"/api/v1/titles/{popular}/reviews/",
+        f"/api/v1/titles/{popular}/reviews/{review.pk}/comments/",
+    ]
+
+
+def http_scope(path, token):
+    path, _, query = path.partition("?")
+    return {
+        "type": "http",
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "query_string": query.encode(),
+        "headers": [
+            (b"host", b"testserver"),
+            # Авторизованные запросы идут мимо кеша ответов.
+            (b"authorization", f"Bearer {token}".encode()),
+        ],
+        "server": ("testserver", 80),
+        "client": ("127.0.0.1", 0),
+    }
+
+
+async def call(application, scope):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        messages.append(message)
+
+    await application(scope, receive, send)
+    return messages[0]["status"]
+
+
+def run_concurrent(application, scopes, requests, concurrency):
+    """
+    Выполняет requests запросов к ASGI-приложению, держа в работе
+    не больше concurrency запросов одновременно.
+    """
+
+    async def drive():
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def timed(scope):
+            async with semaphore:
+                started = time.perf_counter()
+                status = await call(application, scope)
+                return time.perf_counter() - started, status
+
+        return await asyncio.gather(
+            *(timed(scopes[i % len(scopes)]) for i in range(requests))
+        )
+
+    loop = asyncio.new_event_loop()
+    try:
+        started = time.perf_counter()
+        outcomes = loop.run_until_complete(drive())
+        elapsed = time.perf_counter() - started
+    finally:
+        loop.close()
+    latencies = [latency for latency, _ in outcomes]
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": sum(status >= 400 for _, status in outcomes),
+        "throughput": requests / elapsed,
+        "p50_ms": percentile(latencies, 0.5) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+    }
+
+
+def compare_modes(users, titles, requests, concurrency, threads, latency):
+    """
+    Сравнивает обработку чтений синхронным воркером (один запрос за раз,
+    как gunicorn с sync-воркером) и ASGI-приложением с пулом потоков.
+    """
+    token = RoleAccessToken.for_user(users[0])
+    scopes = [http_scope(path, token) for path in read_paths(titles)]
+    wsgi_application = get_wsgi_application()
+    modes = {
+        "wsgi": (ThreadPoolASGIHandler(wsgi_application, 1), 1),
+        "asgi": (
+            ThreadPoolASGIHandler(wsgi_application, threads),
+            concurrency,
+        ),
+    }
+    with DatabaseLatency(latency):
+        return {
+            name: run_concurrent(application, scopes, requests, limit)
+            for name, (application, limit) in modes.items()
+        }
@@ -0,0 +1,144 @@
+import random
+from dataclasses import dataclass
+
+from django.db import connection
+from reviews.genres import rebuild_genre_ids
+from reviews.leaderboard import refresh_leaderboards
+from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.ratings import rebuild_ratings, rebuild_score_stats
+from reviews.signals import bulk_loaded
+from users.models import ADMIN, MODERATOR, USER, User
+
+BATCH_SIZE = 2000
+
+
+@dataclass
+class DatasetSize:
+    titles: int = 1000
+    users: int = 300
+    reviews: int = 10000
+    comments: int = 20000
+    genres: int = 20
+    categories: int = 8
+    max_genres_per_title: int = 4
+    zipf_exponent: float = 1.1
+
+
+def zipf_weights(count, exponent):
+    return [1 / rank ** exponent for rank in range(1, count + 1)]
+
+
+def distribute(total, count, exponent, cap):
+    """Раскладывает total элементов по count корзинам по закону Ципфа."""
+    weights = zipf_weights(count, exponent)
+    scale = total / sum(weights)
+    return [min(cap, max(0, round(weight * scale))) for weight in weights]
+
+
+def generate_dataset(size, seed=0):
+    """
+    Заполняет базу воспроизводимым набором данных.
+
+    Популярность произведений и отзывов распределена по Ципфу: немногие
+    произведения собирают большую часть отзывов и комментариев.
+    """
+    rng = random.Random(seed)
+    # SQLite ограничивает число параметров и UNION в одном INSERT,
+    # там Django сам подбирает размер пакета.
+    batch_size = None if connection.vendor == "sqlite" else BATCH_SIZE
+    User.objects.bulk_create(
+        [
+            User(
+                username=f"bench_user_{i}",
+                email=f"bench_user_{i}@yamdb.fake",
+                role=rng.choices(
+                    (USER, MODERATOR, ADMIN), weights=(90, 8, 2)
+                )[0],
+            )
+            for i in range(size.users)
+        ],
+        batch_size=batch_size,
+    )
+    users = list(User.objects.filter(username__startswith="bench_user_"))
+    Category.objects.bulk_create(
+        Category(name=f"Категория {i}", slug=f"bench-category-{i}")
+        for i in range(size.categories)
+    )
+    categories = list(Category.objects.filter(slug__startswith="bench-"))
+    Genre.objects.bulk_create(
+        Genre(name=f"Жанр {i}", slug=f"bench-genre-{i}")
+        for i in range(size.genres)
+    )
+    genres = list(Genre.objects.filter(slug__startswith="bench-"))
+
+    Title.objects.bulk_create(
+        (
+            Title(
+                name=f"Произведение {i}",
+                year=rng.randint(1900, 2020),
+                description=f"Описание произведения {i}",
+                category=rng.choice(categories),
+            )
+            for i in range(size.titles)
+        ),
+        batch_size=batch_size,
+    )
+    titles = list(
+        Title.objects.filter(name__startswith="Произведение ")
+        .order_by("pk")
+        .only("pk")
+    )
+    Title.genre.through.objects.bulk_create(
+        (
+            Title.genre.through(title_id=title.pk, genre_id=genre.pk)
+            for title in titles
+            for genre in rng.sample(
+                genres, rng.randint(1, size.max_genres_per_title)
+            )
+        ),
+        batch_size=batch_size,
+    )
+
+    per_title = distribute(
+        size.reviews, len(titles), size.zipf_exponent, len(users)
+    )
+    Review.objects.bulk_create(
+        (
+            Review(
+                title_id=title.pk,
+                author_id=author.pk,
+                text=f"Отзыв {author.pk} на {title.pk}",
+                score=rng.randint(1, 10),
+            )
+            for title, count in zip(titles, per_title)
+            for author in rng.sample(users, count)
+        ),
+        batch_size=batch_size,
+    )
+    rebuild_genre_ids()
+    rebuild_ratings()
+    rebuild_score_stats()
+    refresh_leaderboards()
+
+    reviews = list(
+        Review.objects.order_by("title_id", "pk").values_list("pk", flat=True)
+    )
+    if reviews:
+        per_review = distribute(
+            size.comments, len(reviews), size.zipf_exponent, size.comments
+        )
+        Comment.objects.bulk_create(
+            (
+                Comment(
+                    review_id=review,
+                    author_id=rng.choice(users).pk,
+                    text="Комментарий",
+                )
+                for review, count in zip(reviews, per_review)
+                for _ in range(count)
+            ),
+            batch_size=batch_size,
+        )
+    for model in (User, Category, Genre, Title, Review, Comment):
+        bulk_loaded.send(sender=model)
+    return users, titles
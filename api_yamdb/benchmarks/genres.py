@@ -0,0 +1,60 @@
+import time
+
+from django.db.models import Count
+from reviews.models import Genre, Title
+
+from .runner import percentile
+
+PAGE_SIZE = 15
+
+
+def popular_genres(count=2):
+    return list(
+        Genre.objects.annotate(titles=Count("genre"))
+        .order_by("-titles", "pk")[:count]
+    )
+
+
+def genre_filter_shapes():
+    """
+    Пары запросов «все жанры» и «любой из жанров»: через соединение
+    с таблицами жанров и по Title.genre_ids.
+    """
+    genres = popular_genres()
+    slugs = [genre.slug for genre in genres]
+    ids = [genre.pk for genre in genres]
+    join_all = Title.objects.all()
+    for slug in slugs:
+        join_all = join_all.filter(genre__slug=slug)
+    return {
+        "genre_all_join": join_all,
+        "genre_all_array": Title.objects.filter(genre_ids__contains=ids),
+        "genre_any_join": (
+            Title.objects.filter(genre__slug__in=slugs).distinct()
+        ),
+        "genre_any_array": Title.objects.filter(genre_ids__overlap=ids),
+    }
+
+
+def measure(queryset, repeat):
+    """Время страницы списка вместе с подсчётом строк, как в API."""
+    timings, rows = [], None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = queryset.count()
+        list(queryset.order_by("name").values_list("pk", flat=True)[
+            :PAGE_SIZE
+        ])
+        timings.append((time.perf_counter() - started) * 1000)
+    return {
+        "rows": rows,
+        "p50_ms": percentile(timings, 0.5),
+        "p95_ms": percentile(timings, 0.95),
+    }
+
+
+def compare_genre_filters(repeat):
+    return {
+        name: measure(queryset, repeat)
+        for name, queryset in genre_filter_shapes().items()
+    }
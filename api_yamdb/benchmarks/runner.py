@@ -0,0 +1,198 @@
+import json
+import time
+from itertools import count
+
+from api.authentication import RoleAccessToken
+from django.contrib.auth.tokens import default_token_generator
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from reviews.models import Review
+
+# Прирост p95 меньше этого порога считается шумом измерений.
+MIN_P95_DELTA_MS = 2.0
+
+
+def percentile(values, share):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(share * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class Scenario:
+    """Один тип запроса: метод, адрес и тело строятся на каждой итерации."""
+
+    def __init__(self, name, method, build):
+        self.name = name
+        self.method = method
+        self.build = build
+
+
+def build_scenarios(users, titles):
+    popular = titles[0].pk
+    review = Review.objects.filter(title_id=popular).order_by("pk").first()
+    reviewers = Review.objects.values_list("author_id", "title_id")
+    taken = set(reviewers)
+    free_pairs = (
+        (user.pk, title.pk)
+        for title in titles
+        for user in users
+        if (user.pk, title.pk) not in taken
+    )
+    serial = count()
+    reader = users[0]
+    by_pk = {user.pk: user for user in users}
+    confirmed = users[-1]
+    confirmation_code = default_token_generator.make_token(confirmed)
+
+    def review_create():
+        author_id, title_id = next(free_pairs)
+        return (
+            f"/api/v1/titles/{title_id}/reviews/",
+            {"text": "Новый отзыв", "score": 7},
+            by_pk[author_id],
+        )
+
+    def signup():
+        number = next(serial)
+        return (
+            "/api/v1/auth/signup/",
+            {
+                "username": f"bench_signup_{number}",
+                "email": f"bench_signup_{number}@yamdb.fake",
+            },
+            None,
+        )
+
+    return [
+        Scenario(
+            "titles_list_anonymous",
+            "get",
+            lambda: ("/api/v1/titles/", None, None),
+        ),
+        Scenario(
+            "titles_list",
+            "get",
+            lambda: ("/api/v1/titles/", None, reader),
+        ),
+        Scenario(
+            "titles_retrieve",
+            "get",
+            lambda: (f"/api/v1/titles/{popular}/", None, reader),
+        ),
+        Scenario(
+            "titles_filter",
+            "get",
+            lambda: ("/api/v1/titles/?genre=bench-genre-1", None, reader),
+        ),
+        Scenario(
+            "reviews_list",
+            "get",
+            lambda: (f"/api/v1/titles/{popular}/reviews/", None, reader),
+        ),
+        Scenario(
+            "comments_list",
+            "get",
+            lambda: (
+                f"/api/v1/titles/{popular}/reviews/{review.pk}/comments/",
+                None,
+                reader,
+            ),
+        ),
+        Scenario("reviews_create", "post", review_create),
+        Scenario(
+            "comments_create",
+            "post",
+            lambda: (
+                f"/api/v1/titles/{popular}/reviews/{review.pk}/comments/",
+                {"text": "Новый комментарий"},
+                reader,
+            ),
+        ),
+        Scenario("signup", "post", signup),
+        Scenario(
+            "token",
+            "post",
+            lambda: (
+                "/api/v1/auth/token/",
+                {
+                    "username": confirmed.username,
+                    "confirmation_code": confirmation_code,
+                },
+                None,
+            ),
+        ),
+    ]
+
+
+def run_scenario(scenario, requests):
+    clients = {}
+    latencies, queries, errors = [], [], 0
+    started = time.perf_counter()
+    for _ in range(requests):
+        path, data, user = scenario.build()
+        key = user.pk if user else None
+        if key not in clients:
+            clients[key] = APIClient()
+            if user:
+                token = RoleAccessToken.for_user(user)
+                clients[key].credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        client = clients[key]
+        with CaptureQueriesContext(connection) as captured:
+            request_started = time.perf_counter()
+            response = getattr(client, scenario.method)(path, data)
+            latencies.append(time.perf_counter() - request_started)
+        queries.append(len(captured))
+        if response.status_code >= 400:
+            errors += 1
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": requests,
+        "errors": errors,
+        "throughput": requests / elapsed,
+        "p50_ms": percentile(latencies, 0.5) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "queries": max(queries),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Возвращает описания регрессий относительно сохранённого эталона."""
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        if result["queries"] > reference["queries"]:
+            regressions.append(
+                f"{name}: запросов к БД {result['queries']} "
+                f"вместо {reference['queries']}"
+            )
+        allowed = max(
+            reference["p95_ms"] * (1 + tolerance),
+            reference["p95_ms"] + MIN_P95_DELTA_MS,
+        )
+        if result["p95_ms"] > allowed:
+            regressions.append(
+                f"{name}: p95 {result['p95_ms']:.1f} мс "
+                f"при эталоне {reference['p95_ms']:.1f} мс"
+            )
+        if result["errors"] > reference.get("errors", 0):
+            regressions.append(f"{name}: ошибок {result['errors']}")
+    return regressions
+
+
+def load_baseline(path):
+    with open(path, encoding="utf-8") as baseline:
+        return json.load(baseline)
+
+
+def save_baseline(path, dataset, results):
+    with open(path, "w", encoding="utf-8") as baseline:
+        json.dump(
+            {"dataset": dataset, "results": results},
+            baseline,
+            ensure_ascii=False,
+            indent=2,
+        )
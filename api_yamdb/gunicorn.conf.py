@@ -0,0 +1,17 @@
+import os
+
+bind = "0:8000"
+
+# Число процессов-воркеров. Каждый ASGI-воркер дополнительно выполняет
+# запросы в пуле из ASGI_THREADS потоков.
+workers = int(os.getenv("WEB_CONCURRENCY", default=1))
+
+if os.getenv("SERVER_MODE", default="wsgi") == "asgi":
+    worker_class = "uvicorn.workers.UvicornWorker"
+
+
+def post_worker_init(worker):
+    """Загружает справочники жанров и категорий до первого запроса."""
+    from api.catalog import warm_catalogs
+
+    warm_catalogs()
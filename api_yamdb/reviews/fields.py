@@ -0,0 +1,77 @@
+from django.db import models
+
+SEPARATOR = "|"
+
+
+class IntegerArrayField(models.Field):
+    """
+    Список целых чисел в одном столбце.
+
+    В PostgreSQL это integer[] с GIN-индексом, в остальных базах —
+    строка вида "|1|5|": тесты на SQLite проверяют ту же логику.
+    Поддерживает поиск contains (есть все значения) и overlap (есть
+    хотя бы одно).
+    """
+
+    description = "Список целых чисел"
+
+    def db_type(self, connection):
+        if connection.vendor == "postgresql":
+            return "integer[]"
+        return "text"
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        if value is None or connection.vendor == "postgresql":
+            return value
+        if not value:
+            return ""
+        return "".join(f"{SEPARATOR}{item}" for item in value) + SEPARATOR
+
+    def from_db_value(self, value, expression, connection):
+        return self.to_python(value)
+
+    def to_python(self, value):
+        if value is None or isinstance(value, list):
+            return value
+        return [int(item) for item in value.split(SEPARATOR) if item]
+
+
+class ArrayLookup(models.Lookup):
+    """Поиск по IntegerArrayField; правая часть — список чисел."""
+
+    prepare_rhs = False
+    operator = None
+    joiner = None
+
+    def as_postgresql(self, compiler, connection):
+        lhs, params = self.process_lhs(compiler, connection)
+        return f"{lhs} {self.operator} %s::integer[]", [
+            *params, [int(item) for item in self.rhs]
+        ]
+
+    def as_sql(self, compiler, connection):
+        lhs, params = self.process_lhs(compiler, connection)
+        if not self.rhs:
+            return ("1 = 1" if self.joiner == "AND" else "1 = 0"), []
+        conditions = f" {self.joiner} ".join(
+            f"{lhs} LIKE %s" for _ in self.rhs
+        )
+        return f"({conditions})", [
+            param
+            for item in self.rhs
+            for param in (*params, f"%{SEPARATOR}{int(item)}{SEPARATOR}%")
+        ]
+
+
+@IntegerArrayField.register_lookup
+class ArrayContains(ArrayLookup):
+    lookup_name = "contains"
+    operator = "@>"
+    joiner = "AND"
+
+
+@IntegerArrayField.register_lookup
+class ArrayOverlap(ArrayLookup):
+    lookup_name = "overlap"
+    operator = "&&"
+    joiner = "OR"
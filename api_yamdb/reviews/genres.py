@@ -0,0 +1,50 @@
+from collections import defaultdict
+
+from django.db import connection
+from django.utils import timezone
+
+from .models import Title
+
+
+def genre_ids_of(title_ids, using=None):
+    """Словарь {id произведения: отсортированные id жанров}."""
+    genres = defaultdict(list)
+    rows = (
+        Title.genre.through.objects.using(using)
+        .filter(title_id__in=title_ids)
+        .order_by("genre_id")
+        .values_list("title_id", "genre_id")
+    )
+    for title_id, genre_id in rows:
+        genres[title_id].append(genre_id)
+    return genres
+
+
+def update_genre_ids(title_ids, using=None):
+    """Обновляет Title.genre_ids по таблице связи с жанрами."""
+    title_ids = list(title_ids)
+    if not title_ids:
+        return
+    genres = genre_ids_of(title_ids, using)
+    now = timezone.now()
+    Title.objects.using(using).bulk_update(
+        [
+            Title(pk=title_id, genre_ids=genres[title_id], updated_at=now)
+            for title_id in title_ids
+        ],
+        ["genre_ids", "updated_at"],
+        batch_size=None if connection.vendor == "sqlite" else 1000,
+    )
+
+
+def rebuild_genre_ids(queryset=None, chunk_size=2000):
+    """
+    Пересчитывает Title.genre_ids для всех произведений: один запрос
+    к таблице связи на порцию произведений.
+    """
+    if queryset is None:
+        queryset = Title.objects.all()
+    title_ids = list(queryset.order_by("pk").values_list("pk", flat=True))
+    for start in range(0, len(title_ids), chunk_size):
+        update_genre_ids(title_ids[start:start + chunk_size])
+    return len(title_ids)
@@ -0,0 +1,210 @@
+import math
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.dispatch import Signal
+from django.utils import timezone
+
+from .models import LeaderboardEntry, Review, Title
+
+TOP = "top"
+TRENDING = "trending"
+MEAN_CACHE_KEY = "leaderboard:mean"
+
+leaderboards_refreshed = Signal()
+
+
+def genre_board(genre_id):
+    return f"{TOP}:genre:{genre_id}"
+
+
+def category_board(category_id):
+    return f"{TOP}:category:{category_id}"
+
+
+def batch_size():
+    return None if connection.vendor == "sqlite" else 2000
+
+
+def global_mean(refresh=False):
+    """
+    Средняя оценка по всему сервису, по счётчикам произведений.
+
+    Значение кешируется на LEADERBOARD_MEAN_TTL секунд: пересборка
+    перезаписывает его, а процессы с собственным кешем перечитывают
+    среднее не реже этого срока.
+    """
+    mean = None if refresh else cache.get(MEAN_CACHE_KEY)
+    if mean is None:
+        totals = Title.objects.aggregate(
+            scores=Sum("score_sum"), reviews=Sum("review_count")
+        )
+        mean = (
+            totals["scores"] / totals["reviews"] if totals["reviews"] else 0
+        )
+        cache.set(MEAN_CACHE_KEY, mean, settings.LEADERBOARD_MEAN_TTL)
+    return mean
+
+
+def weighted_rating(score_sum, review_count, mean):
+    """
+    Байесовская оценка: пока отзывов мало, рейтинг произведения
+    притягивается к средней оценке по сервису.
+    """
+    prior = settings.LEADERBOARD_PRIOR_REVIEWS
+    return (score_sum + prior * mean) / (review_count + prior)
+
+
+def _decay_units(moment):
+    epoch = settings.LEADERBOARD_EPOCH
+    if timezone.is_aware(moment):
+        epoch = timezone.make_aware(epoch, timezone.utc)
+    hours = (moment - epoch).total_seconds() / 3600
+    return hours / settings.LEADERBOARD_HALF_LIFE_HOURS * math.log(2)
+
+
+def trending_weight(score, moment):
+    """
+    Логарифм вклада отзыва в популярность.
+
+    Вклад растёт вдвое за каждый период полураспада от фиксированной
+    эпохи, поэтому сумма вкладов упорядочивает произведения так же,
+    как затухающая во времени оценка, и её можно наращивать
+    инкрементально, не пересчитывая старые отзывы.
+    """
+    return math.log(score / 10) + _decay_units(moment)
+
+
+def log_add(first, second):
+    """log(exp(first) + exp(second)) без переполнения."""
+    if first is None:
+        return second
+    high, low = max(first, second), min(first, second)
+    return high + math.log1p(math.exp(low - high))
+
+
+def trending_value(score, now=None):
+    """Популярность на текущий момент из сохранённого логарифма."""
+    return math.exp(score - _decay_units(now or timezone.now()))
+
+
+def _top_entries(titles, genres, mean):
+    for pk, score_sum, review_count, category_id in titles:
+        score = weighted_rating(score_sum, review_count, mean)
+        boards = [TOP] + [genre_board(genre) for genre in genres[pk]]
+        if category_id:
+            boards.append(category_board(category_id))
+        for board in boards:
+            yield LeaderboardEntry(board=board, title_id=pk, score=score)
+
+
+def _genres(titles):
+    genres = defaultdict(list)
+    for title_id, genre_id in titles.values_list("title_id", "genre_id"):
+        genres[title_id].append(genre_id)
+    return genres
+
+
+def update_rankings(title_ids, using=None):
+    """
+    Пересчитывает взвешенный рейтинг произведений во всех топах.
+
+    Число запросов не зависит от количества произведений: функция
+    обновляет все произведения, изменённые между проходами.
+    """
+    titles = Title.objects.using(using).filter(
+        pk__in=title_ids, review_count__gt=0
+    ).values_list("pk", "score_sum", "review_count", "category_id")
+    genres = _genres(
+        Title.genre.through.objects.using(using).filter(
+            title_id__in=title_ids
+        )
+    )
+    entries = LeaderboardEntry.objects.using(using)
+    with transaction.atomic(using=using):
+        entries.filter(
+            title_id__in=title_ids, board__startswith=TOP
+        ).delete()
+        entries.bulk_create(
+            _top_entries(titles, genres, global_mean()),
+            batch_size=batch_size(),
+        )
+
+
+def _trending_scores(titles=None):
+    """
+    Популярность произведений по отзывам за последние
+    LEADERBOARD_TRENDING_DAYS дней; titles сужает выборку.
+    """
+    since = timezone.now() - timedelta(days=settings.LEADERBOARD_TRENDING_DAYS)
+    recent = Review.objects.filter(pub_date__gte=since)
+    if titles is not None:
+        recent = recent.filter(title_id__in=titles)
+    trending = {}
+    for title_id, score, moment in recent.values_list(
+        "title_id", "score", "pub_date"
+    ).iterator():
+        trending[title_id] = log_add(
+            trending.get(title_id), trending_weight(score, moment)
+        )
+    return trending
+
+
+def refresh_changed(since):
+    """
+    Обновляет таблицы лидеров для произведений, изменённых после since:
+    новые, изменённые и удалённые отзывы сдвигают updated_at
+    произведения. Возвращает число обновлённых произведений.
+    """
+    title_ids = list(
+        Title.objects.filter(updated_at__gte=since).values_list(
+            "pk", flat=True
+        )
+    )
+    if not title_ids:
+        return 0
+    trending = _trending_scores(title_ids)
+    with transaction.atomic():
+        update_rankings(title_ids)
+        LeaderboardEntry.objects.filter(
+            board=TRENDING, title_id__in=title_ids
+        ).delete()
+        LeaderboardEntry.objects.bulk_create(
+            [
+                LeaderboardEntry(board=TRENDING, title_id=pk, score=score)
+                for pk, score in trending.items()
+            ],
+            batch_size=batch_size(),
+        )
+    leaderboards_refreshed.send(sender=LeaderboardEntry)
+    return len(title_ids)
+
+
+def refresh_leaderboards():
+    """
+    Полностью пересобирает таблицы лидеров по счётчикам рейтинга
+    и отзывам за последние LEADERBOARD_TRENDING_DAYS дней.
+    Возвращает число записей.
+    """
+    mean = global_mean(refresh=True)
+    rated = Title.objects.filter(review_count__gt=0)
+    entries = list(_top_entries(
+        rated.values_list("pk", "score_sum", "review_count", "category_id"),
+        _genres(Title.genre.through.objects.filter(title__in=rated)),
+        mean,
+    ))
+    entries.extend(
+        LeaderboardEntry(board=TRENDING, title_id=title_id, score=score)
+        for title_id, score in _trending_scores().items()
+    )
+    with transaction.atomic():
+        LeaderboardEntry.objects.all().delete()
+        LeaderboardEntry.objects.bulk_create(
+            entries, batch_size=batch_size()
+        )
+    leaderboards_refreshed.send(sender=LeaderboardEntry)
+    return len(entries)
@@ -1,33 +1,307 @@
 import csv
+import json
 import os
+import resource
+import time
+from contextlib import contextmanager
+from itertools import chain, islice
 
 from django.apps import apps
-from django.core.management import BaseCommand
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.core.management import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, models, transaction
+from django.utils import timezone
+from reviews.genres import rebuild_genre_ids
+from reviews.leaderboard import refresh_leaderboards
+from reviews.ratings import rebuild_ratings, rebuild_score_stats
+from reviews.signals import bulk_loaded
 
-app_models = apps.get_app_config('reviews').get_models()
-filepaths = [
-    file for file in os.listdir("static/data/") if file.endswith('.csv')
-]
+FILE_MODELS = {
+    "users": "users.User",
+    "category": "reviews.Category",
+    "genre": "reviews.Genre",
+    "titles": "reviews.Title",
+    "genre_title": "reviews.Title_genre",
+    "review": "reviews.Review",
+    "comments": "reviews.Comment",
+}
+STATE_FILE = ".imports_state.json"
 
 
 def iter_csv(file_path: str):
+    """Построчно читает csv-файл, не загружая его в память целиком."""
+    with open(file_path, "r", encoding="utf-8", newline="") as inp_f:
+        yield from csv.DictReader(inp_f)
+
+
+def dependency_order(model_list):
+    """Сортирует модели так, чтобы связанные по FK шли раньше зависимых."""
+    ordered, visiting = [], set()
+
+    def visit(model):
+        if model in ordered:
+            return
+        if model in visiting:
+            raise CommandError(f"Циклическая зависимость: {model.__name__}")
+        visiting.add(model)
+        for field in model._meta.concrete_fields:
+            related = field.related_model
+            if related in model_list and related is not model:
+                visit(related)
+        visiting.discard(model)
+        ordered.append(model)
+
+    for model in model_list:
+        visit(model)
+    return tuple(ordered)
+
+
+def column_fields(model, header):
+    """Сопоставляет колонки csv с полями модели."""
+    fields = {}
+    for column in header:
+        name = column[:-3] if column.endswith("_id") else column
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            raise CommandError(
+                f"{model.__name__}: неизвестная колонка {column}"
+            )
+        fields[column] = field
+    return fields
+
+
+def convert(field, value):
+    if value == "" and (field.null or field.is_relation):
+        return None
+    if field.is_relation:
+        return field.target_field.to_python(value)
+    if isinstance(field, models.DateTimeField) and not settings.USE_TZ:
+        value = field.to_python(value)
+        if timezone.is_aware(value):
+            return timezone.make_naive(value, timezone.utc)
+        return value
+    return field.to_python(value)
+
+
+@contextmanager
+def keep_csv_values(fields):
+    """Не даёт auto_now/auto_now_add перезаписать даты из файла."""
+    patched = [
+        (field, field.auto_now, field.auto_now_add)
+        for field in fields
+        if isinstance(field, models.DateField)
+    ]
+    for field, _, _ in patched:
+        field.auto_now = field.auto_now_add = False
     try:
-        with open(file_path, 'r') as inp_f:
-            reader = csv.DictReader(inp_f)
-            for row in reader:
-                yield row
-    except Exception as e:
-        return f"Ошибка чтения csv-файла: {e}"
+        yield
+    finally:
+        for field, auto_now, auto_now_add in patched:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def read_objects(model, file_path):
+    """
+    Поля из заголовка csv и ленивый поток объектов модели по строкам.
+    Поля, которых нет в файле, получают значения по умолчанию модели.
+    """
+    rows = iter_csv(file_path)
+    first = next(rows, None)
+    if first is None:
+        return {}, iter(())
+    fields = column_fields(model, first)
+    attnames = {column: f.attname for column, f in fields.items()}
+    objects = (
+        model(**{
+            attnames[column]: convert(fields[column], value)
+            for column, value in row.items()
+        })
+        for row in chain((first,), rows)
+    )
+    return fields, objects
+
+
+def copy_columns(model, fields):
+    """
+    Все столбцы таблицы для COPY. База не знает значений по умолчанию
+    Django, поэтому столбцы, которых нет в файле (пароль, счётчики,
+    updated_at), тоже передаются. Первичный ключ — только из файла.
+    """
+    present = set(fields.values())
+    return [
+        field for field in model._meta.concrete_fields
+        if field in present or not field.primary_key
+    ]
+
+
+def copy_value(value):
+    """Значение в формате csv для COPY: NULL — пустое поле без кавычек."""
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        value = "{" + ",".join(map(str, value)) + "}"
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def copy_lines(objects, columns):
+    """Строки COPY с учётом auto_now и подготовки значений полей."""
+    for obj in objects:
+        yield ",".join(
+            copy_value(field.get_db_prep_save(
+                field.pre_save(obj, add=True), connection
+            ))
+            for field in columns
+        ) + "\n"
+
+
+class CopyStream:
+    """
+    Файловый объект для copy_expert, читающий строки из генератора.
+    psycopg2 отправляет кусок любой длины, поэтому size не соблюдается.
+    """
+
+    chunk_lines = 1000
+
+    def __init__(self, lines):
+        self.lines = lines
+
+    def read(self, size=-1):
+        return "".join(islice(self.lines, self.chunk_lines))
+
+
+def peak_memory_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
 
 
 class Command(BaseCommand):
+    help = (
+        "Загружает данные из csv-файлов в порядке зависимостей моделей "
+        "пакетами bulk_create или через COPY в PostgreSQL."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--path",
+            default=os.path.join(settings.BASE_DIR, "static", "data"),
+            help="Каталог с csv-файлами.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Размер пакета bulk_create.",
+        )
+        parser.add_argument(
+            "--copy",
+            action="store_true",
+            help="Использовать COPY FROM STDIN (только PostgreSQL).",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Игнорировать сохранённый прогресс и загрузить всё заново.",
+        )
+
     def handle(self, *args, **options):
-        try:
-            for file in filepaths:
-                for model in app_models:
-                    reader = iter_csv(file)
-                    for row in reader:
-                        model.objects.bulk_create(**row)
-            return "Импорт БД завершён."
-        except Exception as e:
-            return f"Ошибка импорта: {e}"
+        path = options["path"]
+        if not os.path.isdir(path):
+            raise CommandError(f"Каталог {path} не найден.")
+        if options["copy"] and connection.vendor != "postgresql":
+            raise CommandError("COPY поддерживается только в PostgreSQL.")
+
+        found = {
+            os.path.splitext(name)[0]: name
+            for name in os.listdir(path)
+            if name.endswith(".csv")
+        }
+        for stem in sorted(set(found) - set(FILE_MODELS)):
+            self.stderr.write(f"Пропущен файл без модели: {found[stem]}")
+        files = {
+            apps.get_model(label): found[stem]
+            for stem, label in FILE_MODELS.items()
+            if stem in found
+        }
+
+        state_path = os.path.join(path, STATE_FILE)
+        done = set() if options["restart"] else self.load_state(state_path)
+        for model in dependency_order(list(files)):
+            file_name = files[model]
+            if file_name in done:
+                self.stdout.write(f"{file_name}: уже загружен, пропуск.")
+                continue
+            started = time.monotonic()
+            with transaction.atomic():
+                if options["copy"]:
+                    count = self.copy_file(
+                        model, os.path.join(path, file_name)
+                    )
+                else:
+                    count = self.load_file(
+                        model,
+                        os.path.join(path, file_name),
+                        options["batch_size"],
+                    )
+                self.reset_sequence(model)
+                bulk_loaded.send(sender=model)
+                if model is apps.get_model("reviews.Title_genre"):
+                    rebuild_genre_ids()
+                if model is apps.get_model("reviews.Review"):
+                    rebuild_ratings()
+                    rebuild_score_stats()
+                    refresh_leaderboards()
+            elapsed = max(time.monotonic() - started, 1e-6)
+            done.add(file_name)
+            self.save_state(state_path, done)
+            self.stdout.write(
+                f"{file_name}: {count} строк за {elapsed:.1f} с "
+                f"({count / elapsed:.0f} строк/с), "
+                f"пик памяти {peak_memory_mb():.0f} МБ"
+            )
+        self.stdout.write(self.style.SUCCESS("Импорт БД завершён."))
+
+    def load_file(self, model, file_path, batch_size):
+        fields, objects = read_objects(model, file_path)
+        count = 0
+        with keep_csv_values(fields.values()):
+            while True:
+                batch = list(islice(objects, batch_size))
+                if not batch:
+                    break
+                model.objects.bulk_create(batch, batch_size=batch_size)
+                count += len(batch)
+        return count
+
+    def copy_file(self, model, file_path):
+        fields, objects = read_objects(model, file_path)
+        columns = copy_columns(model, fields)
+        names = ", ".join(
+            connection.ops.quote_name(field.column) for field in columns
+        )
+        with keep_csv_values(fields.values()), connection.cursor() as cursor:
+            cursor.copy_expert(
+                f"COPY {connection.ops.quote_name(model._meta.db_table)} "
+                f"({names}) FROM STDIN WITH (FORMAT csv)",
+                CopyStream(copy_lines(objects, columns)),
+            )
+            return cursor.rowcount
+
+    def reset_sequence(self, model):
+        statements = connection.ops.sequence_reset_sql(no_style(), [model])
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+    @staticmethod
+    def load_state(state_path):
+        if not os.path.exists(state_path):
+            return set()
+        with open(state_path, encoding="utf-8") as state:
+            return set(json.load(state))
+
+    @staticmethod
+    def save_state(state_path, done):
+        with open(state_path, "w", encoding="utf-8") as state:
+            json.dump(sorted(done), state)
@@ -0,0 +1,20 @@
+from django.core.management import BaseCommand
+from reviews.genres import rebuild_genre_ids
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает списки id жанров произведений по таблице связи."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            help="Сколько произведений пересчитывать одним запросом.",
+        )
+
+    def handle(self, *args, **options):
+        count = rebuild_genre_ids(chunk_size=options["chunk_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Пересчитано произведений: {count}")
+        )
@@ -0,0 +1,37 @@
+from django.core.management import BaseCommand, CommandError
+from reviews.models import Title
+from reviews.ratings import find_rating_mismatches, rebuild_ratings
+
+
+class Command(BaseCommand):
+    help = (
+        "Сверяет сохранённые рейтинги произведений с отзывами "
+        "и пересчитывает расхождения."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Только проверить, ничего не изменяя.",
+        )
+
+    def handle(self, *args, **options):
+        mismatched = []
+        for pk, stored, actual in find_rating_mismatches():
+            mismatched.append(pk)
+            self.stdout.write(
+                f"Произведение {pk}: сохранено {stored}, фактически {actual}"
+            )
+        if not mismatched:
+            self.stdout.write(self.style.SUCCESS("Расхождений не найдено."))
+            return
+        if options["check"]:
+            raise CommandError(f"Найдено расхождений: {len(mismatched)}")
+        for start in range(0, len(mismatched), 1000):
+            rebuild_ratings(
+                Title.objects.filter(pk__in=mismatched[start:start + 1000])
+            )
+        self.stdout.write(
+            self.style.SUCCESS(f"Пересчитано произведений: {len(mismatched)}")
+        )
@@ -0,0 +1,59 @@
+import time
+from datetime import timedelta
+
+from django.core.management import BaseCommand
+from django.utils import timezone
+from reviews.leaderboard import refresh_changed, refresh_leaderboards
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересобирает таблицы лидеров: топ произведений, топы жанров "
+        "и категорий, популярное за последние дни."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            help="Повторять пересборку с этим интервалом, в секундах.",
+        )
+        parser.add_argument(
+            "--changed-interval",
+            type=float,
+            help=(
+                "Между пересборками обновлять изменённые произведения "
+                "с этим интервалом, в секундах."
+            ),
+        )
+
+    def refresh(self, since, full):
+        started = time.monotonic()
+        if full:
+            count = refresh_leaderboards()
+            message = f"Записей в таблицах лидеров: {count}"
+        else:
+            count = refresh_changed(since)
+            message = f"Обновлено произведений: {count}"
+        self.stdout.write(
+            f"{message}, пересборка {time.monotonic() - started:.1f} с"
+        )
+
+    def handle(self, *args, **options):
+        interval = options["interval"]
+        step = options["changed_interval"] or interval
+        since = last_full = None
+        while True:
+            moment = timezone.now()
+            full = last_full is None or time.monotonic() - last_full >= (
+                interval - step / 2
+            )
+            if full:
+                last_full = time.monotonic()
+            self.refresh(since, full)
+            if not interval:
+                return
+            # Окно с запасом в один шаг: запись, закоммиченная во время
+            # предыдущего прохода, не теряется до полной пересборки.
+            since = moment - timedelta(seconds=step)
+            time.sleep(step)
@@ -0,0 +1,55 @@
+# Generated by Django 2.2.16 on 2026-10-18 02:56
+
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+SEARCH_SQL = (
+    "CREATE INDEX title_search_vector_idx ON reviews_title USING gin (search_vector)",
+    "CREATE INDEX title_name_trgm_idx ON reviews_title USING gin (name gin_trgm_ops)",
+    "CREATE INDEX title_description_trgm_idx ON reviews_title USING gin (description gin_trgm_ops)",
+    "CREATE INDEX genre_name_trgm_idx ON reviews_genre USING gin (name gin_trgm_ops)",
+    "CREATE INDEX category_name_trgm_idx ON reviews_category USING gin (name gin_trgm_ops)",
+    "CREATE TRIGGER title_search_vector_update BEFORE INSERT OR UPDATE OF name, description "
+    "ON reviews_title FOR EACH ROW EXECUTE PROCEDURE "
+    "tsvector_update_trigger(search_vector, 'pg_catalog.russian', name, description)",
+    "UPDATE reviews_title SET search_vector = "
+    "to_tsvector('pg_catalog.russian', coalesce(name, '') || ' ' || coalesce(description, ''))",
+)
+
+DROP_SQL = (
+    "DROP TRIGGER IF EXISTS title_search_vector_update ON reviews_title",
+    "DROP INDEX IF EXISTS title_search_vector_idx",
+    "DROP INDEX IF EXISTS title_name_trgm_idx",
+    "DROP INDEX IF EXISTS title_description_trgm_idx",
+    "DROP INDEX IF EXISTS genre_name_trgm_idx",
+    "DROP INDEX IF EXISTS category_name_trgm_idx",
+)
+
+
+def run_postgres_sql(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_feed_indexes'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='title',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='Поисковый вектор'),
+        ),
+        migrations.RunPython(
+            run_postgres_sql(SEARCH_SQL), run_postgres_sql(DROP_SQL)
+        ),
+    ]
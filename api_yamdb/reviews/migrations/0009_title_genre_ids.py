@@ -0,0 +1,49 @@
+# Generated by Django 2.2.16 on 2026-10-18 03:41
+
+from collections import defaultdict
+
+from django.db import migrations
+import reviews.fields
+
+INDEX_SQL = (
+    "CREATE INDEX title_genre_ids_idx ON reviews_title USING gin (genre_ids)"
+)
+DROP_SQL = "DROP INDEX IF EXISTS title_genre_ids_idx"
+
+
+def run_postgres_sql(sql):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor == 'postgresql':
+            schema_editor.execute(sql)
+    return run
+
+
+def fill_genre_ids(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    genres = defaultdict(list)
+    rows = Title.genre.through.objects.order_by('genre_id').values_list(
+        'title_id', 'genre_id'
+    )
+    for title_id, genre_id in rows.iterator():
+        genres[title_id].append(genre_id)
+    for title_id, genre_ids in genres.items():
+        Title.objects.filter(pk=title_id).update(genre_ids=genre_ids)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='genre_ids',
+            field=reviews.fields.IntegerArrayField(default=list, editable=False, verbose_name='Id жанров'),
+        ),
+        migrations.RunPython(fill_genre_ids, migrations.RunPython.noop),
+        migrations.RunPython(
+            run_postgres_sql(INDEX_SQL), run_postgres_sql(DROP_SQL)
+        ),
+    ]
@@ -1,9 +1,20 @@
 from api.validators import year_validator
 from django.conf import settings
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
 from users.models import User
 
+from .fields import IntegerArrayField
+
+SCORES = range(1, 11)
+
+
+def touch(queryset):
+    """Обновляет updated_at объектов выборки одним запросом."""
+    return queryset.update(updated_at=timezone.now())
+
 
 class Category(models.Model):
     name = models.CharField(
@@ -20,6 +31,9 @@ class Category(models.Model):
         ordering = ("name",)
         verbose_name = "Категория"
         verbose_name_plural = "Категории"
+        indexes = [
+            models.Index(fields=("name",), name="category_name_idx"),
+        ]
 
     def __str__(self):
         return self.name
@@ -40,6 +54,9 @@ class Genre(models.Model):
         ordering = ("name",)
         verbose_name = "Жанр"
         verbose_name_plural = "Жанры"
+        indexes = [
+            models.Index(fields=("name",), name="genre_name_idx"),
+        ]
 
     def __str__(self):
         return self.name
@@ -78,15 +95,64 @@ class Title(models.Model):
         verbose_name="жанр",
         help_text="Выберите один или несколько жанров",
     )
+    rating = models.FloatField(
+        blank=True,
+        null=True,
+        editable=False,
+        db_index=True,
+        verbose_name="Рейтинг",
+    )
+    review_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Количество отзывов",
+    )
+    score_sum = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Сумма оценок",
+    )
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False,
+        verbose_name="Поисковый вектор",
+    )
+    # Копия связи с жанрами для фильтров без соединения таблиц;
+    # поддерживается reviews.genres.
+    genre_ids = IntegerArrayField(
+        default=list,
+        editable=False,
+        verbose_name="Id жанров",
+    )
+    # Меняется и при изменении отзывов: по нему строится ETag ответа.
+    updated_at = models.DateTimeField(
+        auto_now=True, verbose_name="Дата изменения"
+    )
 
     class Meta:
         ordering = ("name",)
         verbose_name = "Произведение"
         verbose_name_plural = "Произведения"
+        # Список произведений сортируется по названию, в том числе
+        # после фильтра по категории или году.
+        indexes = [
+            models.Index(fields=("name",), name="title_name_idx"),
+            models.Index(
+                fields=("category", "name"), name="title_category_name_idx"
+            ),
+            models.Index(fields=("year", "name"), name="title_year_name_idx"),
+        ]
 
     def __str__(self):
         return self.name
 
+    def get_score_counts(self):
+        """Число отзывов с каждой оценкой от 1 до 10."""
+        try:
+            return self.score_stats.counts
+        except TitleScoreStats.DoesNotExist:
+            return [0] * len(SCORES)
+
 
 class Review(models.Model):
     title = models.ForeignKey(
@@ -118,6 +184,10 @@ class Review(models.Model):
     pub_date = models.DateTimeField(
         verbose_name="Дата публикации", auto_now_add=True, db_index=True
     )
+    # Меняется и при изменении комментариев.
+    updated_at = models.DateTimeField(
+        auto_now=True, verbose_name="Дата изменения"
+    )
 
     class Meta:
         verbose_name = "Отзыв"
@@ -131,11 +201,29 @@ class Review(models.Model):
                 name="unique-review",
             )
         ]
+        indexes = [
+            models.Index(
+                fields=("title", "-pub_date", "-id"),
+                name="review_title_feed_idx",
+            ),
+        ]
         ordering = ("-pub_date",)
 
     def __str__(self):
         return self.text
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_score = instance.__dict__.get("score")
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Рейтинг произведения пересчитывается в обработчике post_save,
+        # поэтому отзыв и счётчики сохраняются в одной транзакции.
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
+
 
 class Comment(models.Model):
     review = models.ForeignKey(
@@ -158,11 +246,95 @@ class Comment(models.Model):
     pub_date = models.DateTimeField(
         verbose_name="Дата публикации", auto_now_add=True, db_index=True
     )
+    updated_at = models.DateTimeField(
+        auto_now=True, verbose_name="Дата изменения"
+    )
 
     class Meta:
         verbose_name = "Комментарий"
         verbose_name_plural = "Комментарии"
+        indexes = [
+            models.Index(
+                fields=("review", "-pub_date", "-id"),
+                name="comment_review_feed_idx",
+            ),
+        ]
         ordering = ("-pub_date",)
 
     def __str__(self):
         return self.text
+
+
+class TitleScoreStats(models.Model):
+    """
+    Распределение оценок произведения: число отзывов с каждой оценкой.
+
+    Обновляется инкрементально при изменении отзывов, чтобы гистограмму
+    и перцентили не приходилось считать по таблице отзывов.
+    """
+
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="score_stats",
+        verbose_name="Произведение",
+    )
+    score_1 = models.PositiveIntegerField(default=0)
+    score_2 = models.PositiveIntegerField(default=0)
+    score_3 = models.PositiveIntegerField(default=0)
+    score_4 = models.PositiveIntegerField(default=0)
+    score_5 = models.PositiveIntegerField(default=0)
+    score_6 = models.PositiveIntegerField(default=0)
+    score_7 = models.PositiveIntegerField(default=0)
+    score_8 = models.PositiveIntegerField(default=0)
+    score_9 = models.PositiveIntegerField(default=0)
+    score_10 = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Распределение оценок"
+        verbose_name_plural = "Распределения оценок"
+
+    def __str__(self):
+        return f"Оценки: {self.title_id}"
+
+    @property
+    def counts(self):
+        return [getattr(self, f"score_{score}") for score in SCORES]
+
+
+class LeaderboardEntry(models.Model):
+    """
+    Позиция произведения в материализованной таблице лидеров.
+
+    board — имя таблицы: общий топ, топ жанра или категории, популярное
+    за последние дни. Чтение страницы — проход по индексу
+    (board, -score) без агрегации отзывов.
+    """
+
+    board = models.CharField(max_length=64, verbose_name="Таблица")
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name="leaderboard_entries",
+        verbose_name="Произведение",
+    )
+    score = models.FloatField(verbose_name="Очки")
+
+    class Meta:
+        verbose_name = "Позиция в рейтинге"
+        verbose_name_plural = "Позиции в рейтингах"
+        constraints = [
+            models.UniqueConstraint(
+                fields=("board", "title"), name="unique-leaderboard-entry"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=("board", "-score", "title"),
+                name="leaderboard_rank_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.board}: {self.title_id}"
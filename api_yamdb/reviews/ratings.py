@@ -0,0 +1,155 @@
+from math import ceil
+
+from django.db import connection, transaction
+from django.db.models import (Avg, Case, Count, ExpressionWrapper, F,
+                              FloatField, IntegerField, OuterRef, Q, Subquery,
+                              Sum, Value, When)
+from django.db.models.functions import Cast, Coalesce
+from django.utils import timezone
+
+from .models import SCORES, Review, Title, TitleScoreStats
+
+PERCENTILES = (25, 50, 75, 90)
+
+
+def _rating_update(count_delta, sum_delta):
+    """Выражения UPDATE для изменения счётчиков рейтинга на дельту."""
+    count = F("review_count") + count_delta
+    total = F("score_sum") + sum_delta
+    return {
+        "review_count": count,
+        "score_sum": total,
+        "rating": Case(
+            When(review_count__lte=-count_delta, then=Value(None)),
+            default=ExpressionWrapper(
+                Cast(total, FloatField()) / count, output_field=FloatField()
+            ),
+            output_field=FloatField(),
+        ),
+    }
+
+
+def apply_rating_delta(title_id, count_delta, sum_delta, using=None):
+    """Атомарно сдвигает счётчики отзывов произведения одним запросом."""
+    Title.objects.using(using).filter(pk=title_id).update(
+        **_rating_update(count_delta, sum_delta), updated_at=timezone.now()
+    )
+
+
+def rebuild_ratings(queryset=None):
+    """Пересчитывает счётчики по фактическим отзывам одним запросом."""
+    if queryset is None:
+        queryset = Title.objects.all()
+    reviews = (
+        Review.objects.filter(title=OuterRef("pk"))
+        .order_by()
+        .values("title")
+    )
+    return queryset.update(
+        review_count=Coalesce(
+            Subquery(reviews.annotate(value=Count("pk")).values("value")),
+            0,
+            output_field=IntegerField(),
+        ),
+        score_sum=Coalesce(
+            Subquery(reviews.annotate(value=Sum("score")).values("value")),
+            0,
+            output_field=IntegerField(),
+        ),
+        rating=Subquery(
+            reviews.annotate(value=Avg("score")).values("value"),
+            output_field=FloatField(),
+        ),
+        updated_at=timezone.now(),
+    )
+
+
+def find_rating_mismatches(queryset=None, chunk_size=2000):
+    """
+    Сверяет сохранённые счётчики с агрегатом по таблице отзывов.
+
+    Возвращает генератор кортежей (id, сохранённое, фактическое),
+    где значения — пары (количество отзывов, сумма оценок).
+    """
+    if queryset is None:
+        queryset = Title.objects.all()
+    rows = (
+        queryset.order_by()
+        .annotate(true_count=Count("reviews"), true_sum=Sum("reviews__score"))
+        .values_list(
+            "pk", "review_count", "score_sum", "true_count", "true_sum"
+        )
+    )
+    for pk, count, total, true_count, true_sum in rows.iterator(
+        chunk_size=chunk_size
+    ):
+        stored = (count, total)
+        actual = (true_count, true_sum or 0)
+        if stored != actual:
+            yield pk, stored, actual
+
+
+def apply_score_delta(title_id, score, delta, using=None):
+    """Сдвигает счётчик одной оценки в распределении оценок произведения."""
+    field = f"score_{score}"
+    stats = TitleScoreStats.objects.using(using).filter(title_id=title_id)
+    if stats.update(**{field: F(field) + delta}) or delta < 0:
+        return
+    TitleScoreStats.objects.using(using).get_or_create(title_id=title_id)
+    stats.update(**{field: F(field) + delta})
+
+
+def rebuild_score_stats(queryset=None, chunk_size=2000):
+    """
+    Пересчитывает распределения оценок по таблице отзывов: один
+    агрегирующий запрос на порцию произведений.
+    """
+    if queryset is None:
+        queryset = Title.objects.all()
+    title_ids = list(queryset.order_by("pk").values_list("pk", flat=True))
+    batch_size = None if connection.vendor == "sqlite" else chunk_size
+    for start in range(0, len(title_ids), chunk_size):
+        chunk = title_ids[start:start + chunk_size]
+        rows = (
+            Review.objects.filter(title_id__in=chunk)
+            .order_by()
+            .values("title_id")
+            .annotate(**{
+                f"score_{score}": Count("pk", filter=Q(score=score))
+                for score in SCORES
+            })
+        )
+        with transaction.atomic():
+            TitleScoreStats.objects.filter(title_id__in=chunk).delete()
+            TitleScoreStats.objects.bulk_create(
+                [TitleScoreStats(**row) for row in rows],
+                batch_size=batch_size,
+            )
+    return len(title_ids)
+
+
+def score_summary(counts):
+    """
+    Гистограмма, медиана и перцентили по счётчикам оценок без обращения
+    к отзывам. Перцентиль — наименьшая оценка, на которой накопленная
+    доля отзывов достигает нужного уровня.
+    """
+    total = sum(counts)
+    percentiles = dict.fromkeys(PERCENTILES)
+    if total:
+        cumulative = 0
+        pending = list(PERCENTILES)
+        for score, count in zip(SCORES, counts):
+            cumulative += count
+            while pending and cumulative >= ceil(total * pending[0] / 100):
+                percentiles[pending.pop(0)] = score
+    return {
+        "review_count": total,
+        "histogram": {
+            str(score): count for score, count in zip(SCORES, counts)
+        },
+        "median": percentiles[50],
+        "percentiles": {
+            f"p{level}": value for level, value in percentiles.items()
+        },
+    }
@@ -0,0 +1,90 @@
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete)
+from django.dispatch import Signal, receiver
+
+from .genres import update_genre_ids
+from .models import Comment, Genre, Review, Title, touch
+from .ratings import (apply_rating_delta, apply_score_delta, rebuild_ratings,
+                      rebuild_score_stats)
+
+# Строки модели sender записаны в обход save(), например bulk_create:
+# сигналы post_save для них не отправлялись.
+bulk_loaded = Signal()
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, using, **kwargs):
+    """
+    Обновляет счётчики рейтинга и распределение оценок при создании
+    или изменении отзыва. Произведение отмечается изменённым в любом
+    случае: по updated_at таблицы лидеров обновляет плановая задача
+    refresh_leaderboards.
+    """
+    if created:
+        apply_rating_delta(instance.title_id, 1, instance.score, using)
+        apply_score_delta(instance.title_id, instance.score, 1, using)
+    else:
+        previous = getattr(instance, "_loaded_score", None)
+        if previous is None:
+            titles = Title.objects.using(using).filter(pk=instance.title_id)
+            rebuild_ratings(titles)
+            rebuild_score_stats(titles)
+        elif previous != instance.score:
+            apply_rating_delta(
+                instance.title_id, 0, instance.score - previous, using
+            )
+            apply_score_delta(instance.title_id, previous, -1, using)
+            apply_score_delta(instance.title_id, instance.score, 1, using)
+        else:
+            touch(Title.objects.using(using).filter(pk=instance.title_id))
+    instance._loaded_score = instance.score
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, using, **kwargs):
+    """
+    Вычитает отзыв из счётчиков, в том числе при каскадном удалении
+    произведения или пользователя.
+    """
+    apply_rating_delta(instance.title_id, -1, -instance.score, using)
+    apply_score_delta(instance.title_id, instance.score, -1, using)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def touch_review(sender, instance, using, **kwargs):
+    """
+    Отмечает отзыв изменённым при изменении его комментариев: ETag
+    отзыва меняется вместе с обсуждением. Один UPDATE без чтения строки.
+    """
+    touch(Review.objects.using(using).filter(pk=instance.review_id))
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def update_genre_ids_on_change(sender, instance, action, reverse, pk_set,
+                               using, **kwargs):
+    """
+    Поддерживает Title.genre_ids при изменении жанров произведения
+    (title.genre.add) и произведений жанра (genre.genre.add).
+    """
+    if action == "pre_clear" and reverse:
+        instance._cleared_titles = list(
+            instance.genre.using(using).values_list("pk", flat=True)
+        )
+    elif action == "post_clear" and reverse:
+        update_genre_ids(instance._cleared_titles, using)
+    elif action.startswith("post_"):
+        update_genre_ids(pk_set if reverse else [instance.pk], using)
+
+
+@receiver(pre_delete, sender=Genre)
+def remember_genre_titles(sender, instance, using, **kwargs):
+    # Связи удаляются каскадом без сигнала m2m_changed.
+    instance._genre_titles = list(
+        instance.genre.using(using).values_list("pk", flat=True)
+    )
+
+
+@receiver(post_delete, sender=Genre)
+def update_genre_ids_on_delete(sender, instance, using, **kwargs):
+    update_genre_ids(instance._genre_titles, using)
@@ -1,5 +1,18 @@
 from django.contrib import admin
 
-from .models import User
+from .models import QueuedEmail, User
 
 admin.site.register(User)
+
+
+@admin.register(QueuedEmail)
+class QueuedEmailAdmin(admin.ModelAdmin):
+    list_display = (
+        "recipient",
+        "subject",
+        "queued_at",
+        "attempts",
+        "sent_at",
+    )
+    list_filter = ("sent_at",)
+    search_fields = ("recipient",)
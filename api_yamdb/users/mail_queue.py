@@ -0,0 +1,233 @@
+from collections import OrderedDict, defaultdict
+from datetime import timedelta
+from itertools import count
+from smtplib import SMTPException
+from threading import RLock
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.db.models import Avg, Min
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import QueuedEmail
+
+
+def backoff(attempts):
+    """Задержка перед повторной отправкой: растёт вдвое с каждой попыткой."""
+    return timedelta(
+        seconds=settings.MAIL_QUEUE_RETRY_DELAY * 2 ** (attempts - 1)
+    )
+
+
+def claim_until(now):
+    """До какого момента выбранное письмо недоступно другим воркерам."""
+    return now + timedelta(seconds=settings.MAIL_QUEUE_CLAIM_SECONDS)
+
+
+class DatabaseMailQueue:
+    """
+    Очередь писем в таблице QueuedEmail.
+
+    Повторная постановка письма с тем же ключом, пока оно не отправлено,
+    заменяет его содержимое, а не добавляет новое письмо. Несколько
+    воркеров не выбирают одни и те же письма благодаря SKIP LOCKED
+    и сдвигу next_attempt при выборке.
+    """
+
+    def enqueue(self, dedupe_key, recipient, subject, body):
+        now = timezone.now()
+        QueuedEmail.objects.update_or_create(
+            dedupe_key=dedupe_key,
+            sent_at__isnull=True,
+            defaults={
+                "recipient": recipient,
+                "subject": subject,
+                "body": body,
+                "next_attempt": now,
+                "attempts": 0,
+            },
+        )
+
+    def claim(self, batch_size):
+        """
+        Выбирает пакет писем, готовых к отправке, и переносит их
+        next_attempt на MAIL_QUEUE_CLAIM_SECONDS вперёд. Транзакция
+        фиксируется до обращения к SMTP: строки не остаются
+        заблокированными, а письма упавшего воркера вернутся в очередь
+        по истечении этого срока.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            queryset = QueuedEmail.objects.filter(
+                sent_at__isnull=True,
+                next_attempt__lte=now,
+                attempts__lt=settings.MAIL_QUEUE_MAX_ATTEMPTS,
+            )
+            if connection.features.has_select_for_update_skip_locked:
+                queryset = queryset.select_for_update(skip_locked=True)
+            messages = list(queryset[:batch_size])
+            lease = claim_until(now)
+            QueuedEmail.objects.filter(
+                pk__in=[message.pk for message in messages]
+            ).update(next_attempt=lease)
+        for message in messages:
+            message.next_attempt = lease
+        return messages
+
+    def mark_sent(self, messages):
+        now = timezone.now()
+        for message in messages:
+            message.sent_at = now
+            message.latency = (now - message.queued_at).total_seconds()
+        QueuedEmail.objects.bulk_update(messages, ("sent_at", "latency"))
+
+    def mark_failed(self, messages, error):
+        now = timezone.now()
+        for message in messages:
+            message.attempts += 1
+            message.last_error = error
+            message.next_attempt = now + backoff(message.attempts)
+        QueuedEmail.objects.bulk_update(
+            messages, ("attempts", "last_error", "next_attempt")
+        )
+
+    def metrics(self):
+        pending = QueuedEmail.objects.filter(sent_at__isnull=True)
+        oldest = pending.aggregate(oldest=Min("queued_at"))["oldest"]
+        recent = QueuedEmail.objects.filter(
+            sent_at__gte=timezone.now() - timedelta(hours=1)
+        )
+        return {
+            "depth": pending.count(),
+            "oldest_pending_seconds": (
+                (timezone.now() - oldest).total_seconds() if oldest else 0
+            ),
+            "sent_last_hour": recent.count(),
+            "avg_latency_seconds": (
+                recent.aggregate(value=Avg("latency"))["value"] or 0
+            ),
+        }
+
+
+class MemoryMailQueue:
+    """Очередь в памяти процесса для тестов и локальной разработки."""
+
+    messages = OrderedDict()
+    sent = []
+    ids = count(1)
+    lock = RLock()
+
+    def enqueue(self, dedupe_key, recipient, subject, body):
+        with self.lock:
+            message = self.messages.pop(dedupe_key, None) or QueuedEmail(
+                pk=next(self.ids), dedupe_key=dedupe_key
+            )
+            message.recipient, message.subject = recipient, subject
+            message.body, message.attempts = body, 0
+            message.queued_at = message.next_attempt = timezone.now()
+            self.messages[dedupe_key] = message
+
+    def claim(self, batch_size):
+        now = timezone.now()
+        with self.lock:
+            messages = [
+                message for message in self.messages.values()
+                if message.next_attempt <= now
+                and message.attempts < settings.MAIL_QUEUE_MAX_ATTEMPTS
+            ][:batch_size]
+            for message in messages:
+                message.next_attempt = claim_until(now)
+        return messages
+
+    def mark_sent(self, messages):
+        now = timezone.now()
+        with self.lock:
+            for message in messages:
+                message.sent_at = now
+                message.latency = (now - message.queued_at).total_seconds()
+                self.messages.pop(message.dedupe_key, None)
+                self.sent.append(message)
+
+    def mark_failed(self, messages, error):
+        now = timezone.now()
+        for message in messages:
+            message.attempts += 1
+            message.last_error = error
+            message.next_attempt = now + backoff(message.attempts)
+
+    def metrics(self):
+        now = timezone.now()
+        latencies = [message.latency for message in self.sent]
+        oldest = min(
+            (message.queued_at for message in self.messages.values()),
+            default=None,
+        )
+        return {
+            "depth": len(self.messages),
+            "oldest_pending_seconds": (
+                (now - oldest).total_seconds() if oldest else 0
+            ),
+            "sent_last_hour": len(self.sent),
+            "avg_latency_seconds": (
+                sum(latencies) / len(latencies) if latencies else 0
+            ),
+        }
+
+    @classmethod
+    def reset(cls):
+        cls.messages.clear()
+        cls.sent.clear()
+
+
+def get_mail_queue():
+    return import_string(settings.MAIL_QUEUE_BACKEND)()
+
+
+def send_each(messages):
+    """
+    Отправляет письма по одному через общее SMTP-соединение.
+
+    Возвращает отправленные письма и словарь {ошибка: письма}: отказ
+    по одному адресу не влияет на остальные письма пакета.
+    """
+    sent, failed = [], defaultdict(list)
+    pending = list(messages)
+    try:
+        with get_connection() as smtp:
+            while pending:
+                message = pending.pop(0)
+                try:
+                    smtp.send_messages([EmailMessage(
+                        message.subject,
+                        message.body,
+                        settings.MAIL_QUEUE_FROM,
+                        [message.recipient],
+                    )])
+                except (SMTPException, OSError) as error:
+                    failed[str(error)].append(message)
+                else:
+                    sent.append(message)
+    except (SMTPException, OSError) as error:
+        # Соединение не открылось: оставшиеся письма повторяются позже.
+        failed[str(error)].extend(pending)
+    return sent, failed
+
+
+def deliver_batch(queue, batch_size):
+    """
+    Отправляет пакет писем через одно SMTP-соединение и отмечает
+    каждое письмо отправленным или ошибочным по его результату.
+
+    Возвращает пару (отправлено, с ошибкой).
+    """
+    messages = queue.claim(batch_size)
+    if not messages:
+        return 0, 0
+    sent, failed = send_each(messages)
+    if sent:
+        queue.mark_sent(sent)
+    for error, group in failed.items():
+        queue.mark_failed(group, error)
+    return len(sent), len(messages) - len(sent)
@@ -0,0 +1,43 @@
+import time
+
+from django.core.management import BaseCommand
+from users.mail_queue import deliver_batch, get_mail_queue
+
+
+class Command(BaseCommand):
+    help = "Отправляет письма из очереди пакетами через одно SMTP-соединение."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Сколько писем отправлять за одно соединение.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1.0,
+            help="Пауза между проверками пустой очереди, в секундах.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Разобрать очередь один раз и завершиться.",
+        )
+
+    def handle(self, *args, **options):
+        queue = get_mail_queue()
+        while True:
+            sent, failed = deliver_batch(queue, options["batch_size"])
+            if sent or failed:
+                metrics = queue.metrics()
+                self.stdout.write(
+                    f"Отправлено: {sent}, ошибок: {failed}, "
+                    f"в очереди: {metrics['depth']}, средняя задержка: "
+                    f"{metrics['avg_latency_seconds']:.1f} с"
+                )
+                continue
+            if options["once"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,21 @@
+# Generated by Django 2.2.16 on 2026-10-18 03:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_queued_email'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='queuedemail',
+            index=models.Index(condition=models.Q(sent_at__isnull=True), fields=['next_attempt'], name='pending_email_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='queuedemail',
+            index=models.Index(condition=models.Q(sent_at__isnull=False), fields=['sent_at'], name='sent_email_idx'),
+        ),
+    ]
@@ -2,6 +2,7 @@ from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.contrib.auth.validators import UnicodeUsernameValidator
 from django.db import models
+from django.utils import timezone
 
 from .validators import username_validator
 
@@ -9,6 +10,8 @@ USER = "user"
 MODERATOR = "moderator"
 ADMIN = "admin"
 
+TOKEN_CLAIMS = ("username", "role", "is_staff", "is_superuser", "is_active")
+
 ROLES = [
     (USER, "Пользователь"),
     (MODERATOR, "Модератор"),
@@ -52,6 +55,16 @@ class User(AbstractUser):
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = ["username"]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_claims = instance.get_claims()
+        return instance
+
+    def get_claims(self):
+        """Значения полей, которые передаются в JWT-токене."""
+        return tuple(self.__dict__.get(field) for field in TOKEN_CLAIMS)
+
     @property
     def is_moderator(self):
         return self.is_staff or self.role == MODERATOR
@@ -72,3 +85,68 @@ class User(AbstractUser):
 
     def __str__(self) -> str:
         return self.username
+
+
+class QueuedEmail(models.Model):
+    """Письмо в очереди на отправку."""
+
+    dedupe_key = models.CharField(
+        verbose_name="Ключ дедупликации",
+        max_length=settings.NAME_MAX_LENGTH,
+    )
+    recipient = models.EmailField(
+        verbose_name="Получатель",
+        max_length=settings.EMAIL_MAX_LENGTH,
+    )
+    subject = models.CharField(
+        verbose_name="Тема",
+        max_length=settings.NAME_MAX_LENGTH,
+    )
+    body = models.TextField(verbose_name="Текст")
+    queued_at = models.DateTimeField(
+        verbose_name="Поставлено в очередь", auto_now=True
+    )
+    next_attempt = models.DateTimeField(
+        verbose_name="Следующая попытка",
+        default=timezone.now,
+        db_index=True,
+    )
+    attempts = models.PositiveSmallIntegerField(
+        verbose_name="Попыток", default=0
+    )
+    last_error = models.TextField(verbose_name="Последняя ошибка", blank=True)
+    sent_at = models.DateTimeField(
+        verbose_name="Отправлено", blank=True, null=True
+    )
+    latency = models.FloatField(
+        verbose_name="Задержка доставки, с", blank=True, null=True
+    )
+
+    class Meta:
+        ordering = ("next_attempt",)
+        verbose_name = "Письмо в очереди"
+        verbose_name_plural = "Очередь писем"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["dedupe_key"],
+                condition=models.Q(sent_at__isnull=True),
+                name="unique_pending_email",
+            )
+        ]
+        # Отправитель выбирает только неотправленные письма, а метрики
+        # считают отправленные за последний час.
+        indexes = [
+            models.Index(
+                fields=("next_attempt",),
+                condition=models.Q(sent_at__isnull=True),
+                name="pending_email_idx",
+            ),
+            models.Index(
+                fields=("sent_at",),
+                condition=models.Q(sent_at__isnull=False),
+                name="sent_email_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.recipient}: {self.subject}"
@@ -1,5 +1,8 @@
 import sys
 from os.path import abspath, dirname, join
+from threading import local
+
+import pytest
 
 root_dir = dirname(dirname(abspath(__file__)))
 sys.path.append(root_dir)
@@ -7,3 +10,70 @@ infra_dir_path = join(root_dir, 'infra')
 
 pytest_plugins = [
 ]
+
+
+@pytest.fixture(scope='session')
+def django_db_modify_db_settings():
+    # Тесты с базой данных выполняются на SQLite в памяти,
+    # чтобы не требовать запущенного PostgreSQL.
+    from django.conf import settings
+    from django.db import connections
+
+    settings.DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': ':memory:',
+        },
+        # Отдельная база для проверки чтения из реплик.
+        'replica': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': ':memory:',
+        },
+    }
+    connections.__dict__.pop('databases', None)
+    connections._databases = None
+    connections._connections = local()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from django.core.cache import cache
+
+    cache.clear()
+
+
+@pytest.fixture
+def user(django_user_model):
+    return django_user_model.objects.create_user(
+        username='TestUser', email='testuser@yamdb.fake', password='1234567'
+    )
+
+
+@pytest.fixture
+def user_client(user):
+    from rest_framework.test import APIClient
+
+    from api.authentication import RoleAccessToken
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {RoleAccessToken.for_user(user)}')
+    return client
+
+
+@pytest.fixture
+def admin(django_user_model):
+    return django_user_model.objects.create_user(
+        username='TestAdmin', email='testadmin@yamdb.fake', password='1234567',
+        role='admin',
+    )
+
+
+@pytest.fixture
+def admin_client(admin):
+    from rest_framework.test import APIClient
+
+    from api.authentication import RoleAccessToken
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {RoleAccessToken.for_user(admin)}')
+    return client
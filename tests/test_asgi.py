@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+from django.core.signals import request_finished
+
+from api_yamdb.asgi import ThreadPoolASGIHandler, application
+from reviews.models import Title
+
+
+def run(scope, messages):
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(application(scope, receive, send))
+    finally:
+        loop.close()
+    return sent
+
+
+def http_scope(path):
+    return {
+        'type': 'http',
+        'http_version': '1.1',
+        'method': 'GET',
+        'path': path,
+        'query_string': b'',
+        'headers': [(b'host', b'testserver')],
+        'server': ('testserver', 80),
+    }
+
+
+class TestASGIApplication:
+
+    def test_thread_pool(self, settings):
+        assert isinstance(application, ThreadPoolASGIHandler)
+        assert application.max_threads == settings.ASGI_THREADS
+
+    def test_lifespan(self):
+        sent = run(
+            {'type': 'lifespan'},
+            [{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}],
+        )
+        assert [message['type'] for message in sent] == [
+            'lifespan.startup.complete', 'lifespan.shutdown.complete',
+        ]
+
+    # Запрос выполняется в потоке пула со своим соединением с базой,
+    # поэтому данные должны быть зафиксированы.
+    @pytest.mark.django_db(transaction=True)
+    def test_serves_api(self):
+        title = Title.objects.create(name='Произведение', year=2000)
+        finished = []
+
+        def receiver(**kwargs):
+            finished.append(True)
+
+        request_finished.connect(receiver)
+        try:
+            sent = run(
+                http_scope('/api/v1/titles/'),
+                [{'type': 'http.request', 'body': b''}],
+            )
+        finally:
+            request_finished.disconnect(receiver)
+        assert sent[0]['status'] == 200
+        body = b''.join(message.get('body', b'') for message in sent[1:])
+        assert title.name.encode() in body
+        assert finished, (
+            'Проверьте, что после ответа Django закрывает соединения с базой'
+        )
@@ -0,0 +1,87 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.authentication import RoleAccessToken
+from api.checks import check_shared_caches
+from reviews.models import Title
+from users.models import MODERATOR, User
+
+
+def client_for(token):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
+
+
+@pytest.mark.django_db
+class TestStatelessAuthentication:
+
+    def test_review_post_does_not_load_user(self, user_client):
+        title = Title.objects.create(name='Произведение', year=2000)
+        with CaptureQueriesContext(connection) as queries:
+            response = user_client.post(
+                f'/api/v1/titles/{title.id}/reviews/',
+                {'text': 'Отзыв', 'score': 7},
+            )
+        assert response.status_code == 201
+        assert response.json()['author'] == 'TestUser'
+        user_selects = [
+            q['sql'] for q in queries
+            if q['sql'].startswith('SELECT') and '"users_user"' in q['sql']
+        ]
+        assert not user_selects, (
+            'Проверьте, что пользователь берётся из токена без запроса к БД'
+        )
+
+    def test_me_returns_full_profile(self, user, user_client):
+        user.bio = 'О себе'
+        user.save(update_fields=['bio'])
+        response = user_client.get('/api/v1/users/me/')
+        assert response.status_code == 200
+        assert response.json()['bio'] == 'О себе'
+        assert response.json()['email'] == user.email
+
+    def test_role_change_revokes_token(self, user, user_client):
+        assert user_client.get('/api/v1/users/me/').status_code == 200
+        user.role = MODERATOR
+        user.save()
+        assert user_client.get('/api/v1/users/me/').status_code == 401
+        fresh = client_for(RoleAccessToken.for_user(user))
+        assert fresh.get('/api/v1/users/me/').json()['role'] == MODERATOR
+
+    def test_profile_change_keeps_token(self, user_client):
+        response = user_client.patch('/api/v1/users/me/', {'bio': 'Новое'})
+        assert response.status_code == 200
+        assert user_client.get('/api/v1/users/me/').status_code == 200
+
+    def test_plain_token_falls_back_to_database(self, user):
+        client = client_for(AccessToken.for_user(user))
+        assert client.get('/api/v1/users/me/').status_code == 200
+
+    def test_deleted_user_token_revoked(self, user, user_client):
+        user.delete()
+        assert user_client.get('/api/v1/users/me/').status_code == 401
+
+    def test_local_revocation_cache_with_workers(self, settings, user,
+                                                 user_client):
+        settings.WEB_CONCURRENCY = 2
+        # Изменение в обход сигналов: отметки об отзыве нет ни в одном
+        # процессе, роль видна только в базе.
+        User.objects.filter(pk=user.pk).update(role=MODERATOR)
+        response = user_client.get('/api/v1/users/me/')
+        assert response.json()['role'] == MODERATOR, (
+            'Проверьте, что без общего кэша отзыва пользователь '
+            'читается из базы'
+        )
+        User.objects.filter(pk=user.pk).delete()
+        assert user_client.get('/api/v1/users/me/').status_code == 401
+
+    def test_shared_cache_check(self, settings):
+        assert not check_shared_caches(None)
+        settings.WEB_CONCURRENCY = 4
+        warnings = check_shared_caches(None)
+        assert {warning.id for warning in warnings} == {'api.W001'}
+        assert any('JWT_REVOCATION_CACHE' in w.msg for w in warnings)
@@ -0,0 +1,68 @@
+import pytest
+from django.db.models import Count
+
+from benchmarks.data import DatasetSize, distribute, generate_dataset
+from benchmarks.runner import build_scenarios, compare, run_scenario
+from reviews.models import Review, Title
+
+TINY = DatasetSize(titles=20, users=15, reviews=60, comments=80)
+
+
+class TestBenchmarkData:
+
+    def test_distribute_is_skewed(self):
+        counts = distribute(1000, 10, 1.1, 1000)
+        assert counts == sorted(counts, reverse=True), (
+            'Проверьте, что распределение отзывов убывает по популярности'
+        )
+        assert counts[0] > 3 * counts[-1]
+
+    def test_distribute_respects_cap(self):
+        assert max(distribute(1000, 10, 1.1, 50)) == 50
+
+
+@pytest.mark.django_db
+class TestBenchmarkRun:
+
+    def test_dataset_shape(self):
+        users, titles = generate_dataset(TINY)
+        assert len(users) == TINY.users
+        assert len(titles) == TINY.titles
+        assert Title.genre.through.objects.count() >= TINY.titles
+        per_title = list(
+            Review.objects.values('title').annotate(
+                total=Count('id')
+            ).order_by('-total').values_list('total', flat=True)
+        )
+        assert per_title[0] > per_title[-1], (
+            'Проверьте, что отзывы распределены неравномерно'
+        )
+        assert Title.objects.filter(rating__isnull=False).exists(), (
+            'Проверьте, что генератор пересчитывает рейтинги'
+        )
+
+    def test_scenarios_run_without_errors(self):
+        users, titles = generate_dataset(TINY)
+        results = {
+            scenario.name: run_scenario(scenario, 3)
+            for scenario in build_scenarios(users, titles)
+        }
+        for name, result in results.items():
+            assert result['errors'] == 0, (
+                f'Проверьте, что сценарий {name} выполняется без ошибок'
+            )
+            assert result['queries'] > 0 or name == 'titles_list_anonymous'
+
+    def test_compare_flags_regressions(self):
+        reference = {'queries': 3, 'p95_ms': 10.0, 'errors': 0}
+        results = {
+            'more_queries': dict(reference, queries=4),
+            'slower': dict(reference, p95_ms=30.0),
+            'noise': dict(reference, p95_ms=11.0),
+        }
+        baseline = {name: reference for name in results}
+        regressions = compare(results, baseline, tolerance=0.5)
+        assert len(regressions) == 2, (
+            'Проверьте, что сравнение с эталоном ловит рост числа запросов '
+            'и p95, но не шум'
+        )
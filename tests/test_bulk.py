@@ -0,0 +1,173 @@
+import json
+
+import pytest
+
+from reviews.models import Category, Comment, Genre, Review, Title
+
+
+@pytest.fixture
+def catalog():
+    Category.objects.create(name='Фильм', slug='movie')
+    Genre.objects.create(name='Драма', slug='drama')
+    Genre.objects.create(name='Комедия', slug='comedy')
+
+
+@pytest.mark.django_db
+class TestTitleBulk:
+    url = '/api/v1/titles/bulk/'
+
+    def test_requires_admin(self, user_client):
+        response = user_client.post(self.url, [], format='json')
+        assert response.status_code == 403
+
+    def test_creates_titles_with_genres(self, admin_client, catalog):
+        response = admin_client.post(self.url, [
+            {
+                'name': 'Первое', 'year': 2000,
+                'genre': ['drama', 'comedy'], 'category': 'movie',
+            },
+            {'name': 'Второе', 'year': 2001, 'genre': ['drama']},
+        ], format='json')
+        assert response.status_code == 200, response.json()
+        results = response.json()['results']
+        assert [result['status'] for result in results] == [
+            'created', 'created'
+        ]
+        first = Title.objects.get(pk=results[0]['id'])
+        assert first.category.slug == 'movie'
+        assert set(first.genre.values_list('slug', flat=True)) == {
+            'drama', 'comedy'
+        }
+        assert first.genre_ids == sorted(
+            first.genre.values_list('pk', flat=True)
+        ), 'Проверьте, что пакетная запись заполняет genre_ids'
+
+    def test_reports_invalid_items(self, admin_client, catalog):
+        response = admin_client.post(self.url, [
+            {'name': 'Хорошее', 'year': 2000, 'genre': ['drama']},
+            {'name': 'Жанр', 'year': 2000, 'genre': ['unknown']},
+            {'name': 'Без года'},
+            {'id': 999, 'name': 'Чужое'},
+        ], format='json')
+        assert response.status_code == 207
+        data = response.json()
+        assert data['failed'] == 3
+        statuses = [result['status'] for result in data['results']]
+        assert statuses == ['created', 'error', 'error', 'error'], (
+            'Проверьте, что ошибочные элементы не мешают записи остальных'
+        )
+        assert 'genre' in data['results'][1]['errors']
+        assert Title.objects.count() == 1
+
+    def test_updates_titles(self, admin_client, catalog):
+        title = Title.objects.create(name='Старое', year=1999)
+        title.genre.add(Genre.objects.get(slug='drama'))
+        response = admin_client.post(self.url, [
+            {'id': title.pk, 'name': 'Новое', 'genre': ['comedy']},
+        ], format='json')
+        assert response.json()['results'][0]['status'] == 'updated'
+        title.refresh_from_db()
+        assert title.name == 'Новое'
+        assert title.year == 1999
+        assert list(title.genre.values_list('slug', flat=True)) == ['comedy']
+
+    def test_accepts_ndjson(self, admin_client, catalog):
+        body = '\n'.join(
+            json.dumps({'name': f'Произведение {i}', 'year': 2000})
+            for i in range(3)
+        )
+        response = admin_client.post(
+            self.url, body, content_type='application/x-ndjson'
+        )
+        assert response.status_code == 200, response.json()
+        assert Title.objects.count() == 3
+
+    def test_resolves_slugs_once_per_batch(
+        self, admin_client, catalog, django_assert_max_num_queries
+    ):
+        items = [
+            {'name': f'Произведение {i}', 'year': 2000, 'genre': ['drama']}
+            for i in range(20)
+        ]
+        response = admin_client.post(self.url, items[:1], format='json')
+        assert response.status_code == 200
+        # SQLite не возвращает id после пакетной вставки, поэтому
+        # произведения там вставляются по одному; остальное — пакетом.
+        with django_assert_max_num_queries(len(items) + 6):
+            response = admin_client.post(self.url, items, format='json')
+        assert response.status_code == 200
+
+
+@pytest.mark.django_db
+class TestReviewBulk:
+    url = '/api/v1/reviews/bulk/'
+
+    def test_creates_reviews_and_updates_rating(self, admin_client, user):
+        title = Title.objects.create(name='Произведение', year=2000)
+        response = admin_client.post(self.url, [
+            {'title': title.pk, 'text': 'Отзыв админа', 'score': 10},
+            {
+                'title': title.pk, 'author': user.username,
+                'text': 'Отзыв', 'score': 6,
+            },
+        ], format='json')
+        assert response.status_code == 200, response.json()
+        title.refresh_from_db()
+        assert title.review_count == 2
+        assert title.rating == 8
+
+    def test_honors_unique_review(self, admin_client, user):
+        title = Title.objects.create(name='Произведение', year=2000)
+        Review.objects.create(title=title, author=user, text='Был', score=5)
+        response = admin_client.post(self.url, [
+            {
+                'title': title.pk, 'author': user.username,
+                'text': 'Повтор', 'score': 1,
+            },
+            {'title': title.pk, 'text': 'Первый', 'score': 7},
+            {'title': title.pk, 'text': 'Второй', 'score': 7},
+        ], format='json')
+        statuses = [
+            result['status'] for result in response.json()['results']
+        ]
+        assert statuses == ['error', 'created', 'error'], (
+            'Проверьте, что повторный отзыв автора на произведение '
+            'отклоняется как в базе, так и внутри пакета'
+        )
+        assert Review.objects.count() == 2
+
+    def test_updates_score(self, admin_client, user):
+        title = Title.objects.create(name='Произведение', year=2000)
+        review = Review.objects.create(
+            title=title, author=user, text='Отзыв', score=2
+        )
+        response = admin_client.post(self.url, [
+            {'id': review.pk, 'score': 9},
+            {'id': review.pk, 'title': title.pk},
+        ], format='json')
+        statuses = [
+            result['status'] for result in response.json()['results']
+        ]
+        assert statuses == ['updated', 'error']
+        title.refresh_from_db()
+        assert title.rating == 9
+
+
+@pytest.mark.django_db
+class TestCommentBulk:
+
+    def test_creates_comments(self, admin_client, user):
+        title = Title.objects.create(name='Произведение', year=2000)
+        review = Review.objects.create(
+            title=title, author=user, text='Отзыв', score=2
+        )
+        response = admin_client.post('/api/v1/comments/bulk/', [
+            {'review': review.pk, 'text': 'Комментарий'},
+            {'review': review.pk, 'author': 'nobody', 'text': 'Кто я'},
+            {'review': 999, 'text': 'Куда'},
+        ], format='json')
+        statuses = [
+            result['status'] for result in response.json()['results']
+        ]
+        assert statuses == ['created', 'error', 'error']
+        assert Comment.objects.get().review == review
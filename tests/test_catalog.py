@@ -0,0 +1,107 @@
+import time
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.catalog import CATALOGS, GENRES, warm_catalogs
+from reviews.models import Category, Genre, Title
+from reviews.signals import bulk_loaded
+
+
+@pytest.fixture
+def catalog():
+    category = Category.objects.create(name='Фильм', slug='film')
+    genres = [
+        Genre.objects.create(name=f'Жанр {i}', slug=f'genre-{i}')
+        for i in range(2)
+    ]
+    title = Title.objects.create(name='Фильм', year=2000, category=category)
+    title.genre.set(genres)
+    warm_catalogs()
+    return title
+
+
+def tables(captured):
+    return ' '.join(query['sql'] for query in captured)
+
+
+@pytest.mark.django_db
+class TestCatalog:
+
+    def test_reloads_after_change(self, catalog):
+        loads = GENRES.loads
+        assert GENRES.get_by_slug('genre-0').name == 'Жанр 0'
+        assert GENRES.loads == loads, (
+            'Проверьте, что справочник не перечитывается без изменений'
+        )
+        Genre.objects.create(name='Новый', slug='new')
+        assert GENRES.get_by_slug('new') is not None, (
+            'Проверьте, что изменение жанров сбрасывает справочник'
+        )
+        assert GENRES.loads == loads + 1
+
+    def test_reloads_after_ttl(self, catalog, settings, monkeypatch):
+        loads = GENRES.loads
+        Genre.objects.bulk_create([Genre(name='Загружен', slug='loaded')])
+        assert GENRES.get_by_slug('loaded') is None
+        now = time.monotonic()
+        monkeypatch.setattr(
+            time, 'monotonic', lambda: now + settings.CATALOG_TTL
+        )
+        assert GENRES.get_by_slug('loaded') is not None, (
+            'Проверьте, что копия справочника устаревает через CATALOG_TTL'
+        )
+        assert GENRES.loads == loads + 1
+
+    def test_reloads_after_bulk_load(self, catalog):
+        Genre.objects.bulk_create([Genre(name='Загружен', slug='loaded')])
+        bulk_loaded.send(sender=Genre)
+        assert GENRES.get_by_slug('loaded') is not None, (
+            'Проверьте, что загрузка в обход save() сбрасывает справочник'
+        )
+
+    def test_create_title_without_lookups(self, admin_client, catalog):
+        with CaptureQueriesContext(connection) as captured:
+            response = admin_client.post('/api/v1/titles/', {
+                'name': 'Новое', 'year': 2001,
+                'genre': ['genre-0', 'genre-1'], 'category': 'film',
+            })
+        assert response.status_code == 201, response.json()
+        assert '"reviews_genre"."slug" =' not in tables(captured), (
+            'Проверьте, что слаги жанров находятся по справочнику'
+        )
+        assert '"reviews_category"."slug" =' not in tables(captured)
+        title = Title.objects.get(name='Новое')
+        assert title.category.slug == 'film'
+        assert title.genre.count() == 2
+
+    def test_unknown_slug(self, admin_client, catalog):
+        response = admin_client.post('/api/v1/titles/', {
+            'name': 'Новое', 'year': 2001, 'category': 'missing',
+        })
+        assert response.status_code == 400
+        assert 'category' in response.json()
+
+    def test_list_and_filter(self, client, catalog):
+        with CaptureQueriesContext(connection) as captured:
+            data = client.get('/api/v1/titles/?genre=genre-1').json()
+        assert data['results'][0]['category'] == {
+            'name': 'Фильм', 'slug': 'film'
+        }
+        assert 'reviews_category' not in tables(captured), (
+            'Проверьте, что категория берётся из справочника без соединения'
+        )
+        assert client.get(
+            '/api/v1/titles/?category=missing'
+        ).json()['count'] == 0
+
+    def test_stats_endpoint(self, admin_client, user_client, catalog):
+        assert user_client.get('/api/v1/catalog/stats/').status_code == 403
+        stats = admin_client.get('/api/v1/catalog/stats/').json()
+        assert len(stats) == len(CATALOGS)
+        genres = next(
+            item for item in stats if item['model'] == 'reviews.Genre'
+        )
+        assert genres['entries'] == 2
+        assert genres['bytes'] > 0
@@ -0,0 +1,134 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from reviews.models import Comment, Genre, Review, Title
+
+
+@pytest.fixture
+def review(admin):
+    title = Title.objects.create(name='Произведение', year=2000)
+    return Review.objects.create(
+        title=title, author=admin, text='Отзыв', score=7
+    )
+
+
+def title_url(title):
+    return f'/api/v1/titles/{title.pk}/'
+
+
+def review_url(review):
+    return f'/api/v1/titles/{review.title_id}/reviews/{review.pk}/'
+
+
+@pytest.mark.django_db
+class TestConditionalDetail:
+
+    def test_not_modified_skips_object_query(
+        self, user_client, review, django_assert_num_queries
+    ):
+        response = user_client.get(review_url(review))
+        assert response.status_code == 200
+        assert 'Last-Modified' in response
+        with django_assert_num_queries(1):
+            response = user_client.get(
+                review_url(review), HTTP_IF_NONE_MATCH=response['ETag']
+            )
+        assert response.status_code == 304, (
+            'Проверьте, что совпавший If-None-Match возвращает 304 '
+            'без чтения объекта'
+        )
+        assert not response.content
+
+    def test_if_modified_since(self, user_client, review):
+        response = user_client.get(title_url(review.title))
+        response = user_client.get(
+            title_url(review.title),
+            HTTP_IF_MODIFIED_SINCE=response['Last-Modified'],
+        )
+        assert response.status_code == 304
+
+    def test_child_changes_touch_parent(self, user_client, review, admin):
+        title_etag = user_client.get(title_url(review.title))['ETag']
+        review_etag = user_client.get(review_url(review))['ETag']
+        Comment.objects.create(review=review, author=admin, text='Да')
+        assert user_client.get(review_url(review))['ETag'] != review_etag, (
+            'Проверьте, что новый комментарий меняет ETag отзыва'
+        )
+        review.text = 'Новый текст'
+        review.save()
+        assert (
+            user_client.get(title_url(review.title))['ETag'] != title_etag
+        ), 'Проверьте, что изменение отзыва меняет ETag произведения'
+
+    def test_comment_post_changes_review_etag(self, user_client, review):
+        etag = user_client.get(review_url(review))['ETag']
+        with CaptureQueriesContext(connection) as captured:
+            response = user_client.post(
+                f'{review_url(review)}comments/', {'text': 'Комментарий'}
+            )
+        assert response.status_code == 201
+        writes = [
+            query['sql'] for query in captured.captured_queries
+            if query['sql'].startswith('UPDATE "reviews_review"')
+        ]
+        assert len(writes) == 1, (
+            'Проверьте, что комментарий отмечает отзыв одним UPDATE'
+        )
+        response = user_client.get(review_url(review), HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что после комментария клиент получает новый ETag '
+            'отзыва'
+        )
+
+    def test_catalog_change_updates_title_etag(self, user_client, review):
+        genre = Genre.objects.create(name='Драма', slug='drama')
+        review.title.genre.add(genre)
+        etag = user_client.get(title_url(review.title))['ETag']
+        genre.name = 'Комедия'
+        genre.save()
+        response = user_client.get(
+            title_url(review.title), HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == 200
+        assert response.json()['genre'][0]['name'] == 'Комедия'
+
+    def test_anonymous_cache_uses_same_etag(self, user_client, review):
+        etag = user_client.get(title_url(review.title))['ETag']
+        client = APIClient()
+        assert client.get(title_url(review.title))['ETag'] == etag
+        response = client.get(title_url(review.title), HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+    def test_if_match_prevents_lost_update(self, admin_client, review):
+        etag = admin_client.get(review_url(review))['ETag']
+        response = admin_client.patch(
+            review_url(review), {'text': 'Первая правка'}, HTTP_IF_MATCH=etag
+        )
+        assert response.status_code == 200
+        assert response['ETag'] != etag
+        response = admin_client.patch(
+            review_url(review), {'text': 'Вторая правка'}, HTTP_IF_MATCH=etag
+        )
+        assert response.status_code == 412, (
+            'Проверьте, что правка по устаревшему ETag отклоняется'
+        )
+        review.refresh_from_db()
+        assert review.text == 'Первая правка'
+
+    def test_if_match_on_delete(self, admin_client, review):
+        response = admin_client.delete(
+            review_url(review), HTTP_IF_MATCH='"stale"'
+        )
+        assert response.status_code == 412
+        assert Review.objects.filter(pk=review.pk).exists()
+        response = admin_client.delete(review_url(review), HTTP_IF_MATCH='*')
+        assert response.status_code == 204
+
+    def test_if_match_after_permissions(self, user_client, review):
+        response = user_client.patch(
+            review_url(review), {'text': 'Чужая правка'},
+            HTTP_IF_MATCH='"stale"',
+        )
+        assert response.status_code == 403
@@ -0,0 +1,141 @@
+import threading
+import time
+
+import pytest
+from django.db.utils import ConnectionHandler, OperationalError
+
+from api_yamdb.db.pool import ConnectionPool, PoolTimeoutError, all_pools
+
+
+class FakeConnection:
+
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def make_pool(**kwargs):
+    opened = []
+
+    def connect():
+        opened.append(FakeConnection())
+        return opened[-1]
+
+    kwargs.setdefault('check', lambda connection: not connection.closed)
+    return ConnectionPool(connect, **kwargs), opened
+
+
+class TestConnectionPool:
+
+    def test_reuses_released_connection(self):
+        pool, opened = make_pool(max_size=2)
+        first = pool.acquire()
+        pool.release(first)
+        assert pool.acquire() is first, (
+            'Проверьте, что пул отдаёт освободившееся соединение повторно'
+        )
+        assert len(opened) == 1
+
+    def test_timeout_when_exhausted(self):
+        pool, _ = make_pool(max_size=1, timeout=0.05)
+        pool.acquire()
+        with pytest.raises(PoolTimeoutError):
+            pool.acquire()
+        stats = pool.stats()
+        assert stats['timeouts'] == 1
+        assert stats['saturation'] == 1
+
+    def test_waits_for_release(self):
+        pool, opened = make_pool(max_size=1, timeout=1)
+        connection = pool.acquire()
+        timer = threading.Timer(0.05, pool.release, (connection,))
+        timer.start()
+        assert pool.acquire() is connection
+        timer.join()
+        stats = pool.stats()
+        assert stats['waits'] == 1
+        assert stats['wait_seconds'] >= 0.04, (
+            'Проверьте, что пул учитывает время ожидания соединения'
+        )
+
+    def test_recycles_old_connections(self):
+        pool, opened = make_pool(max_lifetime=0.01)
+        connection = pool.acquire()
+        time.sleep(0.02)
+        pool.release(connection)
+        assert connection.closed
+        assert pool.acquire() is not connection
+        assert pool.stats()['recycled'] == 1
+
+    def test_health_check(self):
+        pool, opened = make_pool(check_interval=0)
+        connection = pool.acquire()
+        pool.release(connection)
+        connection.closed = True
+        assert pool.acquire() is not connection, (
+            'Проверьте, что неисправное соединение не выдаётся из пула'
+        )
+        assert pool.stats()['discarded'] == 1
+
+    def test_warm(self):
+        pool, opened = make_pool(min_size=3, max_size=5)
+        pool.warm()
+        assert len(opened) == 3
+        assert pool.stats()['idle'] == 3
+        pool.acquire()
+        assert len(opened) == 3, (
+            'Проверьте, что прогретые соединения используются без подключения'
+        )
+
+
+def pooled_handler(settings_dict):
+    return ConnectionHandler({
+        'default': {'ENGINE': 'django.db.backends.dummy'},
+        'pooled': settings_dict,
+    })
+
+
+@pytest.fixture
+def pooled(tmp_path):
+    handler = pooled_handler({
+        'ENGINE': 'api_yamdb.db.sqlite3',
+        'NAME': str(tmp_path / 'pooled.sqlite3'),
+        'POOL': {'MAX_SIZE': 1, 'TIMEOUT': 0.05},
+    })
+    yield handler['pooled']
+    handler['pooled'].close()
+
+
+@pytest.mark.django_db
+class TestPooledBackend:
+
+    def test_connection_returns_to_pool(self, pooled):
+        with pooled.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        raw = pooled.connection
+        pooled.close()
+        assert pooled.connection is None
+        with pooled.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        assert pooled.connection is raw, (
+            'Проверьте, что закрытое соединение возвращается в пул'
+        )
+
+    def test_exhausted_pool_raises_database_error(self, pooled):
+        pooled.ensure_connection()
+        other = pooled_handler(pooled.settings_dict)['pooled']
+        with pytest.raises(OperationalError):
+            other.ensure_connection()
+
+    def test_stats_endpoint(self, admin_client, user_client, pooled):
+        pooled.ensure_connection()
+        assert user_client.get('/api/v1/db/pool/stats/').status_code == 403
+        response = admin_client.get('/api/v1/db/pool/stats/')
+        assert response.status_code == 200
+        assert any(
+            pool['alias'] == 'pooled' and pool['in_use'] == 1
+            for pool in response.json()
+        )
+        assert len(response.json()) == len(all_pools())
@@ -0,0 +1,95 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from api.explain import audit, find_issues
+from api.urls import v1_router
+from reviews.models import Category, Comment, Genre, Review, Title
+
+SIZES = {'reviews_title': 50000, 'reviews_category': 10}
+
+
+class TestFindIssues:
+
+    def test_postgres_seq_scan(self):
+        plan = (
+            'Limit  (cost=0.29..1.02 rows=10 width=64)\n'
+            '  ->  Sort  (cost=100.00..120.00 rows=50000 width=64)\n'
+            '        Sort Key: name\n'
+            '        ->  Seq Scan on reviews_title  (cost=0.00..80.00)'
+        )
+        sql = 'SELECT * FROM "reviews_title" ORDER BY "name" LIMIT 10'
+        issues = find_issues(sql, plan, 1000, SIZES, vendor='postgresql')
+        assert len(issues) == 2, (
+            'Проверьте, что аудит замечает полный просмотр и сортировку'
+        )
+
+    def test_sqlite_index_scan_is_fine(self):
+        plan = 'SCAN reviews_title USING INDEX title_name_idx'
+        sql = 'SELECT * FROM "reviews_title" ORDER BY "name" LIMIT 10'
+        assert find_issues(sql, plan, 1000, SIZES, vendor='sqlite') == []
+
+    def test_small_tables_are_ignored(self):
+        plan = 'SCAN reviews_category\nUSE TEMP B-TREE FOR ORDER BY'
+        sql = 'SELECT * FROM "reviews_category" ORDER BY "name" LIMIT 10'
+        assert find_issues(sql, plan, 1000, SIZES, vendor='sqlite') == []
+
+    def test_count_is_ignored(self):
+        plan = 'Seq Scan on reviews_title  (cost=0.00..80.00)'
+        sql = 'SELECT COUNT(*) AS "__count" FROM "reviews_title"'
+        assert find_issues(
+            sql, plan, 1000, SIZES, vendor='postgresql'
+        ) == []
+
+
+@pytest.fixture
+def catalog(user):
+    category = Category.objects.create(name='Фильм', slug='movie')
+    genre = Genre.objects.create(name='Драма', slug='drama')
+    for i in range(5):
+        title = Title.objects.create(
+            name=f'Произведение {i}', year=2000 + i, category=category
+        )
+        title.genre.add(genre)
+    review = Review.objects.create(
+        title=title, author=user, text='Отзыв', score=5
+    )
+    Comment.objects.create(review=review, author=user, text='Комментарий')
+
+
+@pytest.mark.django_db
+class TestExplainEndpoints:
+
+    def test_audit_covers_endpoints_and_filters(self, catalog):
+        results = audit(v1_router.registry, min_rows=0)
+        shapes = {(basename, tuple(params)) for basename, params, *_ in results}
+        for basename in ('title', 'review', 'comment', 'category', 'genre'):
+            assert (basename, ()) in shapes, (
+                f'Проверьте, что аудит проверяет список {basename}'
+            )
+        assert ('title', ('genre',)) in shapes
+        assert ('title', ('year',)) in shapes
+
+    def test_title_list_uses_name_index(self, catalog):
+        page_queries = [
+            (sql, plan, issues)
+            for basename, params, sql, plan, issues in audit(
+                v1_router.registry, min_rows=0
+            )
+            if basename == 'title' and not params and ' LIMIT ' in sql
+        ]
+        assert page_queries
+        for sql, plan, issues in page_queries:
+            assert 'title_name_idx' in plan, (
+                'Проверьте, что список произведений читается по индексу '
+                'названия без сортировки'
+            )
+            assert issues == []
+
+    def test_command(self, catalog):
+        out = StringIO()
+        call_command('explain_endpoints', '--plans', stdout=out)
+        output = out.getvalue()
+        assert 'Проверено запросов' in output
+        assert 'review:' in output
@@ -0,0 +1,99 @@
+import csv
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Category, Comment, Genre, Review, Title
+
+
+@pytest.fixture
+def catalog(user):
+    category = Category.objects.create(name='Фильм', slug='movie')
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    comedy = Genre.objects.create(name='Комедия', slug='comedy')
+    titles = []
+    for i in range(3):
+        title = Title.objects.create(
+            name=f'Произведение {i}', year=2000, category=category
+        )
+        title.genre.add(drama, comedy)
+        titles.append(title)
+    review = Review.objects.create(
+        title=titles[0], author=user, text='Отзыв', score=8
+    )
+    Comment.objects.create(review=review, author=user, text='Комментарий')
+    return titles
+
+
+def read_stream(response):
+    return b''.join(response.streaming_content).decode()
+
+
+@pytest.mark.django_db
+class TestExport:
+
+    def test_requires_admin(self, user_client):
+        response = user_client.get('/api/v1/export/titles.ndjson')
+        assert response.status_code == 403
+
+    def test_titles_ndjson(self, admin_client, catalog):
+        response = admin_client.get('/api/v1/export/titles.ndjson')
+        assert response.status_code == 200
+        assert response['Content-Type'] == 'application/x-ndjson'
+        rows = [json.loads(line) for line in read_stream(response).split('\n') if line]
+        assert [row['id'] for row in rows] == [title.pk for title in catalog]
+        assert rows[0]['genre'] == ['comedy', 'drama']
+        assert rows[0]['category'] == 'movie'
+        assert rows[0]['rating'] == 8
+
+    def test_genres_fetched_per_chunk(
+        self, admin_client, catalog, django_assert_max_num_queries, settings
+    ):
+        settings.EXPORT_CHUNK_SIZE = 2
+        with django_assert_max_num_queries(3):
+            response = admin_client.get('/api/v1/export/titles.ndjson')
+            content = read_stream(response)
+        assert content.count('\n') == len(catalog), (
+            'Проверьте, что жанры выбираются одним запросом на порцию'
+        )
+
+    def test_reviews_csv(self, admin_client, catalog, user):
+        response = admin_client.get('/api/v1/export/reviews.csv')
+        rows = list(csv.DictReader(io.StringIO(read_stream(response))))
+        assert len(rows) == 1
+        assert rows[0]['author'] == user.username
+        assert rows[0]['score'] == '8'
+
+    def test_incremental_since(self, admin_client, catalog):
+        since = catalog[0].pk
+        response = admin_client.get(
+            f'/api/v1/export/titles.ndjson?since={since}'
+        )
+        rows = [json.loads(line) for line in read_stream(response).split('\n') if line]
+        assert [row['id'] for row in rows] == [
+            title.pk for title in catalog[1:]
+        ], 'Проверьте, что since отбирает объекты новее указанного id'
+
+        review = Review.objects.get()
+        response = admin_client.get(
+            '/api/v1/export/comments.ndjson',
+            {'since': review.pub_date.isoformat()},
+        )
+        assert read_stream(response).count('\n') == 1
+
+    def test_rejects_bad_since(self, admin_client, catalog):
+        response = admin_client.get('/api/v1/export/reviews.csv?since=вчера')
+        assert response.status_code == 400
+
+    def test_unknown_export(self, admin_client):
+        response = admin_client.get('/api/v1/export/users.csv')
+        assert response.status_code == 404
+
+    def test_command(self, catalog, tmp_path):
+        output = tmp_path / 'reviews.csv'
+        call_command('export', 'reviews', '--format', 'csv', '--output', str(output))
+        assert output.read_text(encoding='utf-8').startswith(
+            'id,title,author,text,score,pub_date'
+        )
@@ -0,0 +1,81 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from reviews.models import Title
+
+from .test_query_counts import create_catalog
+
+
+def get(url):
+    with CaptureQueriesContext(connection) as captured:
+        response = APIClient().get(url)
+    assert response.status_code == 200, response.json()
+    return response.json(), [query['sql'] for query in captured]
+
+
+@pytest.mark.django_db
+class TestFieldsets:
+
+    def test_titles_fields(self, user):
+        create_catalog(user, 3)
+        data, queries = get('/api/v1/titles/?fields=id,name,rating')
+        assert set(data['results'][0]) == {'id', 'name', 'rating'}, (
+            'Проверьте, что ?fields= оставляет только перечисленные поля'
+        )
+        select = [sql for sql in queries if 'reviews_title' in sql][-1]
+        assert 'description' not in select, (
+            'Проверьте, что неотданные столбцы не читаются из базы'
+        )
+        assert 'reviews_category' not in select
+        assert not any('reviews_genre' in sql for sql in queries), (
+            'Проверьте, что жанры не загружаются, если их нет в ?fields='
+        )
+
+    def test_default_representation(self, user):
+        create_catalog(user, 1)
+        data, _ = get('/api/v1/titles/')
+        assert set(data['results'][0]) == {
+            'id', 'name', 'year', 'rating', 'description', 'genre', 'category'
+        }
+
+    def test_unknown_field(self, user):
+        create_catalog(user, 1)
+        response = APIClient().get('/api/v1/titles/?fields=id,secret')
+        assert response.status_code == 400
+        assert 'fields' in response.json()
+
+    def test_expand_stats(self, user):
+        create_catalog(user, 1)
+        data, _ = get('/api/v1/titles/?fields=id&expand=stats')
+        assert set(data['results'][0]) == {'id', 'stats'}
+        data, _ = get('/api/v1/titles/?fields=id&stats=true')
+        assert set(data['results'][0]) == {'id', 'stats'}
+
+    def test_comments_expand_review(self, user):
+        title, review = create_catalog(user, 3)
+        url = f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+        data, queries = get(f'{url}?fields=id,text')
+        assert set(data['results'][0]) == {'id', 'text'}
+        assert 'JOIN "reviews_review"' not in queries[-1], (
+            'Проверьте, что отзыв не присоединяется без поля review'
+        )
+        data, queries = get(f'{url}?expand=review,author')
+        comment = data['results'][0]
+        assert comment['review']['id'] == review.id, (
+            'Проверьте, что ?expand=review отдаёт отзыв целиком'
+        )
+        assert comment['author']['username'] == user.username
+        assert len(queries) <= 3
+
+    def test_fields_ignored_on_write(self, user_client):
+        title = Title.objects.create(name='Новое', year=2000)
+        response = user_client.post(
+            f'/api/v1/titles/{title.id}/reviews/?fields=id',
+            data={'text': 'Ещё отзыв', 'score': 5},
+        )
+        assert response.status_code == 201
+        assert response.json()['text'] == 'Ещё отзыв', (
+            'Проверьте, что ?fields= не влияет на запись'
+        )
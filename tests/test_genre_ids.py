@@ -0,0 +1,97 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.catalog import warm_catalogs
+from reviews.genres import rebuild_genre_ids
+from reviews.models import Genre, Title
+
+
+@pytest.fixture
+def genres():
+    return {
+        slug: Genre.objects.create(name=name, slug=slug)
+        for slug, name in (
+            ('drama', 'Драма'), ('comedy', 'Комедия'), ('horror', 'Ужасы')
+        )
+    }
+
+
+@pytest.fixture
+def titles(genres):
+    titles = {}
+    for name, slugs in (
+        ('Обе', ('drama', 'comedy')),
+        ('Драма', ('drama',)),
+        ('Ужасы', ('horror',)),
+    ):
+        titles[name] = Title.objects.create(name=name, year=2000)
+        titles[name].genre.set([genres[slug] for slug in slugs])
+    warm_catalogs()
+    return titles
+
+
+def genre_ids(title):
+    return Title.objects.get(pk=title.pk).genre_ids
+
+
+def names(response):
+    return sorted(title['name'] for title in response.json()['results'])
+
+
+@pytest.mark.django_db
+class TestGenreIds:
+
+    def test_kept_in_sync(self, genres, titles):
+        title = titles['Драма']
+        assert genre_ids(title) == [genres['drama'].pk]
+        title.genre.add(genres['horror'])
+        assert genre_ids(title) == sorted(
+            [genres['drama'].pk, genres['horror'].pk]
+        ), 'Проверьте, что genre_ids обновляется при title.genre.add'
+        title.genre.remove(genres['drama'])
+        assert genre_ids(title) == [genres['horror'].pk]
+        genres['comedy'].genre.add(title)
+        assert genres['comedy'].pk in genre_ids(title), (
+            'Проверьте, что изменения со стороны жанра тоже учитываются'
+        )
+        genres['comedy'].genre.clear()
+        assert genre_ids(titles['Обе']) == [genres['drama'].pk]
+        genres['horror'].delete()
+        assert genre_ids(title) == [], (
+            'Проверьте, что удаление жанра убирает его из genre_ids'
+        )
+        title.genre.clear()
+        assert genre_ids(title) == []
+
+    def test_rebuild(self, genres, titles):
+        Title.objects.update(genre_ids=[])
+        assert rebuild_genre_ids() == len(titles)
+        assert genre_ids(titles['Обе']) == sorted(
+            [genres['drama'].pk, genres['comedy'].pk]
+        )
+
+    def test_filters_without_joins(self, client, titles):
+        with CaptureQueriesContext(connection) as captured:
+            response = client.get('/api/v1/titles/?genre=drama,comedy')
+        assert names(response) == ['Обе'], (
+            'Проверьте, что ?genre= с несколькими жанрами требует все жанры'
+        )
+        assert not any(
+            'reviews_title_genre' in query['sql'] for query in captured
+        ), 'Проверьте, что фильтр и вывод жанров обходятся без соединений'
+        assert names(
+            client.get('/api/v1/titles/?genre_any=comedy,horror')
+        ) == ['Обе', 'Ужасы']
+        assert names(client.get('/api/v1/titles/?genre=drama')) == [
+            'Драма', 'Обе'
+        ]
+        assert names(client.get('/api/v1/titles/?genre=drama,missing')) == []
+        assert names(client.get('/api/v1/titles/?genre_any=missing')) == []
+
+    def test_genres_rendered_in_name_order(self, client, titles):
+        result = client.get('/api/v1/titles/?name=Обе').json()['results'][0]
+        assert result['genre'] == [
+            {'name': 'Драма', 'slug': 'drama'},
+            {'name': 'Комедия', 'slug': 'comedy'},
+        ]
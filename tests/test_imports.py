@@ -0,0 +1,179 @@
+import csv
+import io
+import json
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.catalog import GENRES, warm_catalogs
+from reviews.management.commands.imports import (STATE_FILE, copy_columns,
+                                                 copy_lines, read_objects)
+from reviews.models import (Comment, Genre, LeaderboardEntry, Review, Title,
+                            TitleScoreStats)
+from users.models import User
+
+FILES = {
+    'users': [
+        ('id', 'username', 'email', 'role', 'bio', 'first_name', 'last_name'),
+        (100, 'reader', 'reader@yamdb.fake', 'user', '', '', ''),
+        (101, 'critic', 'critic@yamdb.fake', 'moderator', '', '', ''),
+    ],
+    'category': [('id', 'name', 'slug'), (1, 'Фильм', 'movie')],
+    'genre': [
+        ('id', 'name', 'slug'),
+        (1, 'Драма', 'drama'),
+        (2, 'Комедия', 'comedy'),
+        (3, 'Триллер', 'thriller'),
+    ],
+    'titles': [
+        ('id', 'name', 'year', 'category'),
+        (1, 'Первое', 2000, 1),
+        (2, 'Второе', 2001, 1),
+    ],
+    'genre_title': [
+        ('id', 'title_id', 'genre_id'), (1, 1, 1), (2, 1, 3), (3, 2, 2),
+    ],
+    'review': [
+        ('id', 'title_id', 'text', 'author', 'score', 'pub_date'),
+        (1, 1, 'Хорошо', 100, 8, '2023-01-01T10:00:00.000Z'),
+        (2, 1, 'Плохо', 101, 4, '2023-01-02T10:00:00.000Z'),
+    ],
+    'comments': [
+        ('id', 'review_id', 'text', 'author', 'pub_date'),
+        (1, 1, 'Согласен', 101, '2023-01-03T10:00:00.000Z'),
+    ],
+}
+
+
+def write_csv(path, name, rows):
+    with open(path / f'{name}.csv', 'w', encoding='utf-8', newline='') as f:
+        csv.writer(f).writerows(rows)
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    for name, rows in FILES.items():
+        write_csv(tmp_path, name, rows)
+    return tmp_path
+
+
+def run_imports(path, **options):
+    out = io.StringIO()
+    call_command('imports', path=str(path), stdout=out, **options)
+    return out.getvalue()
+
+
+def loaded_files(output):
+    return [
+        line.split(':')[0] for line in output.splitlines()
+        if line.endswith(' МБ')
+    ]
+
+
+@pytest.mark.django_db
+class TestImports:
+
+    def test_dependency_order(self, data_dir):
+        order = loaded_files(run_imports(data_dir))
+        assert set(order) == {f'{name}.csv' for name in FILES}
+        for parent, child in (
+            ('users', 'review'),
+            ('category', 'titles'),
+            ('genre', 'genre_title'),
+            ('titles', 'genre_title'),
+            ('titles', 'review'),
+            ('review', 'comments'),
+        ):
+            assert order.index(f'{parent}.csv') < order.index(
+                f'{child}.csv'
+            ), f'Проверьте, что {parent}.csv загружается раньше {child}.csv'
+        assert User.objects.count() == 2
+        assert Comment.objects.get().review_id == 1
+
+    def test_batch_size(self, data_dir):
+        with CaptureQueriesContext(connection) as captured:
+            run_imports(data_dir, batch_size=2)
+        inserts = [
+            query['sql'] for query in captured.captured_queries
+            if query['sql'].startswith('INSERT INTO "reviews_genre"')
+        ]
+        assert len(inserts) == 2, (
+            'Проверьте, что три жанра записываются пакетами по два'
+        )
+        assert Genre.objects.count() == 3
+
+    def test_rebuilds_after_load(self, data_dir):
+        run_imports(data_dir)
+        first = Title.objects.get(pk=1)
+        assert first.genre_ids == [1, 3]
+        assert Title.objects.get(pk=2).genre_ids == [2]
+        assert (first.review_count, first.score_sum, first.rating) == (
+            2, 12, 6.0
+        )
+        counts = TitleScoreStats.objects.get(title=first).counts
+        assert counts[7] == 1 and counts[3] == 1
+        assert LeaderboardEntry.objects.filter(title=first).exists()
+        # Поля без колонок в файле получают значения по умолчанию модели.
+        assert first.updated_at is not None
+        assert Review.objects.get(pk=1).updated_at is not None
+
+    def test_refreshes_catalogs(self, data_dir):
+        warm_catalogs()
+        run_imports(data_dir)
+        assert GENRES.get_by_slug('thriller') is not None, (
+            'Проверьте, что импорт сбрасывает справочники воркеров'
+        )
+
+    def test_resume_after_failed_file(self, data_dir):
+        write_csv(data_dir, 'comments', [
+            ('id', 'review_id', 'text', 'author', 'likes'),
+            (1, 1, 'Согласен', 101, 3),
+        ])
+        with pytest.raises(CommandError):
+            run_imports(data_dir)
+        with open(data_dir / STATE_FILE, encoding='utf-8') as state:
+            done = set(json.load(state))
+        assert 'comments.csv' not in done
+        assert 'review.csv' in done
+        assert not Comment.objects.exists()
+
+        write_csv(data_dir, 'comments', FILES['comments'])
+        output = run_imports(data_dir)
+        assert loaded_files(output) == ['comments.csv'], (
+            'Проверьте, что повторный запуск загружает только '
+            'незавершённые файлы'
+        )
+        assert 'review.csv: уже загружен' in output
+        assert Comment.objects.count() == 1
+        assert User.objects.count() == 2
+
+
+@pytest.mark.django_db
+class TestCopyRows:
+
+    def test_missing_columns_get_model_defaults(self, data_dir):
+        fields, objects = read_objects(User, data_dir / 'users.csv')
+        columns = copy_columns(User, fields)
+        names = [field.attname for field in columns]
+        assert {'id', 'password', 'date_joined', 'is_active'} <= set(names)
+        rows = list(csv.reader(io.StringIO(''.join(
+            copy_lines(objects, columns)
+        ))))
+        assert len(rows) == 2
+        row = dict(zip(names, rows[0]))
+        assert row['username'] == 'reader'
+        assert row['date_joined'], (
+            'Проверьте, что COPY заполняет NOT NULL столбцы без колонок '
+            'в файле значениями по умолчанию'
+        )
+        assert row['is_active'] == 'True'
+
+    def test_null_and_empty_string_differ(self, data_dir):
+        fields, objects = read_objects(Title, data_dir / 'titles.csv')
+        columns = copy_columns(Title, fields)
+        line = next(copy_lines(objects, columns))
+        values = dict(zip([field.attname for field in columns], line.split(',')))
+        assert values['description'] == ''
+        assert values['review_count'] == '"0"'
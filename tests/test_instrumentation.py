@@ -0,0 +1,46 @@
+import pytest
+from rest_framework.test import APIClient
+
+from reviews.models import Title
+
+
+@pytest.mark.django_db
+class TestInstrumentation:
+
+    def test_server_timing_header(self, user_client):
+        Title.objects.create(name='Произведение', year=2000)
+        response = user_client.get('/api/v1/titles/')
+        timing = response['Server-Timing']
+        for section in ('db;dur=', 'ser;dur=', 'perm;dur=', 'total;dur='):
+            assert section in timing, (
+                f'Проверьте, что Server-Timing содержит раздел {section}'
+            )
+        assert '3 queries' in timing
+
+    def test_metrics_endpoint(self, settings, user_client):
+        settings.METRICS_TOKEN = 'scrape'
+        user_client.get('/api/v1/titles/')
+        response = APIClient().get(
+            '/metrics', HTTP_AUTHORIZATION='Bearer scrape'
+        )
+        assert response.status_code == 200
+        body = response.content.decode()
+        assert 'yamdb_request_duration_seconds_count{view="TitleViewSet.list"}' in body
+        assert 'yamdb_db_queries_bucket{view="TitleViewSet.list",le="+Inf"}' in body
+
+    def test_metrics_require_token(self, settings, admin_client):
+        assert APIClient().get('/metrics').status_code == 403, (
+            'Проверьте, что без METRICS_TOKEN адрес /metrics закрыт'
+        )
+        settings.METRICS_TOKEN = 'scrape'
+        assert APIClient().get('/metrics').status_code == 403
+        assert admin_client.get('/metrics').status_code == 403
+        response = APIClient().get(
+            '/metrics', HTTP_AUTHORIZATION='Bearer other'
+        )
+        assert response.status_code == 403
+
+    def test_sampling_disabled(self, settings):
+        settings.PERF_SAMPLE_RATE = 0
+        response = APIClient().get('/api/v1/titles/')
+        assert 'Server-Timing' not in response
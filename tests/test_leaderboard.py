@@ -0,0 +1,192 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from api.pagination import LeaderboardPagination
+from reviews.leaderboard import (TOP, TRENDING, log_add, refresh_changed,
+                                 refresh_leaderboards, trending_weight,
+                                 weighted_rating)
+from reviews.models import Genre, LeaderboardEntry, Review, Title
+
+
+class TestLeaderboardMath:
+
+    def test_bayesian_rating_pulls_to_mean(self, settings):
+        settings.LEADERBOARD_PRIOR_REVIEWS = 10
+        single = weighted_rating(10, 1, mean=5)
+        many = weighted_rating(900, 100, mean=5)
+        assert single < many, (
+            'Проверьте, что одна десятка не обгоняет сотню девяток'
+        )
+
+    def test_recent_reviews_weigh_more(self, settings):
+        settings.LEADERBOARD_HALF_LIFE_HOURS = 24
+        now = timezone.now()
+        old = trending_weight(10, now - timedelta(days=1))
+        assert trending_weight(10, now) - old == pytest.approx(
+            0.6931, rel=1e-3
+        ), 'Проверьте, что вклад отзыва уменьшается вдвое за период'
+
+    def test_log_add(self):
+        assert log_add(None, 1.5) == 1.5
+        assert log_add(0.0, 0.0) == pytest.approx(0.6931, rel=1e-3)
+
+
+@pytest.fixture
+def reviewers(django_user_model):
+    return [
+        django_user_model.objects.create(
+            username=f'reviewer{i}', email=f'reviewer{i}@yamdb.fake'
+        )
+        for i in range(12)
+    ]
+
+
+@pytest.fixture
+def titles(reviewers):
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    popular = Title.objects.create(name='Популярное', year=2000)
+    popular.genre.add(drama)
+    lucky = Title.objects.create(name='Одна десятка', year=2000)
+    for author in reviewers:
+        Review.objects.create(
+            title=popular, author=author, text='Отзыв', score=10
+        )
+    Review.objects.create(
+        title=lucky, author=reviewers[0], text='Отзыв', score=10
+    )
+    bad = Title.objects.create(name='Плохое', year=2000)
+    Review.objects.create(title=bad, author=reviewers[0], text='Нет', score=2)
+    # Средняя оценка по сервису фиксируется при пересборке.
+    refresh_leaderboards()
+    return popular, lucky
+
+
+@pytest.mark.django_db
+class TestLeaderboards:
+
+    def test_changed_titles(self, titles, reviewers):
+        popular, lucky = titles
+        top_scores = dict(
+            LeaderboardEntry.objects.filter(board=TOP)
+            .values_list('title_id', 'score')
+        )
+        top = list(
+            LeaderboardEntry.objects.filter(board=TOP)
+            .order_by('-score').values_list('title_id', flat=True)
+        )
+        assert top[:2] == [popular.pk, lucky.pk]
+        assert LeaderboardEntry.objects.filter(
+            board=TRENDING, title=popular
+        ).exists(), 'Проверьте, что новый отзыв попадает в популярное'
+
+        since = timezone.now()
+        Review.objects.create(
+            title=lucky, author=reviewers[1], text='Отзыв', score=10
+        )
+        assert dict(
+            LeaderboardEntry.objects.filter(board=TOP)
+            .values_list('title_id', 'score')
+        ) == top_scores, (
+            'Проверьте, что запись отзыва не пересчитывает таблицы лидеров'
+        )
+        assert refresh_changed(since) == 1
+        new_top = list(
+            LeaderboardEntry.objects.filter(board=TOP)
+            .order_by('-score').values_list('title_id', 'score')
+        )
+        assert new_top[1][1] > top_scores[lucky.pk], (
+            'Проверьте, что обновление меняет позицию изменённого '
+            'произведения в топе'
+        )
+        assert refresh_changed(timezone.now()) == 0
+
+        since = timezone.now()
+        Review.objects.filter(title=lucky).delete()
+        refresh_changed(since)
+        assert not LeaderboardEntry.objects.filter(
+            title=lucky
+        ).exists(), 'Проверьте, что произведение без отзывов уходит из таблиц'
+
+    def test_refresh_matches_incremental(self, titles):
+        entries = LeaderboardEntry.objects.order_by('board', '-score')
+        before = list(entries.values_list('board', 'title_id'))
+        LeaderboardEntry.objects.all().delete()
+        call_command('refresh_leaderboards')
+        assert list(entries.values_list('board', 'title_id')) == before, (
+            'Проверьте, что пересборка даёт те же таблицы лидеров'
+        )
+
+    def test_top_endpoint(
+        self, client, titles, django_assert_max_num_queries
+    ):
+        popular, lucky = titles
+        with django_assert_max_num_queries(5):
+            response = client.get('/api/v1/titles/top/')
+        assert response.status_code == 200
+        results = response.json()['results']
+        assert [item['id'] for item in results][:2] == [
+            popular.pk, lucky.pk
+        ]
+        assert results[0]['score'] > results[1]['score']
+
+        response = client.get('/api/v1/titles/top/?genre=drama')
+        assert [item['id'] for item in response.json()['results']] == [
+            popular.pk
+        ]
+        assert client.get('/api/v1/titles/top/?genre=nope').status_code == 404
+
+    def test_top_pages(self, client, titles, monkeypatch):
+        monkeypatch.setattr(LeaderboardPagination, 'page_size', 2)
+        with CaptureQueriesContext(connection) as captured:
+            response = client.get('/api/v1/titles/top/')
+        assert not [
+            query for query in captured.captured_queries
+            if 'COUNT(' in query['sql']
+        ], 'Проверьте, что страница таблицы лидеров не считает записи'
+        ids = []
+        while True:
+            data = response.json()
+            ids.extend(item['id'] for item in data['results'])
+            if not data['next']:
+                break
+            response = client.get(data['next'])
+        assert ids == list(
+            LeaderboardEntry.objects.filter(board=TOP)
+            .order_by('-score', 'title_id').values_list('title_id', flat=True)
+        ), 'Проверьте, что курсор проходит таблицу лидеров по порядку'
+        previous = client.get(response.json()['previous']).json()
+        assert [item['id'] for item in previous['results']] == ids[:2]
+
+    def test_bulk_reviews_wait_for_refresh(
+        self, admin_client, titles, reviewers
+    ):
+        popular, lucky = titles
+        before = list(LeaderboardEntry.objects.values_list(
+            'board', 'title_id', 'score'
+        ))
+        since = timezone.now()
+        response = admin_client.post('/api/v1/reviews/bulk/', [{
+            'title': lucky.pk, 'author': reviewers[1].username,
+            'text': 'Отзыв', 'score': 10,
+        }], format='json')
+        assert response.status_code == 200, response.json()
+        assert list(LeaderboardEntry.objects.values_list(
+            'board', 'title_id', 'score'
+        )) == before, (
+            'Проверьте, что пакетная запись отзывов не пересчитывает '
+            'таблицы лидеров в запросе'
+        )
+        assert refresh_changed(since) == 1
+
+    def test_trending_endpoint(self, client, titles):
+        popular, lucky = titles
+        response = client.get('/api/v1/titles/trending/')
+        assert response.status_code == 200
+        ids = [item['id'] for item in response.json()['results']]
+        assert ids[0] == popular.pk
+        assert len(ids) == 3
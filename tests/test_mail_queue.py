@@ -0,0 +1,112 @@
+from smtplib import SMTPRecipientsRefused
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from rest_framework.test import APIClient
+
+from users.mail_queue import (DatabaseMailQueue, MemoryMailQueue,
+                              deliver_batch)
+from users.models import QueuedEmail
+
+
+@pytest.fixture(params=[DatabaseMailQueue, MemoryMailQueue])
+def queue(request, settings):
+    MemoryMailQueue.reset()
+    settings.MAIL_QUEUE_BACKEND = (
+        f'users.mail_queue.{request.param.__name__}'
+    )
+    return request.param()
+
+
+def signup(username='newuser', email='newuser@yamdb.fake'):
+    return APIClient().post(
+        '/api/v1/auth/signup/', {'username': username, 'email': email}
+    )
+
+
+@pytest.mark.django_db
+class TestMailQueue:
+
+    def test_signup_enqueues_without_sending(self, queue):
+        assert signup().status_code == 200
+        assert len(mail.outbox) == 0, (
+            'Проверьте, что регистрация не отправляет письмо в запросе'
+        )
+        assert queue.metrics()['depth'] == 1
+
+    def test_repeated_signup_is_deduplicated(self, queue):
+        signup()
+        signup()
+        assert queue.metrics()['depth'] == 1
+        assert deliver_batch(queue, 10) == (1, 0)
+        assert len(mail.outbox) == 1
+        assert 'Ваш код подтверждения' in mail.outbox[0].body
+
+    def test_batch_delivery(self, queue):
+        for i in range(5):
+            signup(f'user{i}', f'user{i}@yamdb.fake')
+        assert deliver_batch(queue, 3) == (3, 0)
+        assert deliver_batch(queue, 3) == (2, 0)
+        assert deliver_batch(queue, 3) == (0, 0)
+        assert len(mail.outbox) == 5
+        assert queue.metrics()['depth'] == 0
+
+    def test_failed_delivery_is_retried_later(self, queue, monkeypatch):
+        signup()
+
+        def broken(*args, **kwargs):
+            raise OSError('relay down')
+
+        monkeypatch.setattr(
+            'django.core.mail.backends.locmem.EmailBackend.send_messages',
+            broken,
+        )
+        assert deliver_batch(queue, 10) == (0, 1)
+        assert deliver_batch(queue, 10) == (0, 0), (
+            'Проверьте, что повторная отправка откладывается'
+        )
+        assert queue.metrics()['depth'] == 1
+
+    def test_one_bad_recipient(self, queue, monkeypatch):
+        for i in range(3):
+            signup(f'user{i}', f'user{i}@yamdb.fake')
+        send = EmailBackend.send_messages
+
+        def refuse_one(backend, messages):
+            if any(m.to == ['user1@yamdb.fake'] for m in messages):
+                raise SMTPRecipientsRefused({'user1@yamdb.fake': (550, '')})
+            return send(backend, messages)
+
+        monkeypatch.setattr(EmailBackend, 'send_messages', refuse_one)
+        assert deliver_batch(queue, 10) == (2, 1), (
+            'Проверьте, что ошибка одного адреса не мешает остальным письмам'
+        )
+        assert sorted(message.to[0] for message in mail.outbox) == [
+            'user0@yamdb.fake', 'user2@yamdb.fake'
+        ]
+        assert queue.metrics()['depth'] == 1
+
+    def test_claim_commits_before_sending(self, queue, monkeypatch):
+        signup()
+        claimed = []
+
+        def check_claim(backend, messages):
+            claimed.append(queue.claim(10))
+            return len(messages)
+
+        monkeypatch.setattr(EmailBackend, 'send_messages', check_claim)
+        assert deliver_batch(queue, 10) == (1, 0)
+        assert claimed == [[]], (
+            'Проверьте, что выбранное письмо недоступно другим воркерам '
+            'во время отправки'
+        )
+
+
+@pytest.mark.django_db
+def test_sent_email_frees_dedupe_key():
+    queue = DatabaseMailQueue()
+    queue.enqueue('key', 'a@yamdb.fake', 'Тема', 'Текст')
+    deliver_batch(queue, 10)
+    queue.enqueue('key', 'a@yamdb.fake', 'Тема', 'Текст')
+    assert QueuedEmail.objects.count() == 2
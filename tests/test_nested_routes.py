@@ -0,0 +1,121 @@
+import re
+
+import pytest
+from django.db import IntegrityError, connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from api.serializers import ReviewSerializer, violates_constraint
+from reviews.models import Comment, Review, Title
+
+TABLE_RE = re.compile(r'(?:FROM|INTO|UPDATE) "(\w+)"')
+
+
+def statements(captured):
+    """Пары (команда, таблица) всех запросов, кроме точек сохранения."""
+    return [
+        (query['sql'].split()[0], TABLE_RE.search(query['sql']).group(1))
+        for query in captured.captured_queries
+        if 'SAVEPOINT' not in query['sql']
+    ]
+
+
+@pytest.fixture
+def review(admin):
+    title = Title.objects.create(name='Произведение', year=2000)
+    return Review.objects.create(
+        title=title, author=admin, text='Отзыв', score=7
+    )
+
+
+@pytest.fixture
+def other_title():
+    return Title.objects.create(name='Другое', year=2001)
+
+
+@pytest.mark.django_db
+class TestNestedRoutes:
+
+    def test_review_create_queries(self, user_client, review):
+        with CaptureQueriesContext(connection) as captured:
+            response = user_client.post(
+                f'/api/v1/titles/{review.title_id}/reviews/',
+                {'text': 'Новый отзыв', 'score': 5},
+            )
+        assert response.status_code == 201
+        assert statements(captured) == [
+            ('SELECT', 'reviews_title'),
+            ('INSERT', 'reviews_review'),
+            ('UPDATE', 'reviews_title'),
+            ('UPDATE', 'reviews_titlescorestats'),
+        ], (
+            'Проверьте, что создание отзыва проверяет произведение одним '
+            'запросом, не ищет повторный отзыв отдельно и обновляет '
+            'рейтинг и распределение оценок без чтения'
+        )
+        parent_check = captured.captured_queries[0]['sql']
+        assert 'ORDER BY' not in parent_check, (
+            'Проверьте, что родитель ищется по ключу без сортировки'
+        )
+
+    def test_duplicate_review(self, admin_client, review):
+        response = admin_client.post(
+            f'/api/v1/titles/{review.title_id}/reviews/',
+            {'text': 'Ещё отзыв', 'score': 3},
+        )
+        assert response.status_code == 400
+        assert 'уже оставляли' in response.content.decode()
+        assert Review.objects.count() == 1
+        review.title.refresh_from_db()
+        assert review.title.review_count == 1
+
+    def test_other_integrity_errors(self, review, other_title):
+        serializer = ReviewSerializer()
+        with pytest.raises(IntegrityError) as error, transaction.atomic():
+            serializer.create({
+                'title': other_title, 'author': review.author,
+                'text': None, 'score': 5,
+            })
+        assert not violates_constraint(error.value, Review, 'unique-review')
+        with pytest.raises(IntegrityError) as error, transaction.atomic():
+            Review.objects.create(
+                title=review.title, author=review.author, text='', score=5
+            )
+        assert violates_constraint(error.value, Review, 'unique-review'), (
+            'Проверьте, что ошибкой повторного отзыва считается только '
+            'нарушение unique-review'
+        )
+
+    def test_comment_create_queries(self, user_client, review):
+        with CaptureQueriesContext(connection) as captured:
+            response = user_client.post(
+                f'/api/v1/titles/{review.title_id}/reviews/{review.pk}'
+                '/comments/',
+                {'text': 'Комментарий'},
+            )
+        assert response.status_code == 201
+        assert response.json()['review'] == review.text
+        assert statements(captured) == [
+            ('SELECT', 'reviews_review'),
+            ('INSERT', 'reviews_comment'),
+            ('UPDATE', 'reviews_review'),
+        ]
+
+    def test_review_of_other_title(self, user_client, review, other_title):
+        comment = Comment.objects.create(
+            review=review, author=review.author, text='Комментарий'
+        )
+        url = f'/api/v1/titles/{other_title.pk}/reviews/{review.pk}/comments/'
+        assert user_client.get(url).status_code == 404, (
+            'Проверьте, что отзыв другого произведения не найден'
+        )
+        assert user_client.get(f'{url}{comment.pk}/').status_code == 404
+        assert user_client.post(url, {'text': 'Нет'}).status_code == 404
+        assert user_client.get(
+            f'/api/v1/titles/{other_title.pk}/reviews/{review.pk}/'
+        ).status_code == 404
+
+    def test_missing_title(self, user_client):
+        url = '/api/v1/titles/999/reviews/'
+        assert user_client.get(url).status_code == 404
+        response = user_client.post(url, {'text': 'Отзыв', 'score': 5})
+        assert response.status_code == 404
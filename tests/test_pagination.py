@@ -0,0 +1,61 @@
+import pytest
+from rest_framework.test import APIClient
+
+from reviews.models import Review, Title
+
+
+@pytest.fixture
+def title_with_reviews(django_user_model):
+    title = Title.objects.create(name='Произведение', year=2000)
+    for i in range(25):
+        author = django_user_model.objects.create(
+            username=f'reviewer{i}', email=f'reviewer{i}@yamdb.fake'
+        )
+        Review.objects.create(title=title, author=author, text='Отзыв', score=5)
+    return title
+
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+
+    def test_walks_feed_without_count(
+        self, django_assert_max_num_queries, title_with_reviews
+    ):
+        client = APIClient()
+        url = f'/api/v1/titles/{title_with_reviews.id}/reviews/?cursor='
+        seen = []
+        pages = []
+        while url:
+            with django_assert_max_num_queries(2):
+                response = client.get(url)
+            assert response.status_code == 200
+            data = response.json()
+            assert 'count' not in data, (
+                'Проверьте, что курсорная пагинация не считает COUNT(*)'
+            )
+            seen.extend(item['id'] for item in data['results'])
+            pages.append(data)
+            url = data['next']
+        expected = list(
+            Review.objects.order_by('-pub_date', '-id')
+            .values_list('id', flat=True)
+        )
+        assert seen == expected
+        assert pages[0]['previous'] is None
+
+        previous = APIClient().get(pages[-1]['previous']).json()
+        assert previous['results'] == pages[-2]['results'], (
+            'Проверьте, что ссылка previous возвращает предыдущую страницу'
+        )
+
+    def test_invalid_cursor(self, title_with_reviews):
+        response = APIClient().get(
+            f'/api/v1/titles/{title_with_reviews.id}/reviews/?cursor=bad'
+        )
+        assert response.status_code == 404
+
+    def test_page_number_mode_by_default(self, title_with_reviews):
+        response = APIClient().get(
+            f'/api/v1/titles/{title_with_reviews.id}/reviews/'
+        )
+        assert response.json()['count'] == 25
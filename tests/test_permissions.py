@@ -0,0 +1,111 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from api.authentication import RoleAccessToken, StatelessJWTAuthentication
+from api.permissions import IsAdminModeratorAuthorOrReadOnly, IsAuthor
+from reviews.models import Comment, Review, Title
+
+
+def principal(user):
+    """Пользователь в том виде, в каком его собирает аутентификация."""
+    return StatelessJWTAuthentication().get_user(
+        RoleAccessToken.for_user(user)
+    )
+
+
+def patch_request(user):
+    request = Request(APIRequestFactory().patch('/'))
+    request.user = principal(user)
+    return request
+
+
+def user_queries(captured):
+    return [
+        query['sql'] for query in captured.captured_queries
+        if 'FROM "users_user"' in query['sql']
+    ]
+
+
+@pytest.fixture
+def review(user):
+    title = Title.objects.create(name='Произведение', year=2000)
+    return Review.objects.create(
+        title=title, author=user, text='Отзыв', score=7
+    )
+
+
+@pytest.fixture
+def other(django_user_model):
+    return django_user_model.objects.create_user(
+        username='Other', email='other@yamdb.fake', password='1234567'
+    )
+
+
+@pytest.mark.django_db
+class TestObjectPermissions:
+
+    @pytest.mark.parametrize('role, allowed', [
+        ('user', False), ('moderator', True), ('admin', True),
+    ])
+    def test_no_queries(
+        self, review, other, role, allowed, django_assert_num_queries
+    ):
+        other.role = role
+        other.save()
+        obj = Review.objects.get(pk=review.pk)
+        author_request = patch_request(review.author)
+        other_request = patch_request(other)
+        permission = IsAdminModeratorAuthorOrReadOnly()
+        with django_assert_num_queries(0):
+            assert permission.has_object_permission(
+                author_request, None, obj
+            )
+            assert permission.has_object_permission(
+                other_request, None, obj
+            ) is allowed
+            assert IsAuthor().has_object_permission(author_request, None, obj)
+            assert not IsAuthor().has_object_permission(
+                other_request, None, obj
+            )
+
+    def test_patch_and_delete_do_not_load_author(self, user_client, review):
+        url = f'/api/v1/titles/{review.title_id}/reviews/{review.pk}/'
+        with CaptureQueriesContext(connection) as captured:
+            response = user_client.patch(url, {'text': 'Правка'})
+        assert response.status_code == 200
+        assert not user_queries(captured), (
+            'Проверьте, что проверка прав не загружает автора отзыва'
+        )
+        with CaptureQueriesContext(connection) as captured:
+            response = user_client.delete(url)
+        assert response.status_code == 204
+        assert not user_queries(captured)
+
+    def test_foreign_comment_is_forbidden(self, user_client, review, other):
+        comment = Comment.objects.create(
+            review=review, author=other, text='Чужой'
+        )
+        response = user_client.delete(
+            f'/api/v1/titles/{review.title_id}/reviews/{review.pk}'
+            f'/comments/{comment.pk}/'
+        )
+        assert response.status_code == 403
+
+
+@pytest.mark.django_db
+class TestEditableFilter:
+
+    def test_editable_reviews(self, user_client, admin_client, review, other):
+        Review.objects.create(
+            title=review.title, author=other, text='Чужой', score=5
+        )
+        url = f'/api/v1/titles/{review.title_id}/reviews/?editable=true'
+        results = user_client.get(url).json()['results']
+        assert [item['id'] for item in results] == [review.pk], (
+            'Проверьте, что ?editable=true оставляет только свои отзывы'
+        )
+        assert len(admin_client.get(url).json()['results']) == 2
+        assert APIClient().get(url).json()['results'] == []
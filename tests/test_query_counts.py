@@ -0,0 +1,87 @@
+import pytest
+from rest_framework.test import APIClient
+
+from api.catalog import warm_catalogs
+from reviews.models import Category, Comment, Genre, Review, Title
+
+PAGE_SIZES = (1, 10)
+
+MAX_QUERIES = {
+    'titles': 3,
+    'reviews': 3,
+    'comments': 3,
+    'users': 2,
+}
+
+
+def create_catalog(user, size):
+    category = Category.objects.create(name='Фильм', slug='film')
+    genres = [
+        Genre.objects.create(name=f'Жанр {i}', slug=f'genre-{i}')
+        for i in range(3)
+    ]
+    title = None
+    for i in range(size):
+        title = Title.objects.create(
+            name=f'Произведение {i}', year=2000, category=category
+        )
+        title.genre.set(genres)
+    review = Review.objects.create(
+        title=title, author=user, text='Отзыв', score=7
+    )
+    for i in range(size):
+        Comment.objects.create(review=review, author=user, text=f'Комм {i}')
+    for i in range(size - 1):
+        other = type(user).objects.create(
+            username=f'reviewer{i}', email=f'reviewer{i}@yamdb.fake'
+        )
+        Review.objects.create(title=title, author=other, text='Отзыв', score=5)
+    return title, review
+
+
+@pytest.mark.django_db
+class TestQueryCounts:
+
+    @pytest.mark.parametrize('size', PAGE_SIZES)
+    def test_titles_list(self, django_assert_max_num_queries, user, size):
+        create_catalog(user, size)
+        # Справочники загружаются при старте воркера.
+        warm_catalogs()
+        with django_assert_max_num_queries(MAX_QUERIES['titles']):
+            response = APIClient().get('/api/v1/titles/')
+        assert response.status_code == 200
+        assert len(response.json()['results']) == size, (
+            'Проверьте, что список произведений возвращает все объекты'
+        )
+
+    @pytest.mark.parametrize('size', PAGE_SIZES)
+    def test_reviews_list(self, django_assert_max_num_queries, user, size):
+        title, _ = create_catalog(user, size)
+        with django_assert_max_num_queries(MAX_QUERIES['reviews']):
+            response = APIClient().get(f'/api/v1/titles/{title.id}/reviews/')
+        assert response.status_code == 200
+        assert len(response.json()['results']) == size
+
+    @pytest.mark.parametrize('size', PAGE_SIZES)
+    def test_comments_list(self, django_assert_max_num_queries, user, size):
+        title, review = create_catalog(user, size)
+        with django_assert_max_num_queries(MAX_QUERIES['comments']):
+            response = APIClient().get(
+                f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+            )
+        assert response.status_code == 200
+        assert len(response.json()['results']) == size
+
+    @pytest.mark.parametrize('size', PAGE_SIZES)
+    def test_users_list(
+        self, django_assert_max_num_queries, django_user_model, admin_client,
+        size
+    ):
+        for i in range(size):
+            django_user_model.objects.create(
+                username=f'reader{i}', email=f'reader{i}@yamdb.fake'
+            )
+        with django_assert_max_num_queries(MAX_QUERIES['users']):
+            response = admin_client.get('/api/v1/users/')
+        assert response.status_code == 200
+        assert response.json()['count'] == size + 1
@@ -0,0 +1,147 @@
+import io
+from importlib import import_module
+
+import pytest
+from django.apps import apps
+from django.core.management import CommandError, call_command
+
+from reviews.models import Review, Title
+from reviews.ratings import find_rating_mismatches
+
+
+def counters(title):
+    title.refresh_from_db()
+    return title.review_count, title.score_sum, title.rating
+
+
+@pytest.fixture
+def title():
+    return Title.objects.create(name='Произведение', year=2000)
+
+
+@pytest.fixture
+def reviewers(django_user_model):
+    return [
+        django_user_model.objects.create(
+            username=f'reviewer{i}', email=f'reviewer{i}@yamdb.fake'
+        )
+        for i in range(3)
+    ]
+
+
+@pytest.mark.django_db
+class TestRatingCounters:
+
+    def test_create(self, title, reviewers):
+        assert counters(title) == (0, 0, None)
+        for author, score in zip(reviewers, (4, 7, 10)):
+            Review.objects.create(
+                title=title, author=author, text='Отзыв', score=score
+            )
+        assert counters(title) == (3, 21, 7.0), (
+            'Проверьте, что новый отзыв увеличивает счётчики произведения'
+        )
+
+    def test_score_change(self, title, reviewers):
+        review = Review.objects.create(
+            title=title, author=reviewers[0], text='Отзыв', score=4
+        )
+        review.score = 9
+        review.save()
+        assert counters(title) == (1, 9, 9.0), (
+            'Проверьте, что изменение оценки пересчитывает рейтинг'
+        )
+        review = Review.objects.get(pk=review.pk)
+        review.text = 'Правка'
+        review.save()
+        assert counters(title) == (1, 9, 9.0)
+
+    def test_delete(self, title, reviewers):
+        first, second = (
+            Review.objects.create(
+                title=title, author=author, text='Отзыв', score=score
+            )
+            for author, score in zip(reviewers, (2, 8))
+        )
+        first.delete()
+        assert counters(title) == (1, 8, 8.0)
+        second.delete()
+        assert counters(title) == (0, 0, None), (
+            'Проверьте, что без отзывов рейтинг произведения пуст'
+        )
+
+    def test_user_cascade_delete(self, title, reviewers):
+        for author, score in zip(reviewers, (3, 5, 10)):
+            Review.objects.create(
+                title=title, author=author, text='Отзыв', score=score
+            )
+        reviewers[2].delete()
+        assert counters(title) == (2, 8, 4.0), (
+            'Проверьте, что отзывы удалённого пользователя вычитаются '
+            'из рейтинга'
+        )
+
+    def test_title_cascade_delete(self, title, reviewers):
+        other = Title.objects.create(name='Другое', year=2001)
+        for current in (title, other):
+            Review.objects.create(
+                title=current, author=reviewers[0], text='Отзыв', score=6
+            )
+        title.delete()
+        assert not Review.objects.filter(title_id=title.pk).exists()
+        assert counters(other) == (1, 6, 6.0)
+
+    def test_bulk_writes(self, admin_client, title, reviewers):
+        review = Review.objects.create(
+            title=title, author=reviewers[0], text='Отзыв', score=2
+        )
+        response = admin_client.post('/api/v1/reviews/bulk/', [
+            {'id': review.pk, 'score': 6},
+            {
+                'title': title.pk, 'author': reviewers[1].username,
+                'text': 'Отзыв', 'score': 10,
+            },
+        ], format='json')
+        assert response.status_code == 200, response.json()
+        assert counters(title) == (2, 16, 8.0), (
+            'Проверьте, что пакетная запись отзывов обновляет счётчики'
+        )
+        assert not list(find_rating_mismatches())
+
+
+@pytest.mark.django_db
+class TestRebuildRatings:
+
+    @pytest.fixture
+    def broken(self, title, reviewers):
+        for author, score in zip(reviewers, (5, 6, 10)):
+            Review.objects.create(
+                title=title, author=author, text='Отзыв', score=score
+            )
+        Title.objects.filter(pk=title.pk).update(
+            review_count=1, score_sum=1, rating=1
+        )
+        return title
+
+    def test_check_reports_mismatches(self, broken):
+        out = io.StringIO()
+        with pytest.raises(CommandError):
+            call_command('rebuild_ratings', check=True, stdout=out)
+        assert f'Произведение {broken.pk}' in out.getvalue()
+        assert counters(broken) == (1, 1, 1.0), (
+            'Проверьте, что --check ничего не изменяет'
+        )
+
+    def test_repairs_counters(self, broken):
+        call_command('rebuild_ratings', stdout=io.StringIO())
+        assert counters(broken) == (3, 21, 7.0)
+        out = io.StringIO()
+        call_command('rebuild_ratings', check=True, stdout=out)
+        assert 'Расхождений не найдено' in out.getvalue()
+
+    def test_migration_backfill(self, broken):
+        migration = import_module('reviews.migrations.0003_title_rating')
+        migration.fill_ratings(apps, None)
+        assert counters(broken) == (3, 21, 7.0), (
+            'Проверьте, что миграция заполняет счётчики по отзывам'
+        )
@@ -0,0 +1,110 @@
+import random
+from collections import Counter
+
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import OperationalError, connections
+
+from api_yamdb.db import replicas
+from reviews.models import Review, Title
+
+DATABASES = ['default', 'replica']
+
+
+@pytest.fixture(autouse=True)
+def replica_settings(settings):
+    settings.DATABASE_REPLICAS = {'replica': 1}
+    replicas.unhealthy.clear()
+    yield
+    replicas.unhealthy.clear()
+
+
+@pytest.fixture
+def title():
+    # Запись попадает только в основную базу: реплика «отстаёт».
+    return Title.objects.create(name='Произведение', year=2000)
+
+
+@pytest.mark.django_db(databases=DATABASES)
+class TestReplicaRouting:
+
+    def test_authenticated_reads_use_replica(self, user_client, title):
+        response = user_client.get('/api/v1/titles/')
+        assert response.json()['count'] == 0, (
+            'Проверьте, что чтение произведений идёт из реплики'
+        )
+
+    def test_cached_responses_use_primary(self, client, title):
+        response = client.get('/api/v1/titles/')
+        assert response.json()['count'] == 1, (
+            'Проверьте, что ответы для общего кэша строятся по основной базе'
+        )
+
+    def test_read_your_writes(self, user_client, user, title):
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        response = user_client.post(url, {'text': 'Отзыв', 'score': 7})
+        assert response.status_code == 201
+        response = user_client.get(url)
+        assert response.status_code == 200
+        assert len(response.json()['results']) == 1, (
+            'Проверьте, что после записи пользователь читает свои изменения'
+        )
+
+        cache.delete(f'replica:sticky:{user.pk}')
+        assert user_client.get(url).status_code == 404
+        assert Review.objects.using('default').count() == 1
+
+    def test_local_sticky_cache_with_workers(
+        self, user_client, settings, title
+    ):
+        settings.WEB_CONCURRENCY = 2
+        response = user_client.get('/api/v1/titles/')
+        assert response.json()['count'] == 1, (
+            'Проверьте, что при кэше в памяти процесса и нескольких '
+            'воркерах пользователь читает из основной базы'
+        )
+        assert not replicas.is_sticky(AnonymousUser())
+
+    def test_unhealthy_replica_falls_back(
+        self, user_client, title, monkeypatch
+    ):
+        calls = []
+
+        def broken():
+            calls.append(True)
+            raise OperationalError('Реплика недоступна')
+
+        monkeypatch.setattr(
+            connections['replica'], 'ensure_connection', broken
+        )
+        for _ in range(2):
+            response = user_client.get('/api/v1/titles/')
+            assert response.json()['count'] == 1
+        assert len(calls) == 1, (
+            'Проверьте, что недоступная реплика на время исключается'
+        )
+
+    def test_writes_go_to_primary(self):
+        instance = Title(name='Произведение', year=2000)
+        instance._state.db = 'replica'
+        router = replicas.ReplicaRouter()
+        assert router.db_for_write(Title, instance=instance) == 'default'
+
+
+class TestReplicaChoice:
+
+    def test_weighted_choice(self, settings, monkeypatch):
+        settings.DATABASE_REPLICAS = {'heavy': 3, 'light': 1, 'off': 0}
+        monkeypatch.setattr(replicas, 'check_replica', lambda alias: True)
+        random.seed(0)
+        chosen = Counter(replicas.choose_replica() for _ in range(2000))
+        assert 'off' not in chosen
+        assert 2.5 < chosen['heavy'] / chosen['light'] < 3.5, (
+            'Проверьте, что реплики выбираются пропорционально весам'
+        )
+
+    def test_no_healthy_replica(self, settings, monkeypatch):
+        settings.DATABASE_REPLICAS = {'replica': 1}
+        monkeypatch.setattr(replicas, 'check_replica', lambda alias: False)
+        assert replicas.choose_replica() is None
@@ -0,0 +1,58 @@
+import pytest
+from rest_framework.test import APIClient
+
+from api.cache import stats
+from reviews.models import Genre, Title
+
+
+@pytest.mark.django_db
+class TestResponseCache:
+
+    def test_anonymous_list_is_cached(self, django_assert_num_queries):
+        Title.objects.create(name='Произведение', year=2000)
+        client = APIClient()
+        first = client.get('/api/v1/titles/')
+        hits = stats['hits']
+        with django_assert_num_queries(0):
+            second = client.get('/api/v1/titles/')
+        assert stats['hits'] == hits + 1
+        assert second.content == first.content
+        assert second['ETag'] == first['ETag']
+        assert 'Last-Modified' in second
+
+    def test_query_params_are_normalized(self, django_assert_num_queries):
+        client = APIClient()
+        client.get('/api/v1/titles/?year=2000&name=a')
+        with django_assert_num_queries(0):
+            client.get('/api/v1/titles/?name=a&year=2000')
+
+    def test_write_invalidates(self, admin_client):
+        client = APIClient()
+        assert client.get('/api/v1/genres/').json()['count'] == 0
+        response = admin_client.post(
+            '/api/v1/genres/', {'name': 'Драма', 'slug': 'drama'}
+        )
+        assert response.status_code == 201
+        assert client.get('/api/v1/genres/').json()['count'] == 1, (
+            'Проверьте, что изменение жанров сбрасывает кэш списка'
+        )
+        Genre.objects.all().delete()
+        assert client.get('/api/v1/genres/').json()['count'] == 0
+
+    def test_conditional_request(self, django_assert_num_queries):
+        client = APIClient()
+        etag = client.get('/api/v1/categories/')['ETag']
+        with django_assert_num_queries(0):
+            response = client.get(
+                '/api/v1/categories/', HTTP_IF_NONE_MATCH=etag
+            )
+        assert response.status_code == 304
+        response = client.get(
+            '/api/v1/categories/', HTTP_IF_NONE_MATCH='"other"'
+        )
+        assert response.status_code == 200
+
+    def test_authenticated_requests_bypass_cache(self, user_client):
+        response = user_client.get('/api/v1/titles/')
+        assert response.status_code == 200
+        assert 'ETag' not in response
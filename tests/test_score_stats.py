@@ -0,0 +1,102 @@
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Review, Title, TitleScoreStats
+from reviews.ratings import score_summary
+
+
+class TestScoreSummary:
+
+    def test_percentiles_from_buckets(self):
+        counts = [0] * 10
+        counts[1], counts[4], counts[9] = 1, 2, 1  # оценки 2, 5, 5, 10
+        summary = score_summary(counts)
+        assert summary['review_count'] == 4
+        assert summary['histogram']['5'] == 2
+        assert summary['median'] == 5
+        assert summary['percentiles'] == {
+            'p25': 2, 'p50': 5, 'p75': 5, 'p90': 10,
+        }
+
+    def test_empty(self):
+        summary = score_summary([0] * 10)
+        assert summary['review_count'] == 0
+        assert summary['median'] is None
+
+
+@pytest.fixture
+def title():
+    return Title.objects.create(name='Произведение', year=2000)
+
+
+@pytest.fixture
+def reviewers(django_user_model):
+    return [
+        django_user_model.objects.create(
+            username=f'reviewer{i}', email=f'reviewer{i}@yamdb.fake'
+        )
+        for i in range(3)
+    ]
+
+
+@pytest.mark.django_db
+class TestScoreStats:
+
+    def test_counts_follow_reviews(self, title, reviewers):
+        reviews = [
+            Review.objects.create(
+                title=title, author=author, text='Отзыв', score=score
+            )
+            for author, score in zip(reviewers, (3, 3, 8))
+        ]
+        stats = TitleScoreStats.objects.get(title=title)
+        assert (stats.score_3, stats.score_8) == (2, 1)
+
+        reviews[0].score = 9
+        reviews[0].save()
+        reviews[2].delete()
+        stats.refresh_from_db()
+        assert stats.counts == [0, 0, 1, 0, 0, 0, 0, 0, 1, 0], (
+            'Проверьте, что распределение оценок обновляется при изменении '
+            'и удалении отзыва'
+        )
+
+    def test_rebuild(self, title, reviewers):
+        for author in reviewers:
+            Review.objects.create(
+                title=title, author=author, text='Отзыв', score=7
+            )
+        TitleScoreStats.objects.all().delete()
+        call_command('rebuild_score_stats')
+        assert TitleScoreStats.objects.get(title=title).score_7 == 3
+
+    def test_stats_endpoint(self, client, title, reviewers):
+        for author, score in zip(reviewers, (2, 6, 10)):
+            Review.objects.create(
+                title=title, author=author, text='Отзыв', score=score
+            )
+        response = client.get(f'/api/v1/titles/{title.pk}/stats/')
+        assert response.status_code == 200
+        data = response.json()
+        assert data['review_count'] == 3
+        assert data['median'] == 6
+        assert data['rating'] == 6
+
+    def test_stats_endpoint_without_reviews(self, client, title):
+        response = client.get(f'/api/v1/titles/{title.pk}/stats/')
+        assert response.status_code == 200
+        assert response.json()['review_count'] == 0
+
+    def test_embedded_stats(
+        self, client, title, reviewers, django_assert_max_num_queries
+    ):
+        Review.objects.create(
+            title=title, author=reviewers[0], text='Отзыв', score=4
+        )
+        with django_assert_max_num_queries(3):
+            response = client.get('/api/v1/titles/?stats=true')
+        result = response.json()['results'][0]
+        assert result['stats']['histogram']['4'] == 1
+        assert 'stats' not in client.get('/api/v1/titles/').json()[
+            'results'
+        ][0]
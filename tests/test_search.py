@@ -0,0 +1,62 @@
+import pytest
+from rest_framework.test import APIClient
+
+from reviews.models import Genre, Title
+
+
+@pytest.fixture
+def titles():
+    return [
+        Title.objects.create(
+            name='Побег из Шоушенка', year=1994,
+            description='Тюремная драма о надежде',
+        ),
+        Title.objects.create(
+            name='Крестный отец', year=1972,
+            description='Семейная сага о мафии и побеге от прошлого',
+        ),
+        Title.objects.create(name='Ревизор', year=1836, description='Комедия'),
+    ]
+
+
+@pytest.mark.django_db
+class TestTitleSearch:
+
+    def test_ranked_by_name_first(self, titles):
+        response = APIClient().get('/api/v1/titles/?search=побег')
+        names = [item['name'] for item in response.json()['results']]
+        assert names == ['Побег из Шоушенка', 'Крестный отец'], (
+            'Проверьте, что совпадение в названии ранжируется выше описания'
+        )
+
+    def test_typo_tolerance(self, titles):
+        response = APIClient().get('/api/v1/titles/?search=ривизор')
+        names = [item['name'] for item in response.json()['results']]
+        assert names == ['Ревизор']
+
+    def test_no_match(self, titles):
+        response = APIClient().get('/api/v1/titles/?search=космос')
+        assert response.json()['count'] == 0
+
+    def test_genre_search(self):
+        Genre.objects.create(name='Драма', slug='drama')
+        Genre.objects.create(name='Комедия', slug='comedy')
+        response = APIClient().get('/api/v1/genres/?search=драмма')
+        assert [g['slug'] for g in response.json()['results']] == ['drama']
+
+    def test_genre_substring(self):
+        Genre.objects.create(name='Rock and Roll', slug='rock-and-roll')
+        Genre.objects.create(name='Джаз', slug='jazz')
+        response = APIClient().get('/api/v1/genres/?search=Ro')
+        assert [g['slug'] for g in response.json()['results']] == [
+            'rock-and-roll'
+        ], 'Проверьте, что жанры ищутся и по подстроке названия'
+
+    def test_result_cap(self, titles, settings):
+        settings.SEARCH_MAX_RESULTS = 1
+        response = APIClient().get('/api/v1/titles/?search=побег')
+        names = [item['name'] for item in response.json()['results']]
+        assert names == ['Побег из Шоушенка'], (
+            'Проверьте, что поиск упорядочивает не больше '
+            'SEARCH_MAX_RESULTS записей'
+        )
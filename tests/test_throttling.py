@@ -0,0 +1,114 @@
+import pytest
+from rest_framework.test import APIClient
+
+from reviews.models import Title
+
+
+@pytest.fixture
+def rates(settings):
+    def set_rates(**rates):
+        settings.REST_FRAMEWORK = dict(
+            settings.REST_FRAMEWORK,
+            DEFAULT_THROTTLE_RATES=dict(
+                settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'], **rates
+            ),
+        )
+    return set_rates
+
+
+def signup(client, username, ip='10.0.0.1'):
+    return client.post(
+        '/api/v1/auth/signup/',
+        {'username': username, 'email': f'{username}@yamdb.fake'},
+        HTTP_X_FORWARDED_FOR=ip,
+    )
+
+
+@pytest.mark.django_db
+class TestThrottling:
+
+    def test_signup_per_ip(self, rates, django_assert_num_queries):
+        rates(signup_ip='2/hour')
+        client = APIClient()
+        assert signup(client, 'first').status_code == 200
+        assert signup(client, 'second').status_code == 200
+        with django_assert_num_queries(0):
+            response = signup(client, 'third')
+        assert response.status_code == 429, (
+            'Проверьте, что регистрация ограничена по адресу клиента'
+        )
+        assert int(response['Retry-After']) > 0
+        assert signup(client, 'third', ip='10.0.0.2').status_code == 200, (
+            'Проверьте, что лимит считается для каждого адреса отдельно'
+        )
+
+    def test_token_per_username(self, rates, user):
+        rates(token_username='3/min')
+        client = APIClient()
+        for i in range(3):
+            response = client.post(
+                '/api/v1/auth/token/',
+                {'username': 'TestUser', 'confirmation_code': str(i)},
+                HTTP_X_FORWARDED_FOR=f'10.0.1.{i}',
+            )
+            assert response.status_code == 400
+        response = client.post(
+            '/api/v1/auth/token/',
+            {'username': 'testuser', 'confirmation_code': 'x'},
+            HTTP_X_FORWARDED_FOR='10.0.1.9',
+        )
+        assert response.status_code == 429, (
+            'Проверьте, что перебор кода ограничен по имени пользователя'
+        )
+
+    def test_array_body(self, rates):
+        rates(token_username='3/min')
+        response = APIClient().post(
+            '/api/v1/auth/token/', [{'username': 'TestUser'}], format='json'
+        )
+        assert response.status_code == 400, (
+            'Проверьте, что тело-массив не приводит к ошибке сервера'
+        )
+
+    def test_reviews_per_user(self, rates, user_client):
+        rates(reviews_user='1/hour')
+        titles = [
+            Title.objects.create(name=f'Произведение {i}', year=2000)
+            for i in range(2)
+        ]
+        for title, status in zip(titles, (201, 429)):
+            response = user_client.post(
+                f'/api/v1/titles/{title.id}/reviews/',
+                {'text': 'Отзыв', 'score': 5},
+            )
+            assert response.status_code == status
+        assert user_client.get(
+            f'/api/v1/titles/{titles[0].id}/reviews/'
+        ).status_code == 200, 'Проверьте, что чтение не ограничивается'
+
+    def test_anonymous_lists(self, rates, user_client):
+        rates(anon_list_ip='2/min')
+        client = APIClient()
+        for page in (1, 2):
+            assert client.get(
+                f'/api/v1/titles/?search=x{page}'
+            ).status_code == 200
+        response = client.get('/api/v1/genres/')
+        assert response.status_code == 429, (
+            'Проверьте, что анонимное чтение списков ограничено'
+        )
+        assert int(response['Retry-After']) == 30
+        assert user_client.get('/api/v1/genres/').status_code == 200, (
+            'Проверьте, что авторизованные пользователи не ограничиваются'
+        )
+
+    def test_cached_responses_are_throttled(self, rates):
+        rates(anon_list_ip='2/min')
+        client = APIClient()
+        for _ in range(2):
+            assert client.get('/api/v1/genres/').status_code == 200
+        response = client.get('/api/v1/genres/')
+        assert response.status_code == 429, (
+            'Проверьте, что ответы из кэша тоже расходуют лимит'
+        )
+        assert int(response['Retry-After']) == 30